@@ -0,0 +1,10 @@
+'''
+Moteur du Morpion Double Reversi
+
+Contient les règles et l'IA, sans aucune dépendance graphique
+(ni tkinter ni winsound) afin de pouvoir être importé en mode console.
+'''
+from .plateau import Jeton, Plateau, LIGNES, TAILLE, CLASSIQUE, Configuration, configuration
+from .ia import IA
+
+__all__ = ["Jeton", "Plateau", "IA", "LIGNES", "TAILLE", "CLASSIQUE", "Configuration", "configuration"]
@@ -0,0 +1,191 @@
+'''
+Analyse d'un lot de positions en ligne de commande
+
+Les positions sont lues une par ligne, en notation texte (voir
+plateau_vers_texte), sur l'entrée standard ou dans un fichier ; les
+lignes vides et celles qui commencent par "#" sont ignorées. Pour chaque
+position, l'IA cherche le meilleur coup et le programme écrit le coup, le
+score et le verdict (gain ou perte forcés, ou indécis).
+
+Le traitement est une suite de générateurs : lecture, analyse par un
+groupe de processus, mise en forme. Au plus EN_VOL positions par processus
+sont en cours d'analyse à la fois, si bien que la mémoire reste constante
+quelle que soit la taille du lot ; les résultats sortent dans l'ordre des
+positions.
+
+Usage: python -m morpion.analyse positions.txt --budget 0.5 --processus 4
+       cat positions.txt | python -m morpion.analyse --json
+'''
+import argparse
+import collections
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .ia import IA
+from .plateau import ADVERSAIRE, coup_vers_texte, dict_vers_coup, texte_vers_plateau
+from .recherche import SEUIL_VICTOIRE, VICTOIRE
+
+# Budget de recherche par position par défaut, en secondes
+BUDGET_DEFAUT = 0.5
+
+# Positions en cours d'analyse par processus
+EN_VOL = 2
+
+
+def lire_positions(lignes):
+    '''
+    Extrait les positions d'une suite de lignes
+    Préconditions:
+        lignes: itérable de chaînes (fichier ouvert, liste...)
+    Postconditions: génère le texte de chaque position, sans les lignes vides ni les commentaires
+    '''
+    for ligne in lignes:
+        ligne = ligne.strip()
+        if ligne and not ligne.startswith("#"):
+            yield ligne
+
+
+def verdict(score):
+    '''
+    Interprète un score de recherche
+    Préconditions:
+        score: score du point de vue du joueur au trait
+    Postconditions: renvoie "gain en N", "perte en N" (N demi-coups) ou "indécis"
+    '''
+    if score >= SEUIL_VICTOIRE:
+        return f"gain en {VICTOIRE - score}"
+    if score <= -SEUIL_VICTOIRE:
+        return f"perte en {VICTOIRE + score}"
+    return "indécis"
+
+
+def analyser(texte, budget=BUDGET_DEFAUT):
+    '''
+    Analyse une position
+    Préconditions:
+        texte: position en notation texte
+        budget: temps de recherche en secondes
+    Postconditions: renvoie un dictionnaire (position, coup, score, verdict, profondeur,
+                    noeuds, duree, erreur) ; erreur décrit une position illisible
+    '''
+    resultat = {"position": texte, "coup": None, "score": None, "verdict": None,
+                "profondeur": 0, "noeuds": 0, "duree": 0.0, "erreur": None}
+    try:
+        plateau, joueur = texte_vers_plateau(texte)
+    except ValueError as erreur:
+        resultat["erreur"] = str(erreur)
+        return resultat
+
+    if plateau.verifier_alignement(joueur) or plateau.verifier_alignement(ADVERSAIRE[joueur]):
+        resultat["verdict"] = "terminée"
+        return resultat
+    if next(plateau.coups_legaux(joueur), None) is None:
+        resultat["verdict"] = "nul"
+        return resultat
+
+    coup = dict_vers_coup(IA.jouer_difficile(plateau, joueur, budget=budget))
+    statistiques = IA.statistiques.dernier
+    resultat["coup"] = coup_vers_texte(coup)
+    resultat["profondeur"] = statistiques.profondeur
+    resultat["noeuds"] = statistiques.noeuds
+    resultat["duree"] = statistiques.duree
+    if statistiques.score is not None:
+        resultat["score"] = statistiques.score
+        resultat["verdict"] = verdict(statistiques.score)
+    else:
+        # Coup du livre ou de la table de finales : pas de score de recherche
+        resultat["verdict"] = statistiques.source
+    return resultat
+
+
+def _initialiser_processus():
+    '''
+    Prépare un processus d'analyse
+    Préconditions: appelé dans un processus de travail, jamais dans le processus principal
+    Postconditions: la recherche n'ouvre pas elle-même de processus
+    '''
+    IA.PROCESSUS = 1
+
+
+def analyser_lot(positions, budget=BUDGET_DEFAUT, processus=1, en_vol=EN_VOL):
+    '''
+    Analyse une suite de positions avec un nombre borné d'analyses en cours
+    Préconditions:
+        positions: itérable de positions en notation texte (peut être infini)
+        budget: temps de recherche par position
+        processus: nombre de processus d'analyse (1 : dans le processus courant)
+        en_vol: positions en cours d'analyse par processus
+    Postconditions: génère le résultat de analyser pour chaque position, dans l'ordre ;
+                    au plus processus * en_vol positions sont lues d'avance.
+                    Avec un seul processus, la recherche suit IA.PROCESSUS, qui n'est pas modifié.
+    '''
+    if processus <= 1:
+        for texte in positions:
+            yield analyser(texte, budget)
+        return
+
+    with ProcessPoolExecutor(processus, initializer=_initialiser_processus) as executeur:
+        taches = collections.deque()
+        for texte in positions:
+            taches.append(executeur.submit(analyser, texte, budget))
+            if len(taches) >= processus * en_vol:
+                yield taches.popleft().result()
+        while taches:
+            yield taches.popleft().result()
+
+
+def formater(resultat, en_json=False):
+    '''
+    Met en forme le résultat d'une position
+    Préconditions:
+        resultat: dictionnaire renvoyé par analyser
+        en_json: vrai pour une ligne JSON
+    Postconditions: renvoie une ligne, sans fin de ligne : la position, le coup, le score
+                    et le verdict séparés par des tabulations, ou l'erreur
+    '''
+    if en_json:
+        return json.dumps(resultat, ensure_ascii=False)
+    if resultat["erreur"]:
+        return f"{resultat['position']}\terreur : {resultat['erreur']}"
+    score = "-" if resultat["score"] is None else resultat["score"]
+    return f"{resultat['position']}\t{resultat['coup'] or '-'}\t{score}\t{resultat['verdict']}"
+
+
+def main(args=None):
+    '''
+    Point d'entrée en ligne de commande
+    Préconditions:
+        args: liste d'arguments (None pour sys.argv)
+    Postconditions: écrit une ligne par position ; renvoie 1 si une position est illisible, 0 sinon
+    '''
+    parser = argparse.ArgumentParser(description="Analyse d'un lot de positions")
+    parser.add_argument("fichier", nargs="?", help="fichier de positions (entrée standard par défaut)")
+    parser.add_argument("--budget", type=float, default=BUDGET_DEFAUT,
+                        help="temps de recherche par position, en secondes")
+    parser.add_argument("--processus", type=int, default=None,
+                        help="nombre de processus (nombre de coeurs par défaut)")
+    parser.add_argument("--en-vol", type=int, default=EN_VOL,
+                        help="positions en cours d'analyse par processus")
+    parser.add_argument("--json", action="store_true", help="une ligne JSON par position")
+    options = parser.parse_args(args)
+    if options.en_vol < 1:
+        parser.error("--en-vol doit être au moins 1")
+
+    entree = open(options.fichier, encoding="utf-8") if options.fichier else sys.stdin
+    erreurs = 0
+    try:
+        resultats = analyser_lot(lire_positions(entree), options.budget,
+                                 options.processus or os.cpu_count() or 1, options.en_vol)
+        for resultat in resultats:
+            erreurs += bool(resultat["erreur"])
+            print(formater(resultat, options.json), flush=True)
+    finally:
+        if entree is not sys.stdin:
+            entree.close()
+    return 1 if erreurs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
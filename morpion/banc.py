@@ -0,0 +1,356 @@
+'''
+Bancs d'essai des chemins critiques du moteur
+
+Micro-bancs : fonctions appelées sur un corpus fixe de positions.
+Macro-bancs : coups de l'IA sous budget et parties complètes sans interface.
+Chaque mesure est le meilleur temps par opération sur plusieurs répétitions.
+Les résultats s'enregistrent dans un fichier JSON de référence ; le mode
+comparaison signale les mesures qui se dégradent au-delà d'un seuil.
+
+Usage: python -m morpion.banc --enregistrer reference.json
+       python -m morpion.banc --comparer reference.json --seuil 0.10
+'''
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+from .evaluation import evaluer_motifs
+from .ia import IA
+from .plateau import ADVERSAIRE, Plateau, configuration
+from .recherche import Recherche
+
+# Corpus de positions représentatives (joueur1, joueur2, claire, joueur au trait),
+# tirées de parties aléatoires : ouverture, milieu de partie et plateaux chargés
+CORPUS = (
+    (0x4841, 0x9084, 0x58c4, "joueur1"), (0x4800, 0x0180, 0x0800, "joueur1"),
+    (0x7380, 0x8c1c, 0x9e0c, "joueur1"), (0x2ca0, 0xd010, 0x88b0, "joueur2"),
+    (0x588b, 0xa454, 0xbc84, "joueur2"), (0x0802, 0x4008, 0x080a, "joueur1"),
+    (0x8210, 0x0042, 0x8250, "joueur2"), (0x0800, 0x0200, 0x0a00, "joueur1"),
+    (0x2d05, 0x52a0, 0x0524, "joueur2"), (0x3000, 0x0100, 0x0100, "joueur2"),
+    (0x2a00, 0x0441, 0x0801, "joueur1"), (0x0144, 0x4011, 0x4045, "joueur1"),
+    (0x0010, 0x0000, 0x0000, "joueur2"), (0x0053, 0x2124, 0x2044, "joueur1"),
+    (0x070c, 0xd012, 0x5316, "joueur1"), (0x1050, 0x2100, 0x0110, "joueur2"),
+    (0x0800, 0x0040, 0x0800, "joueur1"), (0x0140, 0x0014, 0x0050, "joueur1"),
+    (0x1440, 0x8030, 0x0450, "joueur1"), (0x442a, 0xa011, 0xa01b, "joueur2"),
+    (0x18e0, 0x2509, 0x1da1, "joueur1"), (0x0010, 0x0002, 0x0010, "joueur1"),
+    (0x4020, 0x0040, 0x0060, "joueur2"), (0x2a19, 0x91c4, 0x324d, "joueur1"),
+)
+
+# Variante des bancs de grand plateau : 8x8, cinq jetons à aligner, 16 jetons par joueur
+GRAND_PLATEAU = (8, 8, 5)
+JETONS_GRAND_PLATEAU = 16
+
+# Seuil de dégradation signalé par défaut (10 %)
+SEUIL_DEFAUT = 0.10
+
+# Durée minimale de chaque mesure, pour lisser le bruit des bancs les plus courts
+DUREE_MIN = 0.1
+
+
+def positions():
+    '''
+    Reconstruit les positions du corpus
+    Préconditions: aucune
+    Postconditions: renvoie la liste des (plateau, joueur au trait)
+    '''
+    return [(Plateau.depuis_masques(j1, j2, claire), joueur) for j1, j2, claire, joueur in CORPUS]
+
+
+def positions_grand_plateau(nombre=len(CORPUS), graine=0):
+    '''
+    Tire des positions du grand plateau par parties aléatoires, à graine fixe
+    Préconditions:
+        nombre: nombre de positions
+        graine: graine du tirage
+    Postconditions: renvoie la liste des (plateau, joueur au trait), de l'ouverture
+                    aux plateaux chargés
+    '''
+    generateur = random.Random(graine)
+    variante = configuration(*GRAND_PLATEAU)
+    corpus = []
+    while len(corpus) < nombre:
+        plateau, joueur = Plateau(JETONS_GRAND_PLATEAU, variante), "joueur1"
+        for _ in range(generateur.randrange(1, 2 * JETONS_GRAND_PLATEAU)):
+            coups = list(plateau.coups_legaux(joueur))
+            if not coups:
+                break
+            plateau.jouer_coup(generateur.choice(coups), joueur)
+            if plateau.verifier_alignement("joueur1") or plateau.verifier_alignement("joueur2"):
+                break
+            joueur = ADVERSAIRE[joueur]
+        else:
+            corpus.append((plateau, joueur))
+    return corpus
+
+
+def mesurer(fonction, operations, repetitions=5, duree_min=DUREE_MIN):
+    '''
+    Mesure le temps d'une fonction
+    Préconditions:
+        fonction: fonction sans argument réalisant operations opérations
+        operations: nombre d'opérations par appel
+        repetitions: nombre de mesures
+        duree_min: durée minimale d'une mesure, en secondes
+    Postconditions: renvoie le meilleur temps par opération, en secondes
+    '''
+    meilleur = math.inf
+    # Comme timeit : le ramasse-miettes ne doit pas tomber au milieu d'une mesure
+    ramasse_miettes = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repetitions):
+            appels = 0
+            debut = time.perf_counter()
+            while True:
+                fonction()
+                appels += 1
+                duree = time.perf_counter() - debut
+                if duree >= duree_min:
+                    break
+            meilleur = min(meilleur, duree / appels)
+    finally:
+        if ramasse_miettes:
+            gc.enable()
+    return meilleur / operations
+
+
+def _banc_corpus(appel, tours, corpus=None):
+    '''
+    Prépare un micro-banc appelant une fonction sur tout le corpus
+    Préconditions:
+        appel: fonction (plateau, joueur)
+        tours: nombre de passages sur le corpus par mesure
+        corpus: liste de (plateau, joueur) (None pour le corpus du plateau 4x4)
+    Postconditions: renvoie (fonction sans argument, nombre d'opérations)
+    '''
+    if corpus is None:
+        corpus = positions()
+
+    def banc():
+        for _ in range(tours):
+            for plateau, joueur in corpus:
+                appel(plateau, joueur)
+    return banc, tours * len(corpus)
+
+
+def _banc_jouer_facile():
+    '''
+    Micro-banc de IA.jouer_facile, à graine fixe
+    Préconditions: aucune
+    Postconditions: renvoie (fonction sans argument, nombre d'opérations)
+    '''
+    banc, operations = _banc_corpus(IA.jouer_facile, 20)
+
+    def banc_graine():
+        random.seed(0)
+        banc()
+    return banc_graine, operations
+
+
+def _banc_jouer_difficile():
+    '''
+    Macro-banc de IA.jouer_difficile avec un budget court
+    Préconditions: aucune
+    Postconditions: renvoie (fonction sans argument, nombre d'opérations) ;
+                    mesure surtout le respect du budget et le coût fixe d'un coup
+    '''
+    corpus = positions()[:8]
+
+    def banc():
+        for plateau, joueur in corpus:
+            IA.jouer_difficile(plateau, joueur, budget=0.02)
+    return banc, len(corpus)
+
+
+def _banc_recherche():
+    '''
+    Macro-banc d'une recherche à profondeur fixe sur le corpus
+    Préconditions: aucune
+    Postconditions: renvoie (fonction sans argument, nombre d'opérations)
+    '''
+    corpus = positions()
+
+    def banc():
+        recherche = Recherche(evaluer_motifs, budget=math.inf, profondeur_max=2)
+        for plateau, joueur in corpus:
+            recherche.meilleur_coup(plateau, joueur)
+    return banc, len(corpus)
+
+
+def _banc_simulations():
+    '''
+    Micro-banc des simulations du joueur Monte-Carlo, à graine fixe
+    Préconditions: aucune
+    Postconditions: renvoie (fonction sans argument, nombre d'opérations) ;
+                    l'inverse du résultat est le débit en simulations par seconde
+    '''
+    from .mcts import simuler
+
+    corpus = []
+    for plateau, joueur in positions():
+        adversaire = "joueur2" if joueur == "joueur1" else "joueur1"
+        corpus.append((plateau.occupation[joueur], plateau.occupation[adversaire], plateau.claire,
+                       plateau.jetons_par_joueur - plateau.occupation[joueur].bit_count(),
+                       plateau.jetons_par_joueur - plateau.occupation[adversaire].bit_count()))
+
+    def banc():
+        random.seed(0)
+        for _ in range(20):
+            for position in corpus:
+                simuler(*position)
+    return banc, 20 * len(corpus)
+
+
+def _banc_parties(nom1, nom2, parties):
+    '''
+    Macro-banc de parties complètes sans interface, à graine fixe
+    Préconditions:
+        nom1, nom2: noms de moteurs de morpion.tournoi
+        parties: nombre de parties par mesure
+    Postconditions: renvoie (fonction sans argument, nombre d'opérations)
+    '''
+    from .tournoi import _jouer_serie
+
+    def banc():
+        _jouer_serie(nom1, nom2, 0, 0, parties, 200)
+    return banc, parties
+
+
+# Nom de chaque banc -> fonction préparant (fonction à mesurer, nombre d'opérations)
+BANCS = {
+    "verifier_alignement": lambda: _banc_corpus(Plateau.verifier_alignement, 200),
+    "copier": lambda: _banc_corpus(lambda plateau, joueur: plateau.copier(), 200),
+    "coups_legaux": lambda: _banc_corpus(lambda plateau, joueur: list(plateau.coups_legaux(joueur)), 20),
+    "evaluer_plateau": lambda: _banc_corpus(IA.evaluer_plateau, 100),
+    "verifier_alignement_8x8": lambda: _banc_corpus(Plateau.verifier_alignement, 200,
+                                                    positions_grand_plateau()),
+    "coups_legaux_8x8": lambda: _banc_corpus(lambda plateau, joueur: list(plateau.coups_legaux(joueur)),
+                                             5, positions_grand_plateau()),
+    "evaluer_plateau_8x8": lambda: _banc_corpus(IA.evaluer_plateau, 20, positions_grand_plateau()),
+    "jouer_facile": _banc_jouer_facile,
+    "simulations_mcts": _banc_simulations,
+    "recherche_profondeur2": _banc_recherche,
+    "jouer_difficile": _banc_jouer_difficile,
+    "parties_facile": lambda: _banc_parties("facile", "facile", 200),
+    "parties_profondeur1": lambda: _banc_parties("profondeur1", "facile", 20),
+}
+
+
+def executer(noms=None, repetitions=5, rapport=print):
+    '''
+    Exécute les bancs d'essai
+    Préconditions:
+        noms: noms de bancs à exécuter (None pour tous)
+        repetitions: nombre de mesures de chaque banc
+        rapport: fonction recevant une ligne par banc
+    Postconditions: renvoie un dictionnaire nom -> secondes par opération
+    '''
+    # La recherche parallèle fausserait les mesures d'un seul coeur
+    IA.PROCESSUS = 1
+    resultats = {}
+    for nom in noms or BANCS:
+        fonction, operations = BANCS[nom]()
+        resultats[nom] = mesurer(fonction, operations, repetitions)
+        rapport(f"{nom:<24}{_format_duree(resultats[nom]):>12}{1 / resultats[nom]:>14.0f} op/s")
+    return resultats
+
+
+def _format_duree(secondes):
+    '''
+    Met en forme une durée avec l'unité adaptée
+    Préconditions:
+        secondes: durée positive
+    Postconditions: renvoie un texte en ns, µs, ms ou s
+    '''
+    for unite, facteur in (("ns", 1e-9), ("µs", 1e-6), ("ms", 1e-3)):
+        if secondes < 1000 * facteur:
+            return f"{secondes / facteur:.1f} {unite}"
+    return f"{secondes:.2f} s"
+
+
+def enregistrer(chemin, resultats):
+    '''
+    Écrit des résultats dans un fichier de référence
+    Préconditions:
+        chemin: fichier JSON à écrire
+        resultats: dictionnaire renvoyé par executer
+    Postconditions: le fichier contient les résultats et la description de la machine
+    '''
+    reference = {
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "resultats": resultats,
+    }
+    with open(chemin, "w", encoding="utf-8") as fichier:
+        json.dump(reference, fichier, indent=2, sort_keys=True)
+
+
+def comparer(chemin, resultats, seuil=SEUIL_DEFAUT, rapport=print):
+    '''
+    Compare des résultats à un fichier de référence
+    Préconditions:
+        chemin: fichier écrit par enregistrer
+        resultats: dictionnaire renvoyé par executer
+        seuil: dégradation relative tolérée (0.10 pour 10 %)
+        rapport: fonction recevant une ligne par banc
+    Postconditions: renvoie la liste des noms de bancs en régression
+    '''
+    with open(chemin, encoding="utf-8") as fichier:
+        reference = json.load(fichier)["resultats"]
+    regressions = []
+    for nom, duree in resultats.items():
+        if nom not in reference:
+            rapport(f"{nom:<24}{'(nouveau)':>12}")
+            continue
+        ecart = duree / reference[nom] - 1
+        marque = ""
+        if ecart > seuil:
+            regressions.append(nom)
+            marque = "  RÉGRESSION"
+        rapport(f"{nom:<24}{_format_duree(reference[nom]):>12} -> {_format_duree(duree):>10}"
+                f"{100 * ecart:>+8.1f} %{marque}")
+    return regressions
+
+
+def main(args=None):
+    '''
+    Point d'entrée en ligne de commande
+    Préconditions:
+        args: liste d'arguments (None pour sys.argv)
+    Postconditions: renvoie 1 si une régression est détectée, 0 sinon
+    '''
+    parser = argparse.ArgumentParser(description="Bancs d'essai du moteur")
+    parser.add_argument("bancs", nargs="*",
+                        help="bancs à exécuter (tous par défaut) : " + ", ".join(BANCS))
+    parser.add_argument("--repetitions", type=int, default=5, help="mesures par banc")
+    parser.add_argument("--enregistrer", metavar="FICHIER", help="écrire une référence JSON")
+    parser.add_argument("--comparer", metavar="FICHIER", help="comparer à une référence JSON")
+    parser.add_argument("--seuil", type=float, default=SEUIL_DEFAUT,
+                        help="dégradation tolérée (0.10 pour 10 %%)")
+    options = parser.parse_args(args)
+    inconnus = [nom for nom in options.bancs if nom not in BANCS]
+    if inconnus:
+        parser.error(f"bancs inconnus : {', '.join(inconnus)}")
+
+    if options.comparer:
+        resultats = executer(options.bancs, options.repetitions, rapport=lambda ligne: None)
+        regressions = comparer(options.comparer, resultats, options.seuil)
+    else:
+        resultats = executer(options.bancs, options.repetitions)
+        regressions = []
+    if options.enregistrer:
+        enregistrer(options.enregistrer, resultats)
+    if regressions:
+        print(f"{len(regressions)} régression(s) au-delà de {100 * options.seuil:.0f} %")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+'''
+Mesure du temps d'import du moteur
+
+Usage: python -m morpion.budget_import [--budget MS] [--essais N]
+'''
+import argparse
+import subprocess
+import sys
+
+# Budget d'import du moteur seul, en millisecondes
+BUDGET_IMPORT_MS = 30.0
+
+# Modules graphiques qui ne doivent jamais être chargés par le moteur
+MODULES_INTERDITS = ("tkinter", "winsound")
+
+_SCRIPT = '''
+import sys, time
+debut = time.perf_counter()
+import morpion
+duree = (time.perf_counter() - debut) * 1000
+interdits = [m for m in %r if m in sys.modules]
+print(duree, ",".join(interdits))
+'''
+
+
+def mesurer_import(essais=5):
+    '''
+    Mesure le temps d'import du moteur dans des interpréteurs neufs
+    Préconditions:
+        essais: nombre d'interpréteurs lancés
+    Postconditions: renvoie (meilleur temps en ms, modules interdits chargés)
+    '''
+    meilleur = None
+    interdits = set()
+    for _ in range(essais):
+        sortie = subprocess.run(
+            [sys.executable, "-c", _SCRIPT % (MODULES_INTERDITS,)],
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        duree = float(sortie[0])
+        if len(sortie) > 1:
+            interdits.update(sortie[1].split(","))
+        if meilleur is None or duree < meilleur:
+            meilleur = duree
+    return meilleur, sorted(interdits)
+
+
+def main(args=None):
+    '''
+    Point d'entrée en ligne de commande
+    Préconditions:
+        args: liste d'arguments (None pour sys.argv)
+    Postconditions: renvoie 0 si le budget est respecté, 1 sinon
+    '''
+    parser = argparse.ArgumentParser(description="Temps d'import du moteur")
+    parser.add_argument("--budget", type=float, default=BUDGET_IMPORT_MS, help="budget en ms")
+    parser.add_argument("--essais", type=int, default=5, help="nombre de mesures")
+    options = parser.parse_args(args)
+
+    duree, interdits = mesurer_import(options.essais)
+    print(f"Import de morpion: {duree:.2f} ms (budget {options.budget:.2f} ms)")
+    if interdits:
+        print(f"Modules graphiques chargés: {', '.join(interdits)}")
+        return 1
+    return 0 if duree <= options.budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
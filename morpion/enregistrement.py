@@ -0,0 +1,406 @@
+'''
+Enregistrement des parties dans un fichier en ajout seul
+
+Format (entiers gros-boutistes) :
+    fichier : MAGIQUE, puis les parties les unes à la suite des autres
+    partie  : DEBUT, jetons par joueur (1 octet), date (4 octets, secondes),
+              nom du joueur 1, nom du joueur 2 et mode (1 octet de longueur
+              puis UTF-8 chacun), les coups (2 octets chacun), puis FIN et
+              le résultat (1 octet)
+    coup    : bit 15 glissement, bit 14 pose, bit 13 face claire,
+              bits 8-11 source, bits 4-7 destination, bits 0-3 case
+
+Le bit 12 d'un coup est toujours nul et l'octet fort d'un coup ne dépasse
+jamais 0xEF : les marqueurs DEBUT et FIN ne peuvent pas apparaître dans les
+coups, même à cheval sur deux coups. Une partie interrompue par un arrêt
+brutal (sans FIN) est donc relue comme une partie incomplète, et le
+lecteur repart au début de la partie suivante.
+
+Usage: python -m morpion.enregistrement parties.mdr --verifier
+'''
+import argparse
+import struct
+import sys
+import time
+
+from .plateau import ADVERSAIRE, JETONS_PAR_JOUEUR, Plateau
+
+MAGIQUE = b"MDRP\x01"
+DEBUT = b"\xff\xfe"
+FIN = b"\xff\xfd"
+
+# Résultats d'une partie
+NUL = 0
+GAIN_JOUEUR1 = 1
+GAIN_JOUEUR2 = 2
+ABANDON_JOUEUR1 = 3
+ABANDON_JOUEUR2 = 4
+INTERROMPUE = 5
+
+# Résultat d'une victoire et d'un abandon de chaque joueur
+GAINS = {"joueur1": GAIN_JOUEUR1, "joueur2": GAIN_JOUEUR2}
+ABANDONS = {"joueur1": ABANDON_JOUEUR1, "joueur2": ABANDON_JOUEUR2}
+
+# Nombre de coups écrits entre deux vidages du fichier
+TAILLE_LOT = 16
+
+# Taille des blocs lus par le lecteur
+TAILLE_BLOC = 1 << 20
+
+_ENTETE = struct.Struct(">BI")
+_MOT = struct.Struct(">H")
+
+# Coup de chaque mot de 16 bits (None pour un mot invalide), construit au premier décodage
+_COUPS = None
+
+
+def encoder_coup(coup):
+    '''
+    Code un coup sur 16 bits
+    Préconditions:
+        coup: tuple (source, destination, case, face)
+    Postconditions: renvoie un entier de 0 à 0xEFFF
+    '''
+    source, destination, case, face = coup
+    mot = 0
+    if source is not None:
+        mot |= 0x8000 | source << 8 | destination << 4
+    if case is not None:
+        mot |= 0x4000 | case
+        if face:
+            mot |= 0x2000
+    return mot
+
+
+def _table_coups():
+    '''
+    Construit la table de décodage des coups
+    Préconditions: aucune
+    Postconditions: renvoie la liste des 65536 coups possibles, None pour les mots invalides
+    '''
+    global _COUPS
+    if _COUPS is None:
+        table = [None] * 0x10000
+        cases = range(16)
+        glissements = [(None, None)] + [(source, destination) for source in cases for destination in cases]
+        poses = [(None, None)] + [(case, face) for case in cases for face in (False, True)]
+        for source, destination in glissements:
+            for case, face in poses:
+                coup = (source, destination, case, face)
+                table[encoder_coup(coup)] = coup
+        _COUPS = table
+    return _COUPS
+
+
+def decoder_coup(mot):
+    '''
+    Inverse de encoder_coup
+    Préconditions:
+        mot: entier de 16 bits
+    Postconditions: renvoie le tuple (source, destination, case, face) ;
+                    lève ValueError si le mot n'est pas un coup
+    '''
+    coup = _table_coups()[mot]
+    if coup is None:
+        raise ValueError(f"Coup invalide : {mot:#06x}")
+    return coup
+
+
+def coup_joue(avant, apres, joueur):
+    '''
+    Retrouve le coup joué entre deux positions
+    Préconditions:
+        avant, apres: objets Plateau avant et après le coup de joueur
+    Postconditions: renvoie le tuple (source, destination, case, face) ;
+                    (None, None, None, None) si rien n'a changé
+    '''
+    adversaire = ADVERSAIRE[joueur]
+    parti = avant.occupation[adversaire] & ~apres.occupation[adversaire]
+    arrive = apres.occupation[adversaire] & ~avant.occupation[adversaire]
+    pose = apres.occupation[joueur] & ~avant.occupation[joueur]
+    source = destination = case = face = None
+    if parti and arrive:
+        source, destination = parti.bit_length() - 1, arrive.bit_length() - 1
+    if pose:
+        case = pose.bit_length() - 1
+        face = bool(apres.claire & pose)
+    return (source, destination, case, face)
+
+
+def _chaine(texte):
+    '''
+    Code un texte court avec sa longueur
+    Préconditions:
+        texte: chaîne de caractères
+    Postconditions: renvoie 1 octet de longueur puis au plus 255 octets UTF-8
+    '''
+    octets = texte.encode("utf-8")[:255]
+    return bytes((len(octets),)) + octets
+
+
+class Enregistreur:
+    '''
+    Écrit les parties au fil des coups, en ajout seul
+    '''
+    def __init__(self, chemin, lot=TAILLE_LOT):
+        '''
+        Ouvre le fichier des parties
+        Préconditions:
+            chemin: fichier ouvert en ajout (créé s'il n'existe pas)
+            lot: nombre de coups écrits entre deux vidages
+        Postconditions: aucune partie n'est en cours ; lève OSError si le fichier
+                        ne peut pas être ouvert
+        '''
+        self._fichier = open(chemin, "ab")
+        if self._fichier.tell() == 0:
+            self._fichier.write(MAGIQUE)
+        self._tampon = bytearray()
+        self.lot = lot
+        self.coups = 0
+        self.en_cours = False
+
+    def commencer(self, joueur1, joueur2, mode="", jetons_par_joueur=JETONS_PAR_JOUEUR):
+        '''
+        Commence l'enregistrement d'une partie
+        Préconditions:
+            joueur1, joueur2: noms des joueurs
+            mode: description libre de la partie (niveau de l'IA...)
+            jetons_par_joueur: jetons de chaque joueur
+        Postconditions: une partie encore en cours est terminée comme INTERROMPUE
+        '''
+        if self.en_cours:
+            self.terminer(INTERROMPUE)
+        self._tampon += DEBUT + _ENTETE.pack(jetons_par_joueur, int(time.time()))
+        self._tampon += _chaine(joueur1) + _chaine(joueur2) + _chaine(mode)
+        self.coups = 0
+        self.en_cours = True
+
+    def ajouter(self, coup):
+        '''
+        Enregistre un coup de la partie en cours
+        Préconditions:
+            coup: tuple (source, destination, case, face)
+        Postconditions: le coup est écrit ; le fichier est vidé tous les lot coups
+        '''
+        self._tampon += _MOT.pack(encoder_coup(coup))
+        self.coups += 1
+        if self.coups % self.lot == 0:
+            self.vider()
+
+    def terminer(self, resultat):
+        '''
+        Termine la partie en cours
+        Préconditions:
+            resultat: NUL, GAIN_JOUEUR1, GAIN_JOUEUR2, ABANDON_JOUEUR1, ABANDON_JOUEUR2 ou INTERROMPUE
+        Postconditions: la partie est entièrement écrite sur le disque
+        '''
+        self._tampon += FIN + bytes((resultat,))
+        self.en_cours = False
+        self.vider()
+
+    def vider(self):
+        '''
+        Écrit sur le disque ce qui est en attente
+        Préconditions: aucune
+        Postconditions: le fichier contient tout ce qui a été enregistré
+        '''
+        self._fichier.write(self._tampon)
+        self._fichier.flush()
+        self._tampon.clear()
+
+    def fermer(self):
+        '''
+        Ferme le fichier
+        Préconditions: aucune
+        Postconditions: une partie encore en cours est terminée comme INTERROMPUE
+        '''
+        if self.en_cours:
+            self.terminer(INTERROMPUE)
+        self.vider()
+        self._fichier.close()
+
+
+class Partie:
+    '''
+    Partie relue dans un fichier d'enregistrement
+    '''
+    def __init__(self, jetons_par_joueur, date, joueurs, mode, coups, resultat):
+        '''
+        Initialise une partie
+        Préconditions:
+            jetons_par_joueur: jetons de chaque joueur
+            date: date du début de la partie (secondes depuis 1970)
+            joueurs: tuple (nom du joueur 1, nom du joueur 2)
+            mode: description libre de la partie
+            coups: liste des tuples (source, destination, case, face), joueur1 d'abord
+            resultat: résultat enregistré, ou None si la partie est incomplète
+        Postconditions: les valeurs sont des attributs de l'objet
+        '''
+        self.jetons_par_joueur = jetons_par_joueur
+        self.date = date
+        self.joueurs = joueurs
+        self.mode = mode
+        self.coups = coups
+        self.resultat = resultat
+
+    @property
+    def gagnant(self):
+        '''
+        Vainqueur de la partie
+        Préconditions: aucune
+        Postconditions: renvoie "joueur1", "joueur2", ou None (nul, interrompue, incomplète)
+        '''
+        if self.resultat in (GAIN_JOUEUR1, ABANDON_JOUEUR2):
+            return "joueur1"
+        if self.resultat in (GAIN_JOUEUR2, ABANDON_JOUEUR1):
+            return "joueur2"
+        return None
+
+
+def lire_parties(chemin, taille_bloc=TAILLE_BLOC):
+    '''
+    Lit les parties d'un fichier une à une, sans le charger en mémoire
+    Préconditions:
+        chemin: fichier écrit par Enregistreur
+        taille_bloc: nombre d'octets lus à la fois
+    Postconditions: génère des objets Partie dans l'ordre du fichier ;
+                    lève ValueError si le fichier n'est pas un enregistrement
+    '''
+    table = _table_coups()
+    with open(chemin, "rb") as fichier:
+        if fichier.read(len(MAGIQUE)) != MAGIQUE:
+            raise ValueError(f"{chemin} n'est pas un fichier de parties")
+        tampon, position = b"", 0
+
+        def remplir():
+            # Garde la partie non lue du tampon et y ajoute un bloc
+            nonlocal tampon, position
+            bloc = fichier.read(taille_bloc)
+            tampon, position = tampon[position:] + bloc, 0
+            return bool(bloc)
+
+        def disponibles(longueur):
+            # Vrai si longueur octets sont lisibles à partir de position
+            while len(tampon) - position < longueur:
+                if not remplir():
+                    return False
+            return True
+
+        while disponibles(2):
+            if tampon[position:position + 2] != DEBUT:
+                # Octets inattendus : on repart au début de partie suivant
+                suivant = tampon.find(DEBUT, position + 1)
+                if suivant < 0:
+                    position = len(tampon) - 1
+                    if not remplir():
+                        return
+                else:
+                    position = suivant
+                continue
+
+            # En-tête
+            longueur = 2 + _ENTETE.size
+            textes = []
+            for _ in range(3):
+                if not disponibles(longueur + 1) or not disponibles(longueur + 1 + tampon[position + longueur]):
+                    return
+                taille = tampon[position + longueur]
+                textes.append(tampon[position + longueur + 1:position + longueur + 1 + taille].decode("utf-8", "replace"))
+                longueur += 1 + taille
+            jetons_par_joueur, date = _ENTETE.unpack_from(tampon, position + 2)
+            position += longueur
+
+            # Coups, jusqu'au marqueur suivant
+            coups = []
+            resultat = None
+            while True:
+                fin = tampon.find(FIN, position)
+                debut = tampon.find(DEBUT, position)
+                marqueur = min(indice for indice in (fin, debut, len(tampon)) if indice >= 0)
+                mots = (marqueur - position) // 2
+                for mot in struct.unpack_from(f">{mots}H", tampon, position):
+                    coup = table[mot]
+                    if coup is None:
+                        raise ValueError(f"Coup invalide : {mot:#06x}")
+                    coups.append(coup)
+                position += 2 * mots
+                if marqueur == fin and disponibles(3):
+                    resultat = tampon[position + 2]
+                    position += 3
+                    break
+                if marqueur == debut:
+                    break
+                if marqueur == fin or not remplir():
+                    # Fichier tronqué
+                    position = len(tampon)
+                    break
+            yield Partie(jetons_par_joueur, date, tuple(textes[:2]), textes[2], coups, resultat)
+
+
+def rejouer(partie):
+    '''
+    Rejoue une partie coup par coup en vérifiant chaque coup
+    Préconditions:
+        partie: objet Partie
+    Postconditions: génère (plateau, joueur, coup) avant chaque coup ; le plateau est
+                    réutilisé d'un coup à l'autre. Lève ValueError sur un coup illégal.
+                    Un glissement seul est accepté en fin de partie quand il aligne
+                    les jetons adverses (l'interface arrête alors la partie).
+    '''
+    plateau = Plateau(partie.jetons_par_joueur)
+    joueur = "joueur1"
+    for numero, coup in enumerate(partie.coups):
+        legaux = set(plateau.coups_legaux(joueur, premier_coup=numero == 0))
+        if coup not in legaux:
+            dernier = numero == len(partie.coups) - 1
+            glissement = coup[0] is not None and coup[2] is None and any(
+                legal[:2] == coup[:2] for legal in legaux)
+            if not (dernier and glissement):
+                raise ValueError(f"Coup {numero + 1} illégal : {coup}")
+        yield plateau, joueur, coup
+        plateau.jouer_coup(coup, joueur)
+        joueur = ADVERSAIRE[joueur]
+
+
+def main(args=None):
+    '''
+    Point d'entrée en ligne de commande : résume un fichier de parties
+    Préconditions:
+        args: liste d'arguments (None pour sys.argv)
+    Postconditions: affiche le nombre de parties par résultat ; renvoie 1 si une
+                    partie vérifiée contient un coup illégal, 0 sinon
+    '''
+    parser = argparse.ArgumentParser(description="Résumé d'un fichier de parties")
+    parser.add_argument("fichier", help="fichier écrit par Enregistreur")
+    parser.add_argument("--verifier", action="store_true", help="rejouer chaque partie")
+    options = parser.parse_args(args)
+
+    noms = {NUL: "nuls", GAIN_JOUEUR1: "gains joueur1", GAIN_JOUEUR2: "gains joueur2",
+            ABANDON_JOUEUR1: "abandons joueur1", ABANDON_JOUEUR2: "abandons joueur2",
+            INTERROMPUE: "interrompues", None: "incomplètes"}
+    comptes = dict.fromkeys(noms, 0)
+    parties = coups = illegales = 0
+    debut = time.perf_counter()
+    for partie in lire_parties(options.fichier):
+        parties += 1
+        coups += len(partie.coups)
+        comptes[partie.resultat if partie.resultat in noms else None] += 1
+        if options.verifier:
+            try:
+                for _ in rejouer(partie):
+                    pass
+            except ValueError as erreur:
+                illegales += 1
+                print(f"Partie {parties} : {erreur}")
+    duree = time.perf_counter() - debut
+
+    print(f"{parties} parties, {coups} coups ({coups / max(parties, 1):.1f} par partie)")
+    for resultat, nom in noms.items():
+        if comptes[resultat]:
+            print(f"  {nom:<18}{comptes[resultat]:>10}")
+    print(f"  Lecture : {parties / duree if duree else 0:.0f} parties/s")
+    return 1 if illegales else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
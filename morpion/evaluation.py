@@ -0,0 +1,187 @@
+'''
+Évaluation des positions par table de motifs
+
+Chacune des 24 fenêtres de 3 cases (les alignements gagnants dans les
+quatre directions) est décrite par un indice de 9 bits : 3 bits pour les
+jetons du joueur, 3 pour ceux de l'adversaire et 3 pour les faces claires.
+Le score de chaque indice est précalculé ; évaluer un plateau revient à
+additionner 24 lectures de table.
+
+Les variantes (autres dimensions ou longueur d'alignement) sont évaluées
+par evaluer_lignes avec les mêmes valeurs, ligne par ligne, à partir des
+nombres de jetons de chaque ligne de la configuration du plateau.
+'''
+from .plateau import ADVERSAIRE, CLASSIQUE, LIGNES
+
+# Valeurs des motifs, du point de vue du joueur qui possède les jetons
+SCORE_VICTOIRE = 1000
+SCORE_DEUX_MEME_FACE = 50
+SCORE_DEUX_MEME_FACE_BLOQUE = 20
+SCORE_DEUX_FACES_DIFFERENTES = 5
+SCORE_UN_JETON = 2
+
+# Écart entre les trois masques regroupés dans un seul entier
+_VOIE = 32
+_DECALAGE_ADVERSE = _VOIE - 3
+_DECALAGE_CLAIRE = 2 * _VOIE - 6
+
+
+def _valeur(nombre, vides, meme_face, alignement=3):
+    '''
+    Valeur d'une ligne pour le joueur qui y possède des jetons
+    Préconditions:
+        nombre: jetons du joueur dans la ligne
+        vides: cases vides de la ligne
+        meme_face: vrai si les jetons du joueur montrent tous la même face
+        alignement: longueur de la ligne
+    Postconditions: renvoie la valeur de la ligne, sans tenir compte de l'adversaire
+    '''
+    if nombre == alignement:
+        return SCORE_VICTOIRE if meme_face else 0
+    if nombre == alignement - 1:
+        if not meme_face:
+            return SCORE_DEUX_FACES_DIFFERENTES if vides else 0
+        # Un jeton adverse au milieu peut encore être déplacé
+        return SCORE_DEUX_MEME_FACE if vides else SCORE_DEUX_MEME_FACE_BLOQUE
+    if nombre == 1 and vides == alignement - 1:
+        return SCORE_UN_JETON
+    return 0
+
+
+def _score_motif(mien, adverse, claire):
+    '''
+    Score d'une fenêtre du point de vue du joueur
+    Préconditions:
+        mien, adverse: masques de 3 bits des jetons de chaque joueur (disjoints)
+        claire: masque de 3 bits des faces claires
+    Postconditions: renvoie le score de la fenêtre
+    '''
+    def valeur(jetons, autres):
+        nombre = jetons.bit_count()
+        return _valeur(nombre, 3 - nombre - autres.bit_count(), claire & jetons in (0, jetons))
+
+    return valeur(mien, adverse) - valeur(adverse, mien)
+
+
+def _calculer_scores():
+    '''
+    Précalcule le score de chaque indice de fenêtre
+    Préconditions: aucune
+    Postconditions: renvoie un tuple de 512 scores (0 pour les indices impossibles)
+    '''
+    scores = []
+    for indice in range(512):
+        mien, adverse, claire = indice & 7, indice >> 3 & 7, indice >> 6
+        if mien & adverse or claire & ~(mien | adverse):
+            scores.append(0)
+        else:
+            scores.append(_score_motif(mien, adverse, claire))
+    return tuple(scores)
+
+
+_SCORES = _calculer_scores()
+
+
+def _calculer_fenetres():
+    '''
+    Précalcule l'extraction des 3 bits de chaque fenêtre
+    Préconditions: aucune
+    Postconditions: renvoie un tuple de (debut, selection, multiplicateur, decalage)
+    '''
+    fenetres = []
+    for masque in LIGNES:
+        cases = [case for case in range(masque.bit_length()) if masque >> case & 1]
+        debut, pas = cases[0], cases[1] - cases[0]
+        selection = 0
+        for voie in range(3):
+            selection |= (1 | 1 << pas | 1 << (2 * pas)) << (voie * _VOIE)
+        if pas == 1:
+            # Cases contiguës : les bits sont déjà côte à côte
+            multiplicateur, decalage = 1, 0
+        else:
+            # Rapproche les bits 0, pas et 2*pas aux positions 2*pas, 2*pas+1 et 2*pas+2
+            multiplicateur = 1 << 2 | 1 << (pas + 1) | 1 << (2 * pas)
+            decalage = 2 * pas
+        fenetres.append((debut, selection, multiplicateur, decalage))
+    return tuple(fenetres)
+
+
+_FENETRES = _calculer_fenetres()
+
+
+def evaluer_motifs(plateau, joueur):
+    '''
+    Évalue une position en sommant les scores des 24 fenêtres
+    Préconditions:
+        plateau: objet Plateau
+        joueur: "joueur1" ou "joueur2"
+    Postconditions: renvoie un score (plus élevé = meilleur pour joueur)
+    '''
+    occupation = plateau.occupation
+    position = (occupation[joueur] | occupation[ADVERSAIRE[joueur]] << _VOIE
+                | plateau.claire << (2 * _VOIE))
+    scores = _SCORES
+    score = 0
+    for debut, selection, multiplicateur, decalage in _FENETRES:
+        motif = ((position >> debut) & selection) * multiplicateur >> decalage
+        score += scores[(motif & 7) | (motif >> _DECALAGE_ADVERSE & 0o70)
+                        | (motif >> _DECALAGE_CLAIRE & 0o700)]
+    return score
+
+
+# Valeurs des lignes de chaque longueur d'alignement, calculées au premier usage
+_VALEURS = {}
+
+
+def _valeurs(alignement):
+    '''
+    Table des valeurs d'une ligne
+    Préconditions:
+        alignement: longueur des lignes
+    Postconditions: renvoie une table t telle que t[nombre][autres][meme_face] vaut
+                    _valeur(nombre, alignement - nombre - autres, meme_face, alignement)
+    '''
+    if alignement not in _VALEURS:
+        _VALEURS[alignement] = tuple(
+            tuple((_valeur(nombre, alignement - nombre - autres, False, alignement),
+                   _valeur(nombre, alignement - nombre - autres, True, alignement))
+                  for autres in range(alignement + 1))
+            for nombre in range(alignement + 1))
+    return _VALEURS[alignement]
+
+
+def evaluer_lignes(plateau, joueur):
+    '''
+    Évalue une position de n'importe quelle variante en parcourant ses lignes
+    Préconditions:
+        plateau: objet Plateau
+        joueur: "joueur1" ou "joueur2"
+    Postconditions: renvoie un score (plus élevé = meilleur pour joueur) ;
+                    sur le plateau classique, le même que evaluer_motifs
+    '''
+    configuration = plateau.configuration
+    valeurs = _valeurs(configuration.alignement)
+    mien = plateau.occupation[joueur]
+    adverse = plateau.occupation[ADVERSAIRE[joueur]]
+    claire = plateau.claire
+    score = 0
+    for ligne in configuration.lignes:
+        jetons = mien & ligne
+        autres = adverse & ligne
+        if not (jetons or autres):
+            continue
+        nombre = jetons.bit_count()
+        nombre_autres = autres.bit_count()
+        score += (valeurs[nombre][nombre_autres][claire & jetons in (0, jetons)]
+                  - valeurs[nombre_autres][nombre][claire & autres in (0, autres)])
+    return score
+
+
+def evaluateur(configuration):
+    '''
+    Fonction d'évaluation adaptée à une variante
+    Préconditions:
+        configuration: objet Configuration
+    Postconditions: renvoie evaluer_motifs pour le jeu classique, evaluer_lignes sinon
+    '''
+    return evaluer_motifs if configuration is CLASSIQUE else evaluer_lignes
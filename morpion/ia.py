@@ -0,0 +1,339 @@
+'''
+Intelligence artificielle du jeu
+'''
+import os
+import random
+import time
+
+from .evaluation import evaluateur
+from .plateau import CLASSIQUE, coup_vers_dict, dict_vers_coup
+from .recherche import Recherche
+from .statistiques import Statistiques, StatistiquesCoup
+from .transposition import MEMOIRE_DEFAUT, TableTransposition
+
+
+class IA:
+    '''
+    Classe pour l'intelligence artificielle
+    '''
+    # Temps de réflexion par coup (en secondes) de chaque niveau ; "mcts" joue par
+    # recherche Monte-Carlo, les autres par recherche alpha-bêta
+    BUDGETS = {"facile": 0.05, "moyen": 0.5, "difficile": 2.0, "mcts": 2.0}
+
+    # Mémoire allouée à la table de transposition partagée entre les coups
+    MEMOIRE_TABLE = MEMOIRE_DEFAUT
+    _table = None
+
+    # Évaluation des feuilles par lot avec NumPy, si NumPy est installé
+    EVALUATION_LOT = True
+    _lot = None
+
+    # Nombre de processus cherchant les coups de la racine (None pour tous les coeurs)
+    PROCESSUS = None
+    _parallele = None
+
+    # Recherche en cours, que IA.interrompre peut arrêter depuis un autre thread
+    _recherche_en_cours = None
+
+    # Livre d'ouvertures et table de finales consultés avant toute recherche
+    livre = None
+    tablebase = None
+
+    # Mesures des derniers coups de jouer_difficile (voir Statistiques.ouvrir_journal)
+    statistiques = Statistiques()
+
+    @staticmethod
+    def charger_livre(chemin):
+        '''
+        Charge un livre d'ouvertures construit par morpion.ouvertures
+        Préconditions:
+            chemin: chemin du fichier du livre
+        Postconditions: les positions du livre sont jouées sans recherche
+        '''
+        from .ouvertures import Livre
+
+        IA.livre = Livre(chemin)
+
+    @staticmethod
+    def charger_tablebase(chemin):
+        '''
+        Charge une table de finales construite par morpion.tablebase
+        Préconditions:
+            chemin: chemin du fichier de la table
+        Postconditions: les positions couvertes sont jouées parfaitement, sans recherche.
+                        Seules le sont les parties du plateau 4x4 jouées avec le nombre
+                        de jetons de la table (3 par défaut) : le jeu à 8 jetons n'en
+                        profite jamais.
+        '''
+        # Import tardif : la table est facultative et ne doit pas ralentir l'import du moteur
+        from .tablebase import Tablebase
+
+        if IA.tablebase is not None:
+            IA.tablebase.fermer()
+        IA.tablebase = Tablebase(chemin)
+
+    @staticmethod
+    def table_transposition():
+        '''
+        Renvoie la table de transposition partagée, créée au premier appel
+        Préconditions: aucune
+        Postconditions: renvoie un objet TableTransposition de IA.MEMOIRE_TABLE octets
+        '''
+        if IA._table is None:
+            IA._table = TableTransposition(IA.MEMOIRE_TABLE)
+        return IA._table
+
+    @staticmethod
+    def recherche_parallele():
+        '''
+        Renvoie la recherche parallèle partagée, démarrée au premier appel
+        Préconditions: aucune
+        Postconditions: renvoie un objet RechercheParallele de IA.PROCESSUS processus,
+                        ou None si un seul processus est disponible
+        '''
+        processus = IA.PROCESSUS or os.cpu_count() or 1
+        if processus <= 1:
+            return None
+        if IA._parallele is not None and IA._parallele.processus != processus:
+            IA.arreter_processus()
+        if IA._parallele is None:
+            # Import tardif : les processus ne sont démarrés qu'au premier coup cherché
+            from .parallele import RechercheParallele
+
+            IA._parallele = RechercheParallele(processus)
+        return IA._parallele
+
+    @staticmethod
+    def arreter_processus():
+        '''
+        Arrête les processus de la recherche parallèle
+        Préconditions: aucune
+        Postconditions: les processus seront redémarrés au prochain coup cherché
+        '''
+        if IA._parallele is not None:
+            IA._parallele.fermer()
+            IA._parallele = None
+
+    @staticmethod
+    def evaluateur_lot():
+        '''
+        Renvoie l'évaluation par lot des feuilles, chargée au premier appel
+        Préconditions: aucune
+        Postconditions: renvoie (evaluer_lot, taille minimale d'un lot),
+                        ou (None, 0) si NumPy est absent ou IA.EVALUATION_LOT est faux
+        '''
+        if not IA.EVALUATION_LOT:
+            return None, 0
+        if IA._lot is None:
+            # Import tardif : NumPy est facultatif et long à importer
+            from . import lot
+
+            IA._lot = (lot.evaluer_lot, lot.TAILLE_LOT_MIN) if lot.DISPONIBLE else (None, 0)
+        return IA._lot
+
+    @staticmethod
+    def jouer_facile(plateau, joueur, jetons_restants=None):
+        '''
+        IA facile - joue aléatoirement
+        Préconditions:
+            plateau: objet Plateau
+            joueur: "joueur1" ou "joueur2"
+            jetons_restants: nombre de jetons restants (None pour le déduire du plateau)
+        Postconditions: renvoie (action, params) pour un coup valide
+        '''
+        if jetons_restants is None:
+            jetons_restants = plateau.jetons_par_joueur - plateau.occupation[joueur].bit_count()
+        occupe = plateau.occupation["joueur1"] | plateau.occupation["joueur2"]
+        bits = plateau.configuration.bits
+
+        # Choisir un jeton à retourner et sa destination
+        source = destination = None
+        if occupe:
+            glissements = list(plateau.glissements(joueur))
+            if glissements:
+                source, destination = random.choice(glissements)
+                occupe = occupe & ~bits[source] | bits[destination]
+
+        # Choisir une case vide pour placer
+        case = face = None
+        if jetons_restants > 0:
+            case = random.choice([i for i in range(len(bits)) if not occupe & bits[i]])
+            face = random.choice([True, False])
+
+        return coup_vers_dict((source, destination, case, face), plateau.configuration)
+
+    @staticmethod
+    def jouer_difficile(plateau, joueur, jetons_restants=None, budget=None, annulation=None,
+                        statistiques=None):
+        '''
+        IA difficile - recherche alpha-bêta sous budget de temps
+        Préconditions:
+            plateau: objet Plateau
+            joueur: "joueur1" ou "joueur2"
+            jetons_restants: nombre de jetons restants (la recherche le déduit du plateau)
+            budget: temps de réflexion en secondes (None pour le niveau "difficile")
+            annulation: threading.Event qui interrompt la recherche quand il est posé,
+                        même avant qu'elle commence, ou None
+            statistiques: objet Statistiques qui reçoit les mesures du coup
+                          (None pour IA.statistiques)
+        Postconditions: renvoie (action, params) pour le meilleur coup trouvé dans le budget ;
+                        le livre et la table de finales ne servent qu'au jeu classique
+        '''
+        debut = time.perf_counter()
+        if statistiques is None:
+            statistiques = IA.statistiques
+        configuration = plateau.configuration
+        classique = configuration is CLASSIQUE
+        if IA.livre is not None and classique:
+            coup = IA.livre.coup(plateau, joueur)
+            if coup:
+                statistiques.ajouter(StatistiquesCoup(plateau, joueur, "livre", coup,
+                                                      time.perf_counter() - debut, variante=[coup]))
+                return coup_vers_dict(coup)
+
+        if IA.tablebase is not None and classique:
+            reponse = IA.tablebase.meilleur_coup(plateau, joueur)
+            if reponse:
+                statistiques.ajouter(StatistiquesCoup(plateau, joueur, "tablebase", reponse[0],
+                                                      time.perf_counter() - debut,
+                                                      variante=[reponse[0]]))
+                return coup_vers_dict(reponse[0])
+
+        if budget is None:
+            budget = IA.BUDGETS["difficile"]
+
+        parallele = IA.recherche_parallele()
+        try:
+            if parallele is not None:
+                IA._recherche_en_cours = parallele
+                coup, score = parallele.meilleur_coup(plateau, joueur, budget, annulation=annulation)
+                source, variante = "parallele", parallele.variante or [coup]
+                succes, sondages = parallele.succes_table, parallele.sondages_table
+                recherche = parallele
+            else:
+                # Les feuilles de la recherche ne sont jamais gagnantes : les motifs suffisent
+                evaluer_lot, taille_lot_min = IA.evaluateur_lot() if classique else (None, 0)
+                recherche = Recherche(evaluateur(configuration), budget, table=IA.table_transposition(),
+                                      evaluer_lot=evaluer_lot,
+                                      taille_lot_min=max(taille_lot_min, 1),
+                                      annulation=annulation)
+                IA._recherche_en_cours = recherche
+                coup, score = recherche.meilleur_coup(plateau, joueur)
+                source, variante = "recherche", []
+                if coup:
+                    variante = recherche.variante_principale(plateau, joueur, coup,
+                                                             max(recherche.profondeur_atteinte, 1))
+                succes, sondages = recherche.sondages_table()
+        finally:
+            IA._recherche_en_cours = None
+            if parallele is not None:
+                # Une interruption arrivée pendant la recherche ne vaut pas pour la suivante
+                parallele.reprendre()
+
+        if coup:
+            statistiques.ajouter(StatistiquesCoup(
+                plateau, joueur, source, coup, time.perf_counter() - debut,
+                recherche.noeuds, recherche.evaluations, succes, sondages,
+                recherche.profondeur_atteinte, score, variante))
+            return coup_vers_dict(coup, configuration)
+        else:
+            reponse = IA.jouer_facile(plateau, joueur, jetons_restants)
+            statistiques.ajouter(StatistiquesCoup(plateau, joueur, "hasard",
+                                                  dict_vers_coup(reponse, configuration),
+                                                  time.perf_counter() - debut))
+            return reponse
+
+    @staticmethod
+    def jouer_mcts(plateau, joueur, jetons_restants=None, budget=None, annulation=None,
+                   statistiques=None):
+        '''
+        IA Monte-Carlo - recherche arborescente UCT sous budget de temps
+        Préconditions:
+            plateau: objet Plateau
+            joueur: "joueur1" ou "joueur2"
+            jetons_restants: nombre de jetons restants (la recherche le déduit du plateau)
+            budget: temps de réflexion en secondes (None pour le niveau "mcts")
+            annulation, statistiques: comme pour jouer_difficile
+        Postconditions: renvoie (action, params) pour le coup le plus exploré ;
+                        hors du jeu classique, joue comme jouer_difficile
+        '''
+        if budget is None:
+            budget = IA.BUDGETS["mcts"]
+        if plateau.configuration is not CLASSIQUE:
+            # Les simulations et le codage des coups de l'arbre supposent le plateau 4x4
+            return IA.jouer_difficile(plateau, joueur, jetons_restants, budget, annulation, statistiques)
+        if statistiques is None:
+            statistiques = IA.statistiques
+
+        from .mcts import Mcts
+
+        mcts = Mcts(budget, annulation=annulation)
+        IA._recherche_en_cours = mcts
+        try:
+            coup, _ = mcts.meilleur_coup(plateau, joueur)
+        finally:
+            IA._recherche_en_cours = None
+
+        if not coup:
+            reponse = IA.jouer_facile(plateau, joueur, jetons_restants)
+            statistiques.ajouter(StatistiquesCoup(plateau, joueur, "hasard", dict_vers_coup(reponse),
+                                                  mcts.duree))
+            return reponse
+        statistiques.ajouter(StatistiquesCoup(
+            plateau, joueur, "mcts", coup, mcts.duree, noeuds=mcts.noeuds,
+            profondeur=mcts.profondeur_atteinte, variante=mcts.variante_principale(),
+            simulations=mcts.simulations))
+        return coup_vers_dict(coup)
+
+    @staticmethod
+    def interrompre():
+        '''
+        Interrompt la recherche en cours, depuis un autre thread
+        Préconditions: aucune
+        Postconditions: le coup en cours de calcul est renvoyé au plus tôt ; sans effet si
+                        aucune recherche n'a encore commencé (pour interrompre à coup sûr
+                        une demande donnée, lui passer un événement d'annulation)
+        '''
+        recherche = IA._recherche_en_cours
+        if recherche is not None:
+            recherche.interrompre()
+
+    @staticmethod
+    def jouer(plateau, joueur, jetons_restants=None, niveau="difficile", annulation=None,
+              statistiques=None):
+        '''
+        Fait jouer l'IA au niveau demandé
+        Préconditions:
+            plateau: objet Plateau
+            joueur: "joueur1" ou "joueur2"
+            jetons_restants: nombre de jetons restants
+            niveau: clé de IA.BUDGETS
+            annulation, statistiques: comme pour jouer_difficile
+        Postconditions: renvoie (action, params) ; hormis "mcts", seul le temps de réflexion
+                        dépend du niveau
+        '''
+        if niveau == "mcts":
+            return IA.jouer_mcts(plateau, joueur, jetons_restants, IA.BUDGETS[niveau],
+                                 annulation, statistiques)
+        return IA.jouer_difficile(plateau, joueur, jetons_restants, IA.BUDGETS[niveau],
+                                  annulation, statistiques)
+
+    @staticmethod
+    def evaluer_plateau(plateau, joueur):
+        '''
+        Évalue la qualité d'une position
+        Préconditions:
+            plateau: objet Plateau
+            joueur: "joueur1" ou "joueur2"
+        Postconditions: renvoie un score (plus élevé = meilleur)
+        '''
+        adversaire = "joueur1" if joueur == "joueur2" else "joueur2"
+
+        # Vérifier si victoire
+        if plateau.verifier_alignement(joueur):
+            return 10000
+        if plateau.verifier_alignement(adversaire):
+            return -10000
+
+        # Alignements partiels dans les quatre directions
+        return evaluateur(plateau.configuration)(plateau, joueur)
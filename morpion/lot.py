@@ -0,0 +1,75 @@
+'''
+Évaluation vectorisée d'un lot de positions avec NumPy
+
+Les positions sont encodées en un tableau N x 3 x 16 (jetons du joueur,
+jetons adverses et faces claires, une colonne par case). Les 24 fenêtres
+sont lues d'un seul coup par indexation, leurs indices de 9 bits calculés
+par un produit avec les poids des bits, puis les scores de la table de
+motifs sont sommés par ligne. Le résultat est identique à evaluer_motifs.
+
+NumPy est facultatif : sans lui, DISPONIBLE vaut False et le moteur
+évalue les positions une à une.
+'''
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .evaluation import _SCORES
+from .plateau import LIGNES, TAILLE
+
+DISPONIBLE = np is not None
+
+# En dessous de ce nombre de positions, l'appel à NumPy coûte plus qu'il ne rapporte
+TAILLE_LOT_MIN = 24
+
+if DISPONIBLE:
+    _CASES = np.arange(TAILLE * TAILLE, dtype=np.uint32)
+
+    # Cases de chaque fenêtre, dans l'ordre des bits de l'indice (24 x 3)
+    _FENETRES = np.array(
+        [[case for case in range(masque.bit_length()) if masque >> case & 1] for masque in LIGNES],
+        dtype=np.intp,
+    )
+
+    # Poids des 9 bits de l'indice : plan (joueur, adversaire, claire) x case de la fenêtre
+    _POIDS = (1 << np.arange(9, dtype=np.int32)).reshape(3, 3)
+
+    _TABLE = np.array(_SCORES, dtype=np.int32)
+
+
+def encoder(mien, adverse, claire):
+    '''
+    Encode des positions en plans de cases
+    Préconditions:
+        mien, adverse, claire: séquences de même longueur N de masques de 16 bits
+    Postconditions: renvoie un tableau uint8 de forme (N, 3, 16) valant 1 sur les
+                    cases occupées par le joueur, par l'adversaire et montrant leur face claire
+    '''
+    masques = np.array([mien, adverse, claire], dtype=np.uint32).T
+    return (masques[:, :, None] >> _CASES & 1).astype(np.uint8)
+
+
+def evaluer_plans(plans):
+    '''
+    Évalue un lot de positions encodées par encoder
+    Préconditions:
+        plans: tableau de forme (N, 3, 16)
+    Postconditions: renvoie un tableau de N scores, du point de vue du joueur
+    '''
+    # (N, 3, 24, 3) -> indices (N, 24) -> somme des scores des fenêtres
+    fenetres = plans[:, :, _FENETRES]
+    indices = np.einsum("npfc,pc->nf", fenetres, _POIDS, dtype=np.int32)
+    return _TABLE[indices].sum(axis=1)
+
+
+def evaluer_lot(mien, adverse, claire):
+    '''
+    Évalue un lot de positions décrites par leurs masques
+    Préconditions:
+        mien, adverse, claire: séquences de même longueur de masques de 16 bits
+    Postconditions: renvoie la liste des scores, égaux à ceux de evaluer_motifs
+    '''
+    if not mien:
+        return []
+    return evaluer_plans(encoder(mien, adverse, claire)).tolist()
@@ -0,0 +1,386 @@
+'''
+Recherche arborescente Monte-Carlo (UCT)
+
+Chaque itération descend l'arbre en choisissant l'enfant de meilleure borne
+UCB1, ajoute les enfants de la feuille atteinte, puis termine la partie au
+hasard (simulation) et remonte le résultat. Les simulations suivent la
+politique de IA.jouer_facile (glissement puis pose au hasard) mais
+travaillent directement sur des entiers : aucun objet n'est créé pendant
+une simulation.
+
+Les fins de partie rencontrées dans l'arbre sont des résultats prouvés :
+ils remontent comme en minimax (un coup gagnant prouve la position, tous
+les coups perdants aussi), les coups prouvés perdants ne sont plus explorés
+et un coup prouvé gagnant est joué aussitôt.
+
+L'arbre est rangé dans des tableaux (module array) : un noeud occupe une
+vingtaine d'octets, et les enfants d'un noeud sont contigus. Au-delà de
+NOEUDS_MAX noeuds, l'arbre cesse de grandir et les itérations se
+contentent de simuler.
+'''
+import math
+import random
+import time
+from array import array
+
+from .enregistrement import decoder_coup, encoder_coup
+from .plateau import ADVERSAIRE, BITS, LIGNES, PLEIN, VOISINS
+
+# Constante d'exploration de UCB1
+EXPLORATION = 1.4
+
+# Nombre maximal de noeuds de l'arbre
+NOEUDS_MAX = 1000000
+
+# Résultat prouvé d'un noeud, pour le joueur qui a joué le coup qui y mène
+INCONNU = 0
+GAGNANT = 1
+PERDANT = -1
+
+# Au-delà, une simulation est déclarée nulle (les deux joueurs n'ont plus de jetons)
+PLIS_SIMULATION = 100
+
+# Cases voisines de chaque case, sous forme de masque
+_VOISINS_MASQUE = tuple(sum(BITS[voisin] for voisin in voisins) for voisins in VOISINS)
+
+# Lignes gagnantes passant par chaque case
+_LIGNES_PAR_CASE = tuple(tuple(ligne for ligne in LIGNES if ligne & bit) for bit in BITS)
+
+
+def _aligne(jetons, claire, case):
+    '''
+    Indique si un jeton posé en case complète un alignement
+    Préconditions:
+        jetons: masque des jetons d'un joueur, case comprise
+        claire: masque des faces claires
+    Postconditions: renvoie True si une ligne passant par case porte trois jetons
+                    du joueur de même face
+    '''
+    claires = jetons & claire
+    sombres = jetons & ~claire
+    for ligne in _LIGNES_PAR_CASE[case]:
+        if claires & ligne == ligne or sombres & ligne == ligne:
+            return True
+    return False
+
+
+def simuler(mien, adverse, claire, restants_mien, restants_adverse,
+            plis=PLIS_SIMULATION, aleatoire=random.random):
+    '''
+    Termine une partie au hasard, sans allocation
+    Préconditions:
+        mien, adverse: masques des jetons du joueur au trait et de son adversaire
+        claire: masque des faces claires
+        restants_mien, restants_adverse: jetons restant à poser de chacun
+        plis: nombre de demi-coups au-delà duquel la partie est nulle
+        aleatoire: fonction renvoyant un flottant dans [0, 1)
+    Postconditions: renvoie 1 si le joueur au trait gagne, -1 s'il perd, 0 pour un nul
+    '''
+    signe = 1
+    for _ in range(plis):
+        vides = PLEIN & ~(mien | adverse)
+
+        # Glissement : un jeton adverse vers une case vide voisine, tiré uniformément
+        total = 0
+        jetons = adverse
+        while jetons:
+            bit = jetons & -jetons
+            jetons ^= bit
+            total += (_VOISINS_MASQUE[bit.bit_length() - 1] & vides).bit_count()
+        if total:
+            rang = int(aleatoire() * total)
+            jetons = adverse
+            while True:
+                source = jetons & -jetons
+                jetons ^= source
+                destinations = _VOISINS_MASQUE[source.bit_length() - 1] & vides
+                nombre = destinations.bit_count()
+                if rang < nombre:
+                    break
+                rang -= nombre
+            for _ in range(rang):
+                destinations &= destinations - 1
+            destination = destinations & -destinations
+            adverse ^= source | destination
+            if not claire & source:
+                claire |= destination
+            claire &= ~source
+            # Le retournement est joué avant la pose : l'alignement adverse prime
+            if _aligne(adverse, claire, destination.bit_length() - 1):
+                return -signe
+            vides ^= source | destination
+        elif not restants_mien:
+            return 0
+
+        # Pose sur une case vide, face au hasard
+        if restants_mien:
+            rang = int(aleatoire() * vides.bit_count())
+            for _ in range(rang):
+                vides &= vides - 1
+            case = vides & -vides
+            mien |= case
+            if aleatoire() < 0.5:
+                claire |= case
+            restants_mien -= 1
+            if _aligne(mien, claire, case.bit_length() - 1):
+                return signe
+
+        mien, adverse = adverse, mien
+        restants_mien, restants_adverse = restants_adverse, restants_mien
+        signe = -signe
+    return 0
+
+
+class Mcts:
+    '''
+    Joueur Monte-Carlo (UCT) sous budget de temps
+    '''
+    def __init__(self, budget=0.5, exploration=EXPLORATION, noeuds_max=NOEUDS_MAX, annulation=None):
+        '''
+        Initialise le joueur
+        Préconditions:
+            budget: temps de réflexion par coup, en secondes
+            exploration: constante d'exploration de UCB1
+            noeuds_max: nombre maximal de noeuds de l'arbre
+            annulation: threading.Event qui interrompt la recherche quand il est posé, ou None
+        Postconditions: crée un joueur prêt à chercher
+        '''
+        self.budget = budget
+        self.exploration = exploration
+        self.noeuds_max = noeuds_max
+        self.simulations = 0
+        self.duree = 0.0
+        self.profondeur_atteinte = 0
+        self._limite = 0.0
+        # Demande d'interruption : meilleur_coup ne l'efface jamais, seul l'appelant le fait
+        self._interrompu = False
+        self.annulation = annulation
+        self._vider()
+
+    def _vider(self):
+        '''
+        Remplace l'arbre par une racine seule
+        Préconditions: aucune
+        Postconditions: l'arbre compte un noeud, jamais visité
+        '''
+        # Noeud i : coup qui y mène, premier enfant (0 : pas encore développé),
+        # nombre d'enfants, visites, gains (1 par victoire, 0,5 par nul) et résultat
+        # prouvé, du point de vue du joueur qui a joué le coup
+        self._coups = array("H", [0])
+        self._premiers = array("i", [0])
+        self._nombres = array("H", [0])
+        self._visites = array("i", [0])
+        self._gains = array("f", [0.0])
+        self._preuves = array("b", [INCONNU])
+
+    @property
+    def noeuds(self):
+        '''
+        Nombre de noeuds de l'arbre
+        Préconditions: aucune
+        Postconditions: renvoie un entier >= 1
+        '''
+        return len(self._visites)
+
+    @property
+    def simulations_par_seconde(self):
+        '''
+        Débit de la dernière recherche
+        Préconditions: aucune
+        Postconditions: renvoie le nombre de simulations par seconde (0 avant toute recherche)
+        '''
+        return self.simulations / self.duree if self.duree else 0.0
+
+    def meilleur_coup(self, plateau, joueur):
+        '''
+        Cherche le meilleur coup jusqu'à épuisement du budget
+        Préconditions:
+            plateau: objet Plateau (n'est pas modifié)
+            joueur: "joueur1" ou "joueur2", le joueur au trait
+        Postconditions: renvoie (coup, taux de gain estimé) ; coup vaut None si aucun
+                        coup n'est légal. Le coup est l'enfant le plus visité de la racine.
+        '''
+        debut = time.perf_counter()
+        self._limite = debut + self.budget
+        self.simulations = 0
+        self.profondeur_atteinte = 0
+        self._vider()
+        if not self._developper(0, plateau, joueur):
+            self.duree = time.perf_counter() - debut
+            return None, 0.0
+        if self._nombres[0] > 1:
+            while (not self._preuves[0] and not self._interrompu
+                   and not (self.annulation is not None and self.annulation.is_set())
+                   and time.perf_counter() < self._limite):
+                self._iterer(plateau, joueur)
+        self.duree = time.perf_counter() - debut
+
+        enfant = self._plus_visite(0)
+        visites = self._visites[enfant]
+        return decoder_coup(self._coups[enfant]), self._gains[enfant] / visites if visites else 0.0
+
+    def variante_principale(self):
+        '''
+        Suite des coups les plus visités depuis la racine de la dernière recherche
+        Préconditions: meilleur_coup a été appelé
+        Postconditions: renvoie la liste des coups
+        '''
+        variante = []
+        noeud = 0
+        while self._premiers[noeud]:
+            noeud = self._plus_visite(noeud)
+            if not self._visites[noeud]:
+                break
+            variante.append(decoder_coup(self._coups[noeud]))
+        return variante
+
+    def interrompre(self):
+        '''
+        Arrête au plus tôt la recherche en cours, depuis un autre thread
+        Préconditions: aucune
+        Postconditions: meilleur_coup renvoie le coup le plus visité jusque-là ; la
+                        demande vaut aussi pour une recherche qui n'a pas encore commencé
+                        et reste posée jusqu'à ce que l'appelant appelle reprendre
+        '''
+        self._interrompu = True
+
+    def reprendre(self):
+        '''
+        Efface une demande d'interruption
+        Préconditions: aucune
+        Postconditions: les recherches suivantes disposent de tout leur budget
+        '''
+        self._interrompu = False
+
+    def _plus_visite(self, noeud):
+        '''
+        Meilleur enfant d'un noeud développé
+        Préconditions:
+            noeud: noeud ayant au moins un enfant
+        Postconditions: renvoie l'indice d'un enfant prouvé gagnant s'il y en a, sinon
+                        de l'enfant le plus visité parmi ceux qui ne sont pas prouvés
+                        perdants (le premier en cas d'égalité)
+        '''
+        premier = self._premiers[noeud]
+        visites = self._visites
+        preuves = self._preuves
+        return max(range(premier, premier + self._nombres[noeud]),
+                   key=lambda enfant: (preuves[enfant], visites[enfant]))
+
+    def _developper(self, noeud, plateau, joueur):
+        '''
+        Ajoute les enfants d'un noeud
+        Préconditions:
+            noeud: noeud pas encore développé, dans la position plateau avec joueur au trait
+        Postconditions: renvoie le nombre d'enfants ajoutés (0 si aucun coup n'est légal)
+        '''
+        coups = [encoder_coup(coup) for coup in plateau.coups_legaux(joueur)]
+        if coups:
+            self._premiers[noeud] = len(self._coups)
+            self._nombres[noeud] = len(coups)
+            zeros = [0] * len(coups)
+            self._coups.extend(coups)
+            self._premiers.extend(zeros)
+            self._nombres.extend(zeros)
+            self._visites.extend(zeros)
+            self._gains.extend(zeros)
+            self._preuves.extend(zeros)
+        return len(coups)
+
+    def _choisir(self, noeud):
+        '''
+        Enfant d'un noeud développé à explorer
+        Préconditions:
+            noeud: noeud ayant au moins un enfant
+        Postconditions: renvoie le premier enfant jamais visité, sinon celui de meilleure
+                        borne UCB1 parmi les enfants qui ne sont pas prouvés perdants
+        '''
+        premier = self._premiers[noeud]
+        visites = self._visites
+        gains = self._gains
+        preuves = self._preuves
+        facteur = self.exploration * math.sqrt(math.log(visites[noeud] or 1))
+        meilleur, meilleure_borne = premier, -1.0
+        for enfant in range(premier, premier + self._nombres[noeud]):
+            n = visites[enfant]
+            if not n:
+                return enfant
+            if preuves[enfant] == PERDANT:
+                continue
+            borne = gains[enfant] / n + facteur / math.sqrt(n)
+            if borne > meilleure_borne:
+                meilleur, meilleure_borne = enfant, borne
+        return meilleur
+
+    def _iterer(self, racine, joueur):
+        '''
+        Effectue une itération : sélection, développement, simulation, rétropropagation
+        Préconditions:
+            racine: position de la racine, joueur au trait
+        Postconditions: les visites et gains du chemin parcouru sont mis à jour
+        '''
+        plateau = racine.copier()
+        noeud = 0
+        chemin = [0]
+        # Résultat de la partie du point de vue du joueur au trait dans la feuille
+        resultat = None
+        while True:
+            if not self._premiers[noeud]:
+                if self._visites[noeud] and len(self._coups) < self.noeuds_max:
+                    if not self._developper(noeud, plateau, joueur):
+                        resultat = 0
+                        break
+                else:
+                    break
+            noeud = self._choisir(noeud)
+            chemin.append(noeud)
+            plateau.jouer_coup(decoder_coup(self._coups[noeud]), joueur)
+            adversaire = ADVERSAIRE[joueur]
+            if plateau.verifier_alignement(adversaire):
+                # Le joueur qui vient de jouer a aligné les jetons adverses : il perd
+                resultat = 1
+                self._prouver(chemin, PERDANT)
+                break
+            if plateau.verifier_alignement(joueur):
+                resultat = -1
+                self._prouver(chemin, GAGNANT)
+                break
+            joueur = adversaire
+
+        if resultat is None:
+            resultat = simuler(plateau.occupation[joueur], plateau.occupation[ADVERSAIRE[joueur]],
+                               plateau.claire,
+                               plateau.jetons_par_joueur - plateau.occupation[joueur].bit_count(),
+                               plateau.jetons_par_joueur
+                               - plateau.occupation[ADVERSAIRE[joueur]].bit_count())
+        self.simulations += 1
+        self.profondeur_atteinte = max(self.profondeur_atteinte, len(chemin) - 1)
+
+        visites = self._visites
+        gains = self._gains
+        for noeud in reversed(chemin):
+            # Un noeud compte les gains du joueur qui a joué le coup qui y mène
+            visites[noeud] += 1
+            gains[noeud] += (1 - resultat) / 2
+            resultat = -resultat
+
+    def _prouver(self, chemin, preuve):
+        '''
+        Enregistre une fin de partie et fait remonter les résultats prouvés
+        Préconditions:
+            chemin: noeuds de la racine à la fin de partie
+            preuve: GAGNANT ou PERDANT pour le joueur qui a joué le dernier coup
+        Postconditions: chaque ancêtre est prouvé perdant dès qu'un enfant est prouvé
+                        gagnant, et gagnant quand tous ses enfants sont prouvés perdants
+        '''
+        preuves = self._preuves
+        preuves[chemin[-1]] = preuve
+        for i in range(len(chemin) - 1, 0, -1):
+            parent = chemin[i - 1]
+            if preuves[chemin[i]] == GAGNANT:
+                preuves[parent] = PERDANT
+            else:
+                premier = self._premiers[parent]
+                if any(preuves[enfant] != PERDANT for enfant in range(premier, premier + self._nombres[parent])):
+                    return
+                preuves[parent] = GAGNANT
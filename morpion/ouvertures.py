@@ -0,0 +1,176 @@
+'''
+Livre d'ouvertures précalculé
+
+Le livre associe à chaque position canonique des premiers demi-coups le
+meilleur coup trouvé hors ligne par la recherche. Toutes les réponses
+adverses sont développées, si bien que le livre couvre n'importe quel
+début de partie jusqu'à la profondeur choisie.
+
+Format : un en-tête puis des entiers de 64 bits triés, valant
+cle << 15 | coup, où cle est la clé canonique et coup le coup codé sur
+15 bits dans l'orientation canonique.
+
+Usage: python -m morpion.ouvertures --plis 4 --budget 0.2 --sortie ouvertures.livre
+'''
+import argparse
+import bisect
+import struct
+import sys
+import time
+from array import array
+
+from .plateau import JETONS_PAR_JOUEUR, Plateau
+from .symetrie import canonique, depuis_cle, inverse, transformer_coup
+
+_MAGIQUE = b"MDRLIV01"
+_ENTETE = struct.Struct("<8sIIQ")
+_BITS_COUP = 15
+
+
+def coder_coup(coup):
+    '''
+    Code un coup sur 15 bits
+    Préconditions:
+        coup: tuple (source, destination, case, face)
+    Postconditions: renvoie un entier entre 0 et 2**15 - 1
+    '''
+    source, destination, case, face = coup
+    code = 0
+    if source is not None:
+        code |= 1 << 14 | source << 10 | destination << 6
+    if case is not None:
+        code |= 1 << 5 | case << 1 | bool(face)
+    return code
+
+
+def decoder_coup(code):
+    '''
+    Décode un coup codé par coder_coup
+    Préconditions:
+        code: entier sur 15 bits
+    Postconditions: renvoie le tuple (source, destination, case, face)
+    '''
+    source = destination = case = face = None
+    if code >> 14 & 1:
+        source = code >> 10 & 15
+        destination = code >> 6 & 15
+    if code >> 5 & 1:
+        case = code >> 1 & 15
+        face = bool(code & 1)
+    return (source, destination, case, face)
+
+
+class Livre:
+    '''
+    Livre d'ouvertures chargé en mémoire
+    '''
+    def __init__(self, chemin):
+        '''
+        Charge un livre construit par construire
+        Préconditions:
+            chemin: chemin du fichier du livre
+        Postconditions: charge les entrées ; lève ValueError si le fichier est invalide
+        '''
+        with open(chemin, "rb") as fichier:
+            entete = fichier.read(_ENTETE.size)
+            if len(entete) < _ENTETE.size or entete[:len(_MAGIQUE)] != _MAGIQUE:
+                raise ValueError(f"{chemin} n'est pas un livre d'ouvertures")
+            _, self.jetons, self.plis, nombre = _ENTETE.unpack(entete)
+            self._entrees = array("Q")
+            donnees = fichier.read(8 * nombre)
+            if len(donnees) != 8 * nombre:
+                raise ValueError(f"{chemin} est tronqué")
+            self._entrees.frombytes(donnees)
+
+    def __len__(self):
+        '''
+        Nombre de positions du livre
+        Préconditions: aucune
+        Postconditions: renvoie le nombre d'entrées
+        '''
+        return len(self._entrees)
+
+    def coup(self, plateau, joueur):
+        '''
+        Coup du livre pour une position
+        Préconditions:
+            plateau: objet Plateau
+            joueur: le joueur au trait
+        Postconditions: renvoie le coup dans l'orientation du plateau,
+                        ou None si la position est hors du livre
+        '''
+        if plateau.jetons_par_joueur != self.jetons:
+            return None
+        cle, transformation = canonique(plateau, joueur)
+        indice = bisect.bisect_left(self._entrees, cle << _BITS_COUP)
+        if indice == len(self._entrees) or self._entrees[indice] >> _BITS_COUP != cle:
+            return None
+        coup = decoder_coup(self._entrees[indice] & ((1 << _BITS_COUP) - 1))
+        return transformer_coup(coup, inverse(transformation))
+
+
+def construire(chemin, plis=4, budget=0.2, jetons=JETONS_PAR_JOUEUR, rapport=print):
+    '''
+    Calcule le livre d'ouvertures et l'écrit sur disque
+    Préconditions:
+        chemin: fichier du livre à produire
+        plis: nombre de demi-coups couverts depuis la position initiale
+        budget: temps de recherche par position, en secondes
+        jetons: nombre de jetons par joueur
+        rapport: fonction recevant les messages de progression
+    Postconditions: écrit le livre et renvoie son nombre de positions
+    '''
+    # Imports tardifs : seule la construction a besoin de la recherche
+    from .evaluation import evaluer_motifs
+    from .ia import IA
+    from .recherche import Recherche
+    from .tablebase import successeurs
+
+    recherche = Recherche(evaluer_motifs, budget, table=IA.table_transposition())
+    coups = {}
+    niveau = {canonique(Plateau(jetons), "joueur1")[0]}
+    for pli in range(plis):
+        debut = time.perf_counter()
+        suivants = set()
+        for cle in sorted(niveau):
+            # Le plateau reconstruit est déjà dans l'orientation canonique
+            plateau, joueur = depuis_cle(cle, jetons)
+            coup, _ = recherche.meilleur_coup(plateau, joueur)
+            if coup is None:
+                continue
+            coups[cle] = coup
+            if pli + 1 < plis:
+                for _, immediat, enfant in successeurs(plateau, joueur):
+                    if immediat is None and enfant not in coups:
+                        suivants.add(enfant)
+        rapport(f"Pli {pli}: {len(niveau)} positions ({time.perf_counter() - debut:.1f} s)")
+        niveau = suivants
+
+    entrees = array("Q", sorted(cle << _BITS_COUP | coder_coup(coup) for cle, coup in coups.items()))
+    with open(chemin, "wb") as fichier:
+        fichier.write(_ENTETE.pack(_MAGIQUE, jetons, plis, len(entrees)))
+        entrees.tofile(fichier)
+    rapport(f"Livre écrit dans {chemin}: {len(entrees)} positions")
+    return len(entrees)
+
+
+def main(args=None):
+    '''
+    Point d'entrée en ligne de commande
+    Préconditions:
+        args: liste d'arguments (None pour sys.argv)
+    Postconditions: construit le livre et renvoie 0
+    '''
+    parser = argparse.ArgumentParser(description="Construction du livre d'ouvertures")
+    parser.add_argument("--plis", type=int, default=4, help="demi-coups couverts")
+    parser.add_argument("--budget", type=float, default=0.2, help="secondes par position")
+    parser.add_argument("--jetons", type=int, default=JETONS_PAR_JOUEUR, help="jetons par joueur")
+    parser.add_argument("--sortie", required=True, help="fichier du livre")
+    options = parser.parse_args(args)
+
+    construire(options.sortie, options.plis, options.budget, options.jetons)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
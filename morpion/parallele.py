@@ -0,0 +1,253 @@
+'''
+Recherche parallèle des coups de la racine
+
+Les coups de la racine sont répartis entre des processus de travail
+(ProcessPoolExecutor) créés une fois pour toutes. L'approfondissement
+itératif avance au même pas dans tous les processus : une profondeur
+n'est retenue que lorsque tous les coups y ont été cherchés, et les
+résultats sont fusionnés dans l'ordre des coups, les égalités de score
+étant tranchées en faveur du premier coup.
+
+Chaque processus vide sa table de transposition au premier lot d'une
+nouvelle recherche, puis la garde d'une profondeur à l'autre pour ordonner
+les coups : le résultat ne dépend pas des tours précédents. Un lot peut
+cependant échoir à n'importe quel processus, si bien que le contenu de la
+table, donc l'élagage et parfois le score d'un lot, dépend de l'ordonnancement
+des lots aux profondeurs précédentes. Dépendent aussi de la machine la
+profondeur atteinte dans le budget et, d'un nombre de processus à l'autre,
+le découpage des lots.
+
+Les processus partagent un événement d'annulation, consulté par leur
+recherche comme l'horloge : une recherche interrompue arrête ses lots en
+quelques noeuds, et la suivante attend qu'ils soient arrêtés avant de
+lancer son horloge.
+'''
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+
+from .evaluation import evaluateur, evaluer_motifs
+from .plateau import Plateau
+from .recherche import SEUIL_VICTOIRE, VICTOIRE, Recherche
+from .transposition import MEMOIRE_DEFAUT, TableTransposition
+
+# Recherche et table de transposition propres à chaque processus de travail
+_recherche = None
+
+# Numéro de la recherche dont le processus de travail a cherché le dernier lot
+_numero_recherche = None
+
+
+def _initialiser(annulation):
+    '''
+    Prépare la recherche d'un processus de travail
+    Préconditions:
+        annulation: événement multiprocessing partagé avec le processus principal
+    Postconditions: la recherche du processus s'arrête dès que l'événement est posé
+    '''
+    global _recherche
+    _recherche = Recherche(evaluer_motifs, table=TableTransposition(MEMOIRE_DEFAUT),
+                           annulation=annulation)
+
+
+# Intervalle de vérification d'une demande d'interruption, en secondes
+_INTERVALLE_INTERRUPTION = 0.05
+
+
+def _chercher_coups(numero, position, joueur, coups, profondeur, budget):
+    '''
+    Cherche une partie des coups de la racine dans un processus de travail
+    Préconditions:
+        numero: numéro de la recherche parallèle dont le lot fait partie
+        position: tuple (joueur1, joueur2, claire, jetons_par_joueur, configuration) du plateau
+        joueur, coups, profondeur, budget: comme pour Recherche.chercher_coups
+    Postconditions: renvoie le résultat de Recherche.chercher_coups
+    '''
+    global _numero_recherche
+    recherche = _recherche
+    plateau = Plateau.depuis_masques(*position)
+    recherche.evaluer = evaluateur(plateau.configuration)
+    if numero != _numero_recherche:
+        # Nouvelle recherche : rien ne reste des tours précédents
+        recherche.table.vider()
+        _numero_recherche = numero
+    return recherche.chercher_coups(plateau, joueur, coups, profondeur, budget)
+
+
+class RechercheParallele:
+    '''
+    Recherche alpha-bêta dont les coups de la racine sont répartis entre processus
+    '''
+    def __init__(self, processus=None):
+        '''
+        Démarre les processus de travail
+        Préconditions:
+            processus: nombre de processus (None pour le nombre de coeurs)
+        Postconditions: crée un ProcessPoolExecutor réutilisé par toutes les recherches
+        '''
+        self.processus = processus or os.cpu_count() or 1
+        self._annulation = multiprocessing.Event()
+        self._executeur = ProcessPoolExecutor(self.processus, initializer=_initialiser,
+                                              initargs=(self._annulation,))
+        # Lots de la dernière recherche, peut-être encore en cours après une interruption
+        self._taches = []
+        # Numéro de la recherche en cours, transmis avec chaque lot
+        self._numero = 0
+        self.noeuds = 0
+        self.evaluations = 0
+        self.succes_table = 0
+        self.sondages_table = 0
+        self.profondeur_atteinte = 0
+        self.variante = []
+        self._interrompue = False
+
+    def meilleur_coup(self, plateau, joueur, budget=0.5, profondeur_max=32, annulation=None):
+        '''
+        Cherche le meilleur coup par approfondissement itératif parallèle
+        Préconditions:
+            plateau: objet Plateau (n'est pas modifié)
+            joueur: "joueur1" ou "joueur2", le joueur au trait
+            budget: temps de réflexion en secondes, compté une fois les processus libres
+            profondeur_max: profondeur maximale en coups complets
+            annulation: threading.Event qui interrompt la recherche quand il est posé,
+                        même avant qu'elle commence, ou None
+        Postconditions: renvoie (coup, score) comme Recherche.meilleur_coup ;
+                        la fusion des lots ne dépend pas de l'ordre d'arrivée des
+                        réponses, et le coup ne dépend pas des recherches passées
+        '''
+        self.noeuds = self.evaluations = self.succes_table = self.sondages_table = 0
+        self.profondeur_atteinte = 0
+        self.variante = []
+        self._liberer()
+        self._numero += 1
+        limite = time.perf_counter() + budget
+        coups = list(plateau.coups_legaux(joueur))
+        if not coups:
+            return None, 0
+        if len(coups) == 1:
+            return self._coup_de_secours(plateau, coups, joueur)
+
+        position = (plateau.occupation["joueur1"], plateau.occupation["joueur2"],
+                    plateau.claire, plateau.jetons_par_joueur, plateau.configuration)
+        meilleur, meilleur_score = None, -VICTOIRE
+        for profondeur in range(1, profondeur_max + 1):
+            restant = limite - time.perf_counter()
+            if restant <= 0 or self._arretee(annulation):
+                break
+            # Répartition en alternance : le meilleur coup précédent ouvre le premier lot
+            lots = [coups[debut::self.processus] for debut in range(self.processus)]
+            self._taches = [self._executeur.submit(_chercher_coups, self._numero, position, joueur,
+                                                   lot, profondeur, restant)
+                            for lot in lots if lot]
+            while wait(self._taches, _INTERVALLE_INTERRUPTION, FIRST_EXCEPTION).not_done:
+                if self._arretee(annulation):
+                    # Les lots en cours s'arrêtent d'eux-mêmes ; la recherche suivante les attendra
+                    self._annulation.set()
+                    break
+            termines = [(debut, tache.result()) for debut, tache in enumerate(self._taches)
+                        if tache.done()]
+            for _, (_, _, _, (noeuds, evaluations, succes, sondages)) in termines:
+                self.noeuds += noeuds
+                self.evaluations += evaluations
+                self.succes_table += succes
+                self.sondages_table += sondages
+            complets = [(debut, resultat) for debut, resultat in termines if resultat[0] is not None]
+            if len(complets) < len(self._taches):
+                if profondeur == 1 and complets:
+                    # Les lots terminés de la première profondeur restent fiables
+                    meilleur, meilleur_score, self.variante = self._fusionner(coups, complets)
+                break
+
+            meilleur, meilleur_score, self.variante = self._fusionner(coups, complets)
+            self.profondeur_atteinte = profondeur
+            if abs(meilleur_score) >= SEUIL_VICTOIRE:
+                break
+
+            coups.remove(meilleur)
+            coups.insert(0, meilleur)
+
+        if not self.profondeur_atteinte and meilleur_score <= -SEUIL_VICTOIRE:
+            # Première profondeur incomplète : ne pas jouer un coup perdant sans l'avoir cherché
+            secours = self._coup_de_secours(plateau, coups, joueur)
+            if meilleur is None or secours[1] > meilleur_score:
+                meilleur, meilleur_score = secours
+                self.variante = [meilleur]
+        return meilleur, meilleur_score
+
+    def _fusionner(self, coups, resultats):
+        '''
+        Fusionne les réponses des lots d'une même profondeur
+        Préconditions:
+            coups: coups de la racine, dans l'ordre de recherche
+            resultats: liste non vide de (indice du lot, réponse de _chercher_coups)
+        Postconditions: renvoie (coup, score, variante) du meilleur score ; à score égal,
+                        du premier coup dans l'ordre de recherche
+        '''
+        candidats = []
+        for debut, (indice, score, variante, _) in resultats:
+            candidats.append((-score, debut + indice * self.processus, variante))
+        score, rang, variante = min(candidats, key=lambda candidat: candidat[:2])
+        return coups[rang], -score, variante
+
+    @staticmethod
+    def _coup_de_secours(plateau, coups, joueur):
+        '''
+        Choisit un coup sans recherche, comme Recherche quand la première itération n'a pas abouti
+        Préconditions:
+            plateau: objet Plateau (n'est pas modifié)
+            coups: liste non vide de coups légaux pour joueur
+        Postconditions: renvoie (coup, score), le coup ne perdant pas immédiatement s'il en existe un
+        '''
+        recherche = Recherche(evaluateur(plateau.configuration))
+        return recherche.coup_de_secours(plateau.copier(), coups, joueur)
+
+    def _liberer(self):
+        '''
+        Attend que les lots de la recherche précédente soient arrêtés
+        Préconditions: aucune
+        Postconditions: tous les processus sont libres et l'événement d'annulation est levé
+        '''
+        if self._taches:
+            self._annulation.set()
+            wait(self._taches)
+            self._taches = []
+        self._annulation.clear()
+
+    def _arretee(self, annulation):
+        '''
+        Indique si la recherche doit s'arrêter
+        Préconditions:
+            annulation: événement d'annulation de la recherche, ou None
+        Postconditions: renvoie True si interrompre a été appelé ou l'événement posé
+        '''
+        return self._interrompue or annulation is not None and annulation.is_set()
+
+    def interrompre(self):
+        '''
+        Arrête au plus tôt la recherche en cours, depuis un autre thread
+        Préconditions: aucune
+        Postconditions: meilleur_coup renvoie le meilleur coup de la dernière
+                        profondeur terminée sans attendre les processus, qui
+                        abandonnent leurs lots en quelques noeuds. La demande vaut
+                        aussi pour une recherche qui n'a pas encore commencé et
+                        reste posée jusqu'à ce que l'appelant appelle reprendre.
+        '''
+        self._interrompue = True
+
+    def reprendre(self):
+        '''
+        Efface une demande d'interruption
+        Préconditions: aucune
+        Postconditions: les recherches suivantes disposent de tout leur budget
+        '''
+        self._interrompue = False
+
+    def fermer(self):
+        '''
+        Arrête les processus de travail
+        Préconditions: aucune
+        Postconditions: l'objet ne peut plus chercher
+        '''
+        self._annulation.set()
+        self._executeur.shutdown(cancel_futures=True)
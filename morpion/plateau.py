@@ -0,0 +1,699 @@
+'''
+Règles du jeu : jetons et plateau
+'''
+import random
+
+
+class Jeton:
+    '''
+    Classe représentant un jeton du jeu
+    '''
+    def __init__(self, joueur, face_claire=True):
+        '''
+        Initialise un jeton
+        Préconditions:
+            joueur: "joueur1" ou "joueur2"
+            face_claire: booléen indiquant si la face claire est visible
+        Postconditions:
+            Crée un objet Jeton avec les attributs joueur et face_claire
+        '''
+        self.joueur = joueur
+        self.face_claire = face_claire
+
+    def retourner(self):
+        '''
+        Retourne le jeton (change la face visible)
+        Préconditions: aucune
+        Postconditions: inverse la valeur de face_claire
+        '''
+        self.face_claire = not self.face_claire
+
+
+# Côté du plateau du jeu classique
+TAILLE = 4
+
+# Nombre de jetons de chaque joueur en début de partie
+JETONS_PAR_JOUEUR = 8
+
+# Lettres des colonnes dans la notation texte des cases
+COLONNES = "abcdefghijklmnopqrstuvwxyz"
+
+
+def _calculer_lignes(hauteur, largeur, alignement):
+    '''
+    Calcule les masques de tous les alignements gagnants
+    Préconditions:
+        hauteur, largeur: dimensions du plateau
+        alignement: nombre de jetons à aligner
+    Postconditions: renvoie un tuple de masques (un bit par case, indice ligne*largeur+colonne)
+    '''
+    lignes = []
+    for ligne in range(hauteur):
+        for col in range(largeur):
+            for dl, dc in [(0, 1), (1, 0), (1, 1), (-1, 1)]:
+                fin_l, fin_c = ligne + (alignement - 1) * dl, col + (alignement - 1) * dc
+                if 0 <= fin_l < hauteur and 0 <= fin_c < largeur:
+                    masque = 0
+                    for k in range(alignement):
+                        masque |= 1 << ((ligne + k * dl) * largeur + col + k * dc)
+                    lignes.append(masque)
+    return tuple(lignes)
+
+
+def _calculer_directions(hauteur, largeur, alignement, decalage_faces):
+    '''
+    Calcule les décalages de bits qui détectent un alignement dans chaque direction
+    Préconditions:
+        hauteur, largeur: dimensions du plateau
+        alignement: nombre de jetons à aligner
+        decalage_faces: position des faces sombres dans le masque combiné des deux faces
+    Postconditions: renvoie un tuple de (debuts, decalages) : debuts marque, pour les deux
+                    faces, les cases où un alignement peut commencer, et decalages les
+                    écarts entre la première case et les suivantes
+    '''
+    directions = []
+    # Vers la droite, vers le bas, en diagonale descendante puis montante (parcourue depuis son haut)
+    for dl, dc in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+        debuts = 0
+        for ligne in range(hauteur):
+            for col in range(largeur):
+                fin_l, fin_c = ligne + (alignement - 1) * dl, col + (alignement - 1) * dc
+                if 0 <= fin_l < hauteur and 0 <= fin_c < largeur:
+                    debuts |= 1 << (ligne * largeur + col)
+        if debuts:
+            pas = dl * largeur + dc
+            directions.append((debuts | debuts << decalage_faces,
+                               tuple(k * pas for k in range(1, alignement))))
+    return tuple(directions)
+
+
+def _calculer_voisins(hauteur, largeur):
+    '''
+    Calcule les cases orthogonalement contiguës à chaque case
+    Préconditions:
+        hauteur, largeur: dimensions du plateau
+    Postconditions: renvoie un tuple (par case) de tuples d'indices de cases
+    '''
+    voisins = []
+    for case in range(hauteur * largeur):
+        ligne, col = divmod(case, largeur)
+        cases = []
+        for dl, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            if 0 <= ligne + dl < hauteur and 0 <= col + dc < largeur:
+                cases.append((ligne + dl) * largeur + col + dc)
+        voisins.append(tuple(cases))
+    return tuple(voisins)
+
+
+def _calculer_zobrist(cases, graine=20240613):
+    '''
+    Tire les clés de hachage de Zobrist avec une graine fixe
+    Préconditions:
+        cases: nombre de cases du plateau
+        graine: graine du générateur (entier ou chaîne)
+    Postconditions: renvoie ({joueur: (clés face sombre, clés face claire)}, clé du trait)
+    '''
+    generateur = random.Random(graine)
+    cles = {}
+    for joueur in ("joueur1", "joueur2"):
+        cles[joueur] = tuple(
+            tuple(generateur.getrandbits(64) for _ in range(cases))
+            for _ in range(2)
+        )
+    return cles, generateur.getrandbits(64)
+
+
+class Configuration:
+    '''
+    Dimensions d'une variante du jeu et tables précalculées qui en dépendent
+
+    Une configuration est créée une seule fois par variante, par la fonction
+    configuration() : tous les plateaux d'une variante partagent ses tables,
+    et deux plateaux sont de la même variante si leurs configurations sont
+    le même objet.
+    '''
+    def __init__(self, hauteur, largeur, alignement):
+        '''
+        Précalcule les tables d'une variante
+        Préconditions:
+            hauteur, largeur: dimensions du plateau
+            alignement: nombre de jetons de même face à aligner pour gagner
+        Postconditions: crée les tables bits, plein, lignes, directions, voisins, zobrist
+                        et reserves
+        '''
+        self.hauteur = hauteur
+        self.largeur = largeur
+        self.alignement = alignement
+        self.cases = hauteur * largeur
+        # Bit associé à chaque case et masque de toutes les cases
+        self.bits = tuple(1 << i for i in range(self.cases))
+        self.plein = (1 << self.cases) - 1
+        self.lignes = _calculer_lignes(hauteur, largeur, alignement)
+        # verifier_alignement range les faces sombres au-dessus des claires, assez haut
+        # pour que les décalages ne fassent pas déborder les unes sur les autres
+        self.decalage_faces = self.cases + (alignement - 1) * (largeur + 1)
+        self.directions = _calculer_directions(hauteur, largeur, alignement, self.decalage_faces)
+        self.voisins = _calculer_voisins(hauteur, largeur)
+        if (hauteur, largeur, alignement) == (TAILLE, TAILLE, 3):
+            # Clés historiques du jeu classique (livre d'ouvertures, tables)
+            self.zobrist, self.trait = _calculer_zobrist(self.cases)
+        else:
+            # L'alignement change la valeur des positions : il entre dans la graine
+            self.zobrist, self.trait = _calculer_zobrist(self.cases, f"{hauteur}x{largeur}/{alignement}")
+        # Clé du nombre de jetons de chaque joueur, de 1 à la moitié des cases : les jetons
+        # restants se déduisent des cases occupées une fois ce nombre connu
+        self.jetons_max = self.cases // 2
+        generateur = random.Random(f"jetons/{hauteur}x{largeur}/{alignement}")
+        self.reserves = (0,) + tuple(generateur.getrandbits(64) for _ in range(self.jetons_max))
+
+    def __reduce__(self):
+        '''
+        Sérialisation par pickle (processus de recherche parallèle)
+        Préconditions: aucune
+        Postconditions: la configuration est recréée par configuration(), donc partagée
+        '''
+        return configuration, (self.hauteur, self.largeur, self.alignement)
+
+    def __repr__(self):
+        return f"Configuration({self.hauteur}, {self.largeur}, {self.alignement})"
+
+
+# Configurations déjà créées, par (hauteur, largeur, alignement)
+_CONFIGURATIONS = {}
+
+
+def configuration(hauteur=TAILLE, largeur=None, alignement=3):
+    '''
+    Configuration d'une variante, créée au premier usage
+    Préconditions:
+        hauteur: nombre de lignes
+        largeur: nombre de colonnes (None pour un plateau carré)
+        alignement: nombre de jetons à aligner
+    Postconditions: renvoie l'unique objet Configuration de ces dimensions ;
+                    lève ValueError si les dimensions sont impossibles
+    '''
+    if largeur is None:
+        largeur = hauteur
+    cle = (hauteur, largeur, alignement)
+    if cle not in _CONFIGURATIONS:
+        if not (1 <= hauteur <= 99 and 1 <= largeur <= len(COLONNES)):
+            raise ValueError(f"Dimensions invalides : {hauteur}x{largeur}")
+        if not 2 <= alignement <= max(hauteur, largeur):
+            raise ValueError(f"Alignement invalide pour {hauteur}x{largeur} : {alignement}")
+        _CONFIGURATIONS[cle] = Configuration(hauteur, largeur, alignement)
+    return _CONFIGURATIONS[cle]
+
+
+# Jeu classique : plateau 4x4, trois jetons à aligner
+CLASSIQUE = configuration(TAILLE, TAILLE, 3)
+
+# Tables du jeu classique, pour les modules propres au plateau 4x4
+# Les 24 alignements gagnants (8 horizontaux, 8 verticaux, 8 diagonaux)
+LIGNES = CLASSIQUE.lignes
+
+# Bit associé à chaque case
+BITS = CLASSIQUE.bits
+
+# Masque de toutes les cases du plateau
+PLEIN = CLASSIQUE.plein
+
+VOISINS = CLASSIQUE.voisins
+
+# ZOBRIST[joueur][face_claire][case] ; TRAIT est ajouté quand joueur2 a le trait.
+# La clé de départ d'un plateau est celle de son nombre de jetons par joueur
+# (Configuration.reserves) : les jetons restants en découlent.
+ZOBRIST, TRAIT = CLASSIQUE.zobrist, CLASSIQUE.trait
+
+ADVERSAIRE = {"joueur1": "joueur2", "joueur2": "joueur1"}
+
+
+class Plateau:
+    '''
+    Classe représentant le plateau de jeu (4x4 dans le jeu classique)
+
+    Le plateau est stocké sous forme de bitboards : un masque d'occupation
+    par joueur et un masque des jetons montrant leur face claire.
+    La case (ligne, colonne) correspond au bit ligne*largeur+colonne.
+    L'attribut cle contient le hachage de Zobrist des jetons, tenu à jour
+    à chaque modification. Les dimensions et les tables de la variante
+    sont dans l'attribut configuration.
+    '''
+    def __init__(self, jetons_par_joueur=JETONS_PAR_JOUEUR, configuration=CLASSIQUE):
+        '''
+        Initialise un plateau vide
+        Préconditions:
+            jetons_par_joueur: nombre de jetons de chaque joueur en début de partie
+            configuration: objet Configuration de la variante
+        Postconditions: crée une grille vide ; lève ValueError si les deux joueurs
+                        ne peuvent pas poser tous leurs jetons sur le plateau
+        '''
+        if not 1 <= jetons_par_joueur <= configuration.jetons_max:
+            raise ValueError(f"Nombre de jetons invalide pour {configuration.hauteur}x"
+                             f"{configuration.largeur} : {jetons_par_joueur}")
+        self.jetons_par_joueur = jetons_par_joueur
+        self.configuration = configuration
+        self.occupation = {"joueur1": 0, "joueur2": 0}
+        self.claire = 0
+        self.cle = configuration.reserves[jetons_par_joueur]
+
+    @property
+    def grille(self):
+        '''
+        Vue de la grille sous forme de liste de listes de jetons
+        Préconditions: aucune
+        Postconditions: renvoie une nouvelle grille hauteur x largeur (None pour une case vide)
+        '''
+        configuration = self.configuration
+        return [[self.obtenir_jeton(i, j) for j in range(configuration.largeur)]
+                for i in range(configuration.hauteur)]
+
+    def obtenir_jeton(self, ligne, colonne):
+        '''
+        Renvoie le jeton présent sur une case
+        Préconditions:
+            ligne: entier entre 0 et hauteur - 1
+            colonne: entier entre 0 et largeur - 1
+        Postconditions: renvoie un nouvel objet Jeton, ou None si la case est vide
+        '''
+        bit = 1 << (ligne * self.configuration.largeur + colonne)
+        for joueur, masque in self.occupation.items():
+            if masque & bit:
+                return Jeton(joueur, bool(self.claire & bit))
+        return None
+
+    def placer_jeton(self, ligne, colonne, jeton):
+        '''
+        Place un jeton sur le plateau
+        Préconditions:
+            ligne: entier entre 0 et hauteur - 1
+            colonne: entier entre 0 et largeur - 1
+            jeton: objet Jeton
+        Postconditions: place le jeton à la position donnée
+        '''
+        self.retirer_jeton(ligne, colonne)
+        case = ligne * self.configuration.largeur + colonne
+        self.occupation[jeton.joueur] |= 1 << case
+        if jeton.face_claire:
+            self.claire |= 1 << case
+        self.cle ^= self.configuration.zobrist[jeton.joueur][bool(jeton.face_claire)][case]
+
+    def retirer_jeton(self, ligne, colonne):
+        '''
+        Retire un jeton du plateau
+        Préconditions:
+            ligne: entier entre 0 et hauteur - 1
+            colonne: entier entre 0 et largeur - 1
+        Postconditions: met None à la position donnée et renvoie le jeton retiré
+        '''
+        jeton = self.obtenir_jeton(ligne, colonne)
+        if jeton:
+            case = ligne * self.configuration.largeur + colonne
+            self.occupation[jeton.joueur] &= ~(1 << case)
+            self.claire &= ~(1 << case)
+            self.cle ^= self.configuration.zobrist[jeton.joueur][jeton.face_claire][case]
+        return jeton
+
+    def est_vide(self, ligne, colonne):
+        '''
+        Vérifie si une case est vide
+        Préconditions:
+            ligne: entier entre 0 et hauteur - 1
+            colonne: entier entre 0 et largeur - 1
+        Postconditions: renvoie True si la case est vide, False sinon
+        '''
+        occupe = self.occupation["joueur1"] | self.occupation["joueur2"]
+        return not occupe & (1 << (ligne * self.configuration.largeur + colonne))
+
+    def est_contigu(self, ligne1, col1, ligne2, col2):
+        '''
+        Vérifie si deux cases sont contiguës
+        Préconditions:
+            ligne1, col1, ligne2, col2: coordonnées de deux cases du plateau
+        Postconditions: renvoie True si les cases sont adjacentes, False sinon
+        '''
+        largeur = self.configuration.largeur
+        return ligne2 * largeur + col2 in self.configuration.voisins[ligne1 * largeur + col1]
+
+    def verifier_alignement(self, joueur):
+        '''
+        Vérifie si un joueur a aligné assez de jetons de même face (trois au jeu classique)
+        Préconditions:
+            joueur: "joueur1" ou "joueur2"
+        Postconditions: renvoie True si le joueur a gagné, False sinon
+        '''
+        configuration = self.configuration
+        occupe = self.occupation[joueur]
+        # Les deux faces dans un seul entier : chaque direction se teste en quelques
+        # décalages, quels que soient la taille du plateau et le nombre de lignes
+        jetons = occupe & self.claire | (occupe & ~self.claire) << configuration.decalage_faces
+        for debuts, decalages in configuration.directions:
+            suites = jetons & debuts
+            for decalage in decalages:
+                suites &= jetons >> decalage
+            if suites:
+                return True
+        return False
+
+    def copier(self):
+        '''
+        Crée une copie du plateau
+        Préconditions: aucune
+        Postconditions: renvoie une copie du plateau
+        '''
+        nouveau = Plateau(self.jetons_par_joueur, self.configuration)
+        nouveau.occupation = dict(self.occupation)
+        nouveau.claire = self.claire
+        nouveau.cle = self.cle
+        return nouveau
+
+    @staticmethod
+    def depuis_masques(joueur1, joueur2, claire, jetons_par_joueur=JETONS_PAR_JOUEUR,
+                       configuration=CLASSIQUE):
+        '''
+        Construit un plateau à partir de ses bitboards
+        Préconditions:
+            joueur1, joueur2: masques d'occupation disjoints
+            claire: masque des faces claires, inclus dans joueur1 | joueur2
+            jetons_par_joueur: nombre de jetons de chaque joueur en début de partie
+            configuration: objet Configuration de la variante
+        Postconditions: renvoie un nouveau Plateau avec sa clé de Zobrist calculée
+        '''
+        plateau = Plateau(jetons_par_joueur, configuration)
+        zobrist = configuration.zobrist
+        plateau.occupation = {"joueur1": joueur1, "joueur2": joueur2}
+        plateau.claire = claire
+        for joueur, masque in plateau.occupation.items():
+            while masque:
+                bit = masque & -masque
+                masque ^= bit
+                case = bit.bit_length() - 1
+                plateau.cle ^= zobrist[joueur][bool(claire & bit)][case]
+        return plateau
+
+    def cle_position(self, joueur):
+        '''
+        Clé de hachage de la position avec le joueur au trait
+        Préconditions:
+            joueur: "joueur1" ou "joueur2", le joueur au trait
+        Postconditions: renvoie un entier de 64 bits
+        '''
+        return self.cle ^ self.configuration.trait if joueur == "joueur2" else self.cle
+
+    def glissements(self, joueur):
+        '''
+        Génère les jetons adverses que le joueur peut retourner
+        Préconditions:
+            joueur: "joueur1" ou "joueur2"
+        Postconditions: génère paresseusement les couples (source, destination)
+                        où source porte un jeton adverse et destination est une
+                        case vide contiguë
+        '''
+        occupe = self.occupation["joueur1"] | self.occupation["joueur2"]
+        adverses = self.occupation[ADVERSAIRE[joueur]]
+        voisins = self.configuration.voisins
+        while adverses:
+            bit = adverses & -adverses
+            adverses ^= bit
+            source = bit.bit_length() - 1
+            for destination in voisins[source]:
+                if not occupe >> destination & 1:
+                    yield source, destination
+
+    def coups_legaux(self, joueur, jetons_restants=None, premier_coup=None):
+        '''
+        Génère les coups légaux du joueur
+        Préconditions:
+            joueur: "joueur1" ou "joueur2"
+            jetons_restants: jetons du joueur encore à poser
+                             (None pour le déduire du plateau)
+            premier_coup: True pour le tout premier coup de la partie
+                          (None pour le déduire du plateau vide)
+        Postconditions: génère paresseusement des tuples (source, destination, case, face).
+                        S'il existe au moins un jeton à retourner, tous les coups en
+                        retournent un ; sinon source et destination valent None.
+                        Sans jeton restant, case et face valent None.
+                        Ne génère rien si le joueur ne peut rien faire.
+        '''
+        occupe = self.occupation["joueur1"] | self.occupation["joueur2"]
+        if jetons_restants is None:
+            jetons_restants = self.jetons_par_joueur - self.occupation[joueur].bit_count()
+        if premier_coup is None:
+            premier_coup = not occupe
+        vides = self.configuration.plein & ~occupe
+
+        aucun_glissement = True
+        if not premier_coup:
+            for source, destination in self.glissements(joueur):
+                aucun_glissement = False
+                if jetons_restants <= 0:
+                    yield (source, destination, None, None)
+                    continue
+                libres = (vides | 1 << source) & ~(1 << destination)
+                while libres:
+                    bit = libres & -libres
+                    libres ^= bit
+                    case = bit.bit_length() - 1
+                    yield (source, destination, case, True)
+                    yield (source, destination, case, False)
+
+        if aucun_glissement and jetons_restants > 0:
+            while vides:
+                bit = vides & -vides
+                vides ^= bit
+                case = bit.bit_length() - 1
+                yield (None, None, case, True)
+                yield (None, None, case, False)
+
+    def jouer_coup(self, coup, joueur):
+        '''
+        Joue un coup complet sur place, sans allocation
+        Préconditions:
+            coup: tuple (source, destination, case, face) d'indices de cases ;
+                  source et destination valent None si aucun jeton n'est retourné,
+                  case vaut None si aucun jeton n'est posé
+            joueur: "joueur1" ou "joueur2", le joueur qui joue le coup
+        Postconditions: le jeton adverse en source glisse retourné vers destination,
+                        puis un jeton du joueur est posé en case avec la face donnée
+        '''
+        source, destination, case, face = coup
+        occupation = self.occupation
+        zobrist = self.configuration.zobrist
+        if source is not None:
+            adversaire = ADVERSAIRE[joueur]
+            bit_source = 1 << source
+            bit_destination = 1 << destination
+            occupation[adversaire] ^= bit_source | bit_destination
+            # Le jeton glisse en changeant de face
+            claire = bool(self.claire & bit_source)
+            if not claire:
+                self.claire |= bit_destination
+            self.claire &= ~bit_source
+            cles = zobrist[adversaire]
+            self.cle ^= cles[claire][source] ^ cles[not claire][destination]
+        if case is not None:
+            occupation[joueur] |= 1 << case
+            if face:
+                self.claire |= 1 << case
+            self.cle ^= zobrist[joueur][face][case]
+
+    def annuler_coup(self, coup, joueur):
+        '''
+        Annule exactement un coup joué avec jouer_coup
+        Préconditions:
+            coup: le dernier coup joué sur ce plateau
+            joueur: le joueur qui l'a joué
+        Postconditions: le plateau revient à l'état précédant le coup
+        '''
+        source, destination, case, face = coup
+        occupation = self.occupation
+        zobrist = self.configuration.zobrist
+        if case is not None:
+            masque = ~(1 << case)
+            occupation[joueur] &= masque
+            self.claire &= masque
+            self.cle ^= zobrist[joueur][face][case]
+        if source is not None:
+            adversaire = ADVERSAIRE[joueur]
+            bit_source = 1 << source
+            bit_destination = 1 << destination
+            occupation[adversaire] ^= bit_source | bit_destination
+            claire = bool(self.claire & bit_destination)
+            if not claire:
+                self.claire |= bit_source
+            self.claire &= ~bit_destination
+            cles = zobrist[adversaire]
+            self.cle ^= cles[claire][destination] ^ cles[not claire][source]
+
+
+def coup_vers_dict(coup, configuration=CLASSIQUE):
+    '''
+    Convertit un coup du moteur au format utilisé par l'interface
+    Préconditions:
+        coup: tuple (source, destination, case, face)
+        configuration: objet Configuration de la variante
+    Postconditions: renvoie {'retourner': (l_src, c_src, l_dest, c_dest) ou None,
+                    'placer': (ligne, colonne, face) ou None}
+    '''
+    source, destination, case, face = coup
+    largeur = configuration.largeur
+    retourner = None
+    if source is not None:
+        retourner = divmod(source, largeur) + divmod(destination, largeur)
+    placer = None
+    if case is not None:
+        placer = divmod(case, largeur) + (face,)
+    return {'retourner': retourner, 'placer': placer}
+
+
+def dict_vers_coup(coup, configuration=CLASSIQUE):
+    '''
+    Convertit un coup au format de l'interface en coup du moteur
+    Préconditions:
+        coup: dictionnaire avec les clés 'retourner' et 'placer'
+        configuration: objet Configuration de la variante
+    Postconditions: renvoie le tuple (source, destination, case, face)
+    '''
+    largeur = configuration.largeur
+    source = destination = case = face = None
+    if coup.get('retourner'):
+        l_src, c_src, l_dest, c_dest = coup['retourner']
+        source = l_src * largeur + c_src
+        destination = l_dest * largeur + c_dest
+    if coup.get('placer'):
+        ligne, col, face = coup['placer']
+        case = ligne * largeur + col
+    return (source, destination, case, face)
+
+
+def case_vers_texte(case, configuration=CLASSIQUE):
+    '''
+    Nom d'une case en notation texte
+    Préconditions:
+        case: indice de case (ligne*largeur+colonne)
+        configuration: objet Configuration de la variante
+    Postconditions: renvoie la lettre de la colonne suivie du numéro de la ligne
+                    (à partir de 1), par exemple "b3"
+    '''
+    ligne, col = divmod(case, configuration.largeur)
+    return COLONNES[col] + str(ligne + 1)
+
+
+def texte_vers_case(texte, configuration=CLASSIQUE):
+    '''
+    Indice d'une case écrite en notation texte
+    Préconditions:
+        texte: nom de case comme "b3"
+        configuration: objet Configuration de la variante
+    Postconditions: renvoie l'indice de la case ; lève ValueError si le nom est invalide
+                    ou hors du plateau
+    '''
+    lettres = COLONNES[:configuration.largeur]
+    if not (2 <= len(texte) <= 3 and texte[0] in lettres and texte[1:].isdigit()
+            and 1 <= int(texte[1:]) <= configuration.hauteur):
+        raise ValueError(f"Case invalide : {texte!r}")
+    return (int(texte[1:]) - 1) * configuration.largeur + lettres.index(texte[0])
+
+
+def coup_vers_texte(coup, configuration=CLASSIQUE):
+    '''
+    Écrit un coup en notation texte
+    Préconditions:
+        coup: tuple (source, destination, case, face)
+        configuration: objet Configuration de la variante
+    Postconditions: renvoie par exemple "b2>b3/c1+" (glissement de b2 vers b3, puis pose
+                    en c1 face claire ; "-" pour la face sombre), "b2>b3" ou "c1+"
+    '''
+    source, destination, case, face = coup
+    parties = []
+    if source is not None:
+        parties.append(case_vers_texte(source, configuration) + ">"
+                       + case_vers_texte(destination, configuration))
+    if case is not None:
+        parties.append(case_vers_texte(case, configuration) + ("+" if face else "-"))
+    return "/".join(parties)
+
+
+def texte_vers_coup(texte, configuration=CLASSIQUE):
+    '''
+    Lit un coup écrit par coup_vers_texte
+    Préconditions:
+        texte: coup en notation texte
+        configuration: objet Configuration de la variante
+    Postconditions: renvoie le tuple (source, destination, case, face) ;
+                    lève ValueError si le texte est invalide
+    '''
+    source = destination = case = face = None
+    for partie in texte.strip().split("/"):
+        if ">" in partie and source is None and case is None:
+            debut, fin = partie.split(">")
+            source, destination = texte_vers_case(debut, configuration), texte_vers_case(fin, configuration)
+        elif partie[-1:] in ("+", "-") and case is None:
+            case, face = texte_vers_case(partie[:-1], configuration), partie[-1] == "+"
+        else:
+            raise ValueError(f"Coup invalide : {texte!r}")
+    return (source, destination, case, face)
+
+
+# Symbole de chaque jeton dans la notation des positions : (face claire, face sombre)
+SYMBOLES = {"joueur1": ("X", "x"), "joueur2": ("O", "o")}
+
+
+def plateau_vers_texte(plateau, joueur):
+    '''
+    Écrit une position en notation texte
+    Préconditions:
+        plateau: objet Plateau
+        joueur: le joueur au trait
+    Postconditions: renvoie les lignes du plateau séparées par "/", à partir de la ligne 1
+                    ("X"/"x" : joueur1 face claire/sombre, "O"/"o" : joueur2,
+                    "." : case vide), un espace et le joueur au trait ("1" ou "2"),
+                    par exemple "X.o./..../.O../.... 1"
+    '''
+    symboles = []
+    for case, bit in enumerate(plateau.configuration.bits):
+        if case and not case % plateau.configuration.largeur:
+            symboles.append("/")
+        for nom, (claire, sombre) in SYMBOLES.items():
+            if plateau.occupation[nom] & bit:
+                symboles.append(claire if plateau.claire & bit else sombre)
+                break
+        else:
+            symboles.append(".")
+    return "".join(symboles) + " " + joueur[-1]
+
+
+def texte_vers_plateau(texte, jetons_par_joueur=JETONS_PAR_JOUEUR, configuration=CLASSIQUE):
+    '''
+    Lit une position écrite par plateau_vers_texte
+    Préconditions:
+        texte: position en notation texte
+        jetons_par_joueur: jetons de chaque joueur
+        configuration: objet Configuration de la variante (dimensions attendues)
+    Postconditions: renvoie (plateau, joueur au trait) ; lève ValueError si le texte
+                    est invalide ou si un joueur a plus de jetons qu'il n'en possède
+    '''
+    morceaux = texte.split()
+    if len(morceaux) != 2 or morceaux[1] not in ("1", "2"):
+        raise ValueError(f"Position invalide : {texte!r}")
+    lignes = morceaux[0].split("/")
+    if (len(lignes) != configuration.hauteur
+            or any(len(ligne) != configuration.largeur for ligne in lignes)):
+        raise ValueError(f"Position invalide : {texte!r}")
+    masques = {"joueur1": 0, "joueur2": 0}
+    claire = 0
+    for case, symbole in enumerate("".join(lignes)):
+        if symbole == ".":
+            continue
+        for nom, symboles in SYMBOLES.items():
+            if symbole in symboles:
+                masques[nom] |= 1 << case
+                if symbole == symboles[0]:
+                    claire |= 1 << case
+                break
+        else:
+            raise ValueError(f"Symbole invalide {symbole!r} dans {texte!r}")
+    if max(masque.bit_count() for masque in masques.values()) > jetons_par_joueur:
+        raise ValueError(f"Trop de jetons dans {texte!r}")
+    plateau = Plateau.depuis_masques(masques["joueur1"], masques["joueur2"], claire, jetons_par_joueur,
+                                     configuration)
+    return plateau, "joueur" + morceaux[1]
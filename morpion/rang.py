@@ -0,0 +1,157 @@
+'''
+Numérotation parfaite des positions (rang et position d'un rang)
+
+Chaque position (cases occupées, propriétaire et face de chaque jeton,
+joueur au trait) reçoit un rang entier, sans trou ni doublon, entre 0 et
+nombre_positions() - 1 : les données indexées par position tiennent dans
+des tableaux plats au lieu de dictionnaires.
+
+Les jetons restants ne sont pas numérotés à part : un jeton posé ne quitte
+plus le plateau, ils se déduisent du nombre de jetons posés. De même, la
+pose étant obligatoire tant qu'il reste des jetons, le nombre de jetons de
+chaque joueur est fixé par le nombre de coups joués : si joueur1 est au
+trait, les deux joueurs en ont autant ; si joueur2 est au trait, joueur1 en
+a un de plus, sauf quand les deux n'en ont plus.
+
+Les positions sont rangées par couche (joueur au trait et nombres de
+jetons), puis, dans une couche, par ensemble des cases occupées, cases de
+joueur1 parmi elles, et faces. Les ensembles de même taille sont numérotés
+dans l'ordre croissant de leur masque, grâce à des tables précalculées.
+'''
+import bisect
+from math import comb
+
+from .plateau import BITS, CLASSIQUE, JETONS_PAR_JOUEUR, Plateau
+
+# Masques de 16 bits ayant k bits à 1, dans l'ordre croissant, et rang de chaque masque
+_MASQUES = [[] for _ in range(len(BITS) + 1)]
+_RANGS = [0] * (1 << len(BITS))
+for _masque in range(1 << len(BITS)):
+    _liste = _MASQUES[_masque.bit_count()]
+    _RANGS[_masque] = len(_liste)
+    _liste.append(_masque)
+del _masque, _liste
+
+# Couches de chaque nombre de jetons par joueur, calculées au premier usage
+_COUCHES = {}
+
+
+def _extraire(masque, occupe):
+    '''
+    Rassemble les bits d'un masque situés sur les cases occupées
+    Préconditions:
+        masque, occupe: masques de cases
+    Postconditions: renvoie l'entier dont le bit i est le bit de masque sur la
+                    i-ème case occupée (dans l'ordre des cases)
+    '''
+    resultat = 0
+    i = 0
+    while occupe:
+        bit = occupe & -occupe
+        occupe ^= bit
+        if masque & bit:
+            resultat |= 1 << i
+        i += 1
+    return resultat
+
+
+def _deposer(bits, occupe):
+    '''
+    Inverse de _extraire
+    Préconditions:
+        bits: entier dont le bit i concerne la i-ème case occupée
+        occupe: masque des cases occupées
+    Postconditions: renvoie le masque des cases occupées dont le bit vaut 1
+    '''
+    resultat = 0
+    while occupe:
+        bit = occupe & -occupe
+        occupe ^= bit
+        if bits & 1:
+            resultat |= bit
+        bits >>= 1
+    return resultat
+
+
+def couches(jetons_par_joueur=JETONS_PAR_JOUEUR):
+    '''
+    Couches de la numérotation
+    Préconditions:
+        jetons_par_joueur: jetons de chaque joueur (au plus 8)
+    Postconditions: renvoie la liste des (premier rang, joueur au trait, jetons de joueur1,
+                    jetons de joueur2), dans l'ordre des rangs, et le nombre total de positions
+    '''
+    if jetons_par_joueur not in _COUCHES:
+        liste = []
+        debut = 0
+        for posees in range(2 * jetons_par_joueur + 1):
+            # posees jetons sur le plateau : le trait découle de la parité, sauf quand tout est posé
+            if posees % 2 == 0:
+                comptes = [("joueur1", posees // 2, posees // 2)]
+                if posees == 2 * jetons_par_joueur:
+                    comptes.append(("joueur2", posees // 2, posees // 2))
+            else:
+                comptes = [("joueur2", posees // 2 + 1, posees // 2)]
+            for joueur, jetons1, jetons2 in comptes:
+                liste.append((debut, joueur, jetons1, jetons2))
+                debut += comb(len(BITS), posees) * comb(posees, jetons1) << posees
+        _COUCHES[jetons_par_joueur] = (liste, debut)
+    return _COUCHES[jetons_par_joueur]
+
+
+def nombre_positions(jetons_par_joueur=JETONS_PAR_JOUEUR):
+    '''
+    Nombre de rangs
+    Préconditions:
+        jetons_par_joueur: jetons de chaque joueur
+    Postconditions: renvoie la taille d'un tableau indexé par rang
+    '''
+    return couches(jetons_par_joueur)[1]
+
+
+def rang(plateau, joueur):
+    '''
+    Rang d'une position
+    Préconditions:
+        plateau: objet Plateau
+        joueur: le joueur au trait
+    Postconditions: renvoie un entier entre 0 et nombre_positions(plateau.jetons_par_joueur) - 1 ;
+                    lève ValueError si le plateau n'est pas celui du jeu classique ou si
+                    les nombres de jetons ne correspondent pas au trait
+    '''
+    if plateau.configuration is not CLASSIQUE:
+        raise ValueError(f"La numérotation ne couvre que le plateau 4x4, pas {plateau.configuration}")
+    joueur1 = plateau.occupation["joueur1"]
+    occupe = joueur1 | plateau.occupation["joueur2"]
+    posees = occupe.bit_count()
+    jetons1 = joueur1.bit_count()
+    liste, _ = couches(plateau.jetons_par_joueur)
+    for debut, trait, attendus1, attendus2 in liste:
+        if trait == joueur and attendus1 == jetons1 and attendus1 + attendus2 == posees:
+            break
+    else:
+        raise ValueError(f"Nombres de jetons impossibles avec {joueur} au trait")
+    rang_dans_couche = _RANGS[occupe] * comb(posees, jetons1) + _RANGS[_extraire(joueur1, occupe)]
+    return debut + (rang_dans_couche << posees | _extraire(plateau.claire, occupe))
+
+
+def position(numero, jetons_par_joueur=JETONS_PAR_JOUEUR):
+    '''
+    Position d'un rang (inverse de rang)
+    Préconditions:
+        numero: entier entre 0 et nombre_positions(jetons_par_joueur) - 1
+        jetons_par_joueur: jetons de chaque joueur
+    Postconditions: renvoie (plateau, joueur au trait) ; lève ValueError hors des rangs
+    '''
+    liste, total = couches(jetons_par_joueur)
+    if not 0 <= numero < total:
+        raise ValueError(f"Rang hors limites : {numero}")
+    debut, joueur, jetons1, jetons2 = liste[bisect.bisect_right(liste, (numero, "~")) - 1]
+    posees = jetons1 + jetons2
+    rang_dans_couche, faces = divmod(numero - debut, 1 << posees)
+    rang_occupe, rang_joueur1 = divmod(rang_dans_couche, comb(posees, jetons1))
+    occupe = _MASQUES[posees][rang_occupe]
+    joueur1 = _deposer(_MASQUES[jetons1][rang_joueur1], occupe)
+    plateau = Plateau.depuis_masques(joueur1, occupe & ~joueur1, _deposer(faces, occupe),
+                                     jetons_par_joueur)
+    return plateau, joueur
@@ -0,0 +1,426 @@
+'''
+Recherche negamax avec élagage alpha-bêta et approfondissement itératif
+'''
+import time
+
+from .plateau import ADVERSAIRE
+from .transposition import EXACTE, INFERIEURE, SUPERIEURE
+
+# Score d'une victoire (diminué du nombre de demi-coups pour préférer la plus rapide)
+VICTOIRE = 1000000
+
+# Au-delà de ce score, la position est un gain ou une perte forcés
+SEUIL_VICTOIRE = VICTOIRE - 1000
+
+# Nombre de noeuds entre deux vérifications du temps écoulé
+_INTERVALLE_HORLOGE = 64
+
+
+class _TempsEcoule(Exception):
+    '''
+    Interrompt la recherche quand le budget de temps est dépassé
+    '''
+
+
+def _vers_table(score, ply):
+    '''
+    Rend un score de victoire relatif à la position avant de le ranger
+    Préconditions:
+        score: score calculé à ply demi-coups de la racine
+    Postconditions: renvoie le score indépendant de la distance à la racine
+    '''
+    if score >= SEUIL_VICTOIRE:
+        return score + ply
+    if score <= -SEUIL_VICTOIRE:
+        return score - ply
+    return score
+
+
+def _depuis_table(score, ply):
+    '''
+    Inverse de _vers_table
+    Préconditions:
+        score: score lu dans la table
+    Postconditions: renvoie le score vu à ply demi-coups de la racine
+    '''
+    if score >= SEUIL_VICTOIRE:
+        return score - ply
+    if score <= -SEUIL_VICTOIRE:
+        return score + ply
+    return score
+
+
+class Recherche:
+    '''
+    Moteur de recherche negamax alpha-bêta sous budget de temps
+    '''
+    def __init__(self, evaluer, budget=0.5, profondeur_max=32, table=None,
+                 evaluer_lot=None, taille_lot_min=1, annulation=None):
+        '''
+        Initialise le moteur de recherche
+        Préconditions:
+            evaluer: fonction (plateau, joueur) -> score du point de vue de joueur
+            budget: temps de réflexion par coup, en secondes
+            profondeur_max: profondeur maximale en coups complets
+            table: TableTransposition partagée, ou None pour s'en passer
+            evaluer_lot: fonction (mien, adverse, claire) -> liste de scores, donnant
+                         les mêmes scores que evaluer sur des listes de masques, ou None.
+                         Elle sert à la première itération, où tous les coups de la
+                         racine sont évalués ; plus bas, l'élagage est plus rentable.
+            taille_lot_min: nombre de coups (>= 1) à partir duquel evaluer_lot est utilisé
+            annulation: événement (threading ou multiprocessing) qui interrompt la recherche
+                        quand il est posé, ou None
+        Postconditions: crée un moteur prêt à chercher
+        '''
+        self.evaluer = evaluer
+        self.evaluer_lot = evaluer_lot
+        self.taille_lot_min = taille_lot_min
+        self.budget = budget
+        self.profondeur_max = profondeur_max
+        self.table = table
+        self.noeuds = 0
+        self.evaluations = 0
+        self.profondeur_atteinte = 0
+        self._limite = 0.0
+        # Demande d'interruption : meilleur_coup ne l'efface jamais, seul l'appelant le fait
+        self._interrompu = False
+        self.annulation = annulation
+        self._table_debut = (0, 0)
+
+    def meilleur_coup(self, plateau, joueur):
+        '''
+        Cherche le meilleur coup par approfondissement itératif
+        Préconditions:
+            plateau: objet Plateau (n'est pas modifié)
+            joueur: "joueur1" ou "joueur2", le joueur au trait
+        Postconditions: renvoie (coup, score) ; coup vaut None si aucun coup n'est légal.
+                        Quand le temps est écoulé ou la recherche interrompue, renvoie le
+                        meilleur coup trouvé jusque-là, au pire un coup qui ne perd pas
+                        immédiatement s'il en existe un.
+        '''
+        self.noeuds = 0
+        self.evaluations = 0
+        self.profondeur_atteinte = 0
+        self._limite = time.perf_counter() + self.budget
+        self._table_debut = self._compteurs_table()
+        if self.table is not None:
+            self.table.nouvelle_recherche()
+
+        # La recherche peut être interrompue n'importe où : on travaille sur une copie
+        plateau = plateau.copier()
+        coups = list(plateau.coups_legaux(joueur))
+        if not coups:
+            return None, 0
+        if len(coups) == 1:
+            # Coup forcé : inutile de chercher, mais son score reste celui d'une évaluation
+            return self.coup_de_secours(plateau, coups, joueur)
+
+        meilleur, meilleur_score = coups[0], -VICTOIRE
+        for profondeur in range(1, self.profondeur_max + 1):
+            coup_iteration = None
+            score_iteration = -VICTOIRE
+            try:
+                if profondeur == 1 and self._par_lot(coups):
+                    # Toutes les feuilles d'un coup : on en profite pour trier les coups
+                    scores = dict(zip(coups, self._evaluer_feuilles(plateau, coups, joueur, 0)))
+                    coups.sort(key=scores.__getitem__, reverse=True)
+                    coup_iteration, score_iteration = coups[0], scores[coups[0]]
+                else:
+                    for coup in coups:
+                        score = self._evaluer_coup(plateau, coup, joueur, profondeur,
+                                                   score_iteration, VICTOIRE, 0)
+                        if coup_iteration is None or score > score_iteration:
+                            coup_iteration, score_iteration = coup, score
+            except _TempsEcoule:
+                # Le premier coup essayé est le meilleur de l'itération précédente :
+                # un coup qui l'a battu reste fiable même si l'itération est incomplète
+                if coup_iteration is not None:
+                    meilleur, meilleur_score = coup_iteration, score_iteration
+                if profondeur == 1 and meilleur_score <= -SEUIL_VICTOIRE:
+                    # Première itération incomplète : ne pas jouer un coup perdant au hasard
+                    secours = self.coup_de_secours(plateau, coups, joueur)
+                    if secours[1] > meilleur_score:
+                        meilleur, meilleur_score = secours
+                break
+
+            meilleur, meilleur_score = coup_iteration, score_iteration
+            self.profondeur_atteinte = profondeur
+            if abs(meilleur_score) >= SEUIL_VICTOIRE:
+                break
+
+            # Essayer d'abord le meilleur coup à l'itération suivante
+            coups.remove(meilleur)
+            coups.insert(0, meilleur)
+
+        return meilleur, meilleur_score
+
+    def coup_de_secours(self, plateau, coups, joueur):
+        '''
+        Choisit un coup sans recherche, quand la première itération n'a pas abouti
+        Préconditions:
+            plateau: objet Plateau (remis dans son état initial)
+            coups: liste non vide de coups légaux pour joueur
+        Postconditions: renvoie (coup, score) pour le premier coup gagnant, sinon le
+                        premier coup qui ne perd pas immédiatement, évalué à profondeur 1 ;
+                        à défaut, le premier coup et son score de défaite.
+                        Ne consulte pas l'horloge.
+        '''
+        adversaire = ADVERSAIRE[joueur]
+        sur = None
+        for coup in coups:
+            plateau.jouer_coup(coup, joueur)
+            perd = plateau.verifier_alignement(adversaire)
+            gagne = not perd and plateau.verifier_alignement(joueur)
+            if not perd and not gagne and sur is None:
+                self.evaluations += 1
+                sur = coup, self.evaluer(plateau, joueur)
+            plateau.annuler_coup(coup, joueur)
+            if gagne:
+                return coup, VICTOIRE - 1
+        return sur or (coups[0], 1 - VICTOIRE)
+
+    def chercher_coups(self, plateau, joueur, coups, profondeur, budget):
+        '''
+        Cherche des coups de la racine à profondeur fixe (un lot de la recherche parallèle)
+        Préconditions:
+            plateau: objet Plateau (n'est pas modifié)
+            joueur: le joueur au trait
+            coups: liste de coups légaux, dans l'ordre où les essayer
+            profondeur: profondeur de recherche de chaque coup (>= 1)
+            budget: temps de recherche en secondes
+        Postconditions: renvoie (indice du meilleur coup dans coups, score, variante principale,
+                        compteurs), ou (None, 0, [], compteurs) si le temps est écoulé ou la
+                        recherche interrompue avant la fin ; compteurs vaut (noeuds, évaluations,
+                        succès et lectures de la table). Le premier des coups de meilleur
+                        score est retenu.
+        '''
+        self.noeuds = self.evaluations = 0
+        self._table_debut = self._compteurs_table()
+        self._limite = time.perf_counter() + budget
+        plateau = plateau.copier()
+        meilleur, meilleur_score = None, -VICTOIRE
+        try:
+            for indice, coup in enumerate(coups):
+                score = self._evaluer_coup(plateau, coup, joueur, profondeur,
+                                           meilleur_score, VICTOIRE, 0)
+                if meilleur is None or score > meilleur_score:
+                    meilleur, meilleur_score = indice, score
+        except _TempsEcoule:
+            return None, 0, [], (self.noeuds, self.evaluations) + self.sondages_table()
+        variante = self.variante_principale(plateau, joueur, coups[meilleur], profondeur)
+        return meilleur, meilleur_score, variante, (self.noeuds, self.evaluations) + self.sondages_table()
+
+    def sondages_table(self):
+        '''
+        Lectures de la table de transposition depuis le début de la recherche
+        Préconditions: aucune
+        Postconditions: renvoie (lectures réussies, lectures) ; (0, 0) sans table
+        '''
+        succes, echecs = self._compteurs_table()
+        return succes - self._table_debut[0], succes + echecs - sum(self._table_debut)
+
+    def _compteurs_table(self):
+        '''
+        Compteurs de la table de transposition
+        Préconditions: aucune
+        Postconditions: renvoie (succès, échecs) de la table, ou (0, 0) sans table
+        '''
+        if self.table is None:
+            return 0, 0
+        return self.table.succes, self.table.echecs
+
+    def variante_principale(self, plateau, joueur, coup, longueur):
+        '''
+        Suite de coups attendue après un coup, d'après la table de transposition
+        Préconditions:
+            plateau: objet Plateau (n'est pas modifié)
+            coup: coup légal pour joueur, en tête de la variante
+            longueur: nombre maximal de demi-coups de la variante
+        Postconditions: renvoie la liste des coups, coup compris ; elle s'arrête à la
+                        fin de la partie ou au premier coup absent ou illégal
+        '''
+        plateau = plateau.copier()
+        variante = [coup]
+        vues = set()
+        while True:
+            plateau.jouer_coup(coup, joueur)
+            if plateau.verifier_alignement(joueur) or plateau.verifier_alignement(ADVERSAIRE[joueur]):
+                break
+            joueur = ADVERSAIRE[joueur]
+            cle = plateau.cle_position(joueur)
+            if len(variante) >= longueur or self.table is None or cle in vues:
+                break
+            vues.add(cle)
+            coup = self.table.coup(cle)
+            if coup is None or coup not in set(plateau.coups_legaux(joueur)):
+                break
+            variante.append(coup)
+        return variante
+
+    def interrompre(self):
+        '''
+        Arrête au plus tôt la recherche en cours, depuis un autre thread
+        Préconditions: aucune
+        Postconditions: meilleur_coup renvoie le meilleur coup trouvé jusque-là
+                        dès la prochaine vérification de l'horloge. La demande vaut
+                        aussi pour une recherche qui n'a pas encore commencé : elle
+                        reste posée jusqu'à ce que l'appelant appelle reprendre.
+        '''
+        self._interrompu = True
+
+    def reprendre(self):
+        '''
+        Efface une demande d'interruption
+        Préconditions: aucune
+        Postconditions: les recherches suivantes disposent de tout leur budget
+        '''
+        self._interrompu = False
+
+    def _temps_ecoule(self):
+        '''
+        Indique si la recherche doit s'arrêter
+        Préconditions: aucune
+        Postconditions: renvoie True si le budget est dépassé, la recherche interrompue
+                        ou l'événement d'annulation posé
+        '''
+        return (self._interrompu or time.perf_counter() > self._limite
+                or self.annulation is not None and self.annulation.is_set())
+
+    def _evaluer_coup(self, plateau, coup, joueur, profondeur, alpha, beta, ply):
+        '''
+        Joue un coup, évalue la position obtenue puis l'annule
+        Préconditions:
+            coup: coup légal pour joueur
+            profondeur: profondeur restante, coup compris (>= 1)
+            ply: nombre de demi-coups depuis la racine
+        Postconditions: renvoie le score du coup du point de vue de joueur ;
+                        lève _TempsEcoule si le budget est dépassé
+        '''
+        self.noeuds += 1
+        if not self.noeuds % _INTERVALLE_HORLOGE and self._temps_ecoule():
+            raise _TempsEcoule()
+
+        adversaire = ADVERSAIRE[joueur]
+        plateau.jouer_coup(coup, joueur)
+        # Le retournement est joué avant la pose : l'alignement adverse prime
+        if plateau.verifier_alignement(adversaire):
+            score = ply + 1 - VICTOIRE
+        elif plateau.verifier_alignement(joueur):
+            score = VICTOIRE - ply - 1
+        elif profondeur <= 1:
+            self.evaluations += 1
+            score = self.evaluer(plateau, joueur)
+        else:
+            score = -self._negamax(plateau, adversaire, profondeur - 1, -beta, -alpha, ply + 1)
+        plateau.annuler_coup(coup, joueur)
+        return score
+
+    def _negamax(self, plateau, joueur, profondeur, alpha, beta, ply):
+        '''
+        Negamax avec élagage alpha-bêta et table de transposition
+        Préconditions:
+            joueur: le joueur au trait
+            profondeur: profondeur restante (>= 1)
+        Postconditions: renvoie le score de la position du point de vue de joueur
+        '''
+        table = self.table
+        coup_table = None
+        if table is not None:
+            cle = plateau.cle_position(joueur)
+            entree = table.lire(cle)
+            if entree is not None:
+                profondeur_table, borne, score, coup_table = entree
+                if profondeur_table >= profondeur:
+                    score = _depuis_table(score, ply)
+                    if (borne == EXACTE
+                            or (borne == INFERIEURE and score >= beta)
+                            or (borne == SUPERIEURE and score <= alpha)):
+                        return score
+
+        alpha_initial = alpha
+        meilleur = None
+        meilleur_coup = None
+        for coup in self._coups_ordonnes(plateau, joueur, coup_table):
+            score = self._evaluer_coup(plateau, coup, joueur, profondeur, alpha, beta, ply)
+            if meilleur is None or score > meilleur:
+                meilleur = score
+                meilleur_coup = coup
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        # Aucun coup possible : match nul
+        if meilleur is None:
+            meilleur = 0
+
+        if table is not None:
+            if meilleur <= alpha_initial:
+                borne = SUPERIEURE
+            elif meilleur >= beta:
+                borne = INFERIEURE
+            else:
+                borne = EXACTE
+            table.ecrire(cle, profondeur, borne, _vers_table(meilleur, ply), meilleur_coup)
+
+        return meilleur
+
+    def _par_lot(self, coups):
+        '''
+        Indique si des feuilles doivent être évaluées par lot
+        Préconditions:
+            coups: liste des coups menant aux feuilles
+        Postconditions: renvoie True si evaluer_lot existe et que le lot est assez grand
+        '''
+        return self.evaluer_lot is not None and len(coups) >= self.taille_lot_min
+
+    def _evaluer_feuilles(self, plateau, coups, joueur, ply):
+        '''
+        Évalue par lot les positions obtenues après chaque coup
+        Préconditions:
+            coups: liste de coups légaux pour joueur
+            ply: nombre de demi-coups depuis la racine
+        Postconditions: renvoie la liste des scores des coups du point de vue de joueur,
+                        identiques à ceux de _evaluer_coup à profondeur 1 ;
+                        lève _TempsEcoule si le budget est dépassé
+        '''
+        adversaire = ADVERSAIRE[joueur]
+        occupation = plateau.occupation
+        scores = [None] * len(coups)
+        feuilles = []
+        mien, adverse, claire = [], [], []
+        self.noeuds += len(coups)
+        if self._temps_ecoule():
+            raise _TempsEcoule()
+        for indice, coup in enumerate(coups):
+            plateau.jouer_coup(coup, joueur)
+            if plateau.verifier_alignement(adversaire):
+                scores[indice] = ply + 1 - VICTOIRE
+            elif plateau.verifier_alignement(joueur):
+                scores[indice] = VICTOIRE - ply - 1
+            else:
+                feuilles.append(indice)
+                mien.append(occupation[joueur])
+                adverse.append(occupation[adversaire])
+                claire.append(plateau.claire)
+            plateau.annuler_coup(coup, joueur)
+        self.evaluations += len(feuilles)
+        for indice, score in zip(feuilles, self.evaluer_lot(mien, adverse, claire)):
+            scores[indice] = score
+        return scores
+
+    @staticmethod
+    def _coups_ordonnes(plateau, joueur, premier):
+        '''
+        Génère les coups légaux en commençant par le coup conseillé
+        Préconditions:
+            premier: coup légal à essayer d'abord, ou None
+        Postconditions: génère chaque coup légal une seule fois
+        '''
+        if premier is None:
+            yield from plateau.coups_legaux(joueur)
+            return
+        yield premier
+        for coup in plateau.coups_legaux(joueur):
+            if coup != premier:
+                yield coup
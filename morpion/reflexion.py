@@ -0,0 +1,249 @@
+'''
+Calcul des coups de l'IA dans un thread de travail
+
+L'interface dépose une demande et relève la réponse sans jamais attendre :
+la recherche ne bloque pas la boucle d'événements. Chaque demande porte un
+numéro ; annuler en change, si bien qu'une réponse calculée pour une
+partie abandonnée n'est jamais rendue. Chaque demande porte aussi son
+propre événement d'annulation, transmis à la recherche : une demande
+remplacée s'arrête même si sa recherche n'avait pas encore commencé.
+
+Pendant le tour de l'adversaire, le thread peut méditer : il calcule
+d'avance, avec le budget normal du niveau, la réponse de l'IA aux coups
+adverses les plus probables. Si le coup joué a été médité, la réponse est
+immédiate ; s'il est en cours de méditation, la recherche continue et
+sert de réponse. Les coups médités ne sont ajoutés à IA.statistiques (et à
+son journal) que s'ils sont joués.
+'''
+import queue
+import threading
+
+from .evaluation import evaluateur
+from .ia import IA
+from .plateau import ADVERSAIRE
+from .statistiques import Statistiques
+
+
+def coups_probables(plateau, joueur):
+    '''
+    Classe les coups d'un joueur du plus au moins probable
+    Préconditions:
+        plateau: objet Plateau (n'est pas modifié)
+        joueur: le joueur au trait
+    Postconditions: renvoie la liste des (coup, plateau après le coup) qui ne
+                    terminent pas la partie, les mieux évalués pour joueur d'abord
+    '''
+    adversaire = ADVERSAIRE[joueur]
+    evaluer = evaluateur(plateau.configuration)
+    candidats = []
+    for coup in plateau.coups_legaux(joueur):
+        plateau.jouer_coup(coup, joueur)
+        if not plateau.verifier_alignement(adversaire) and not plateau.verifier_alignement(joueur):
+            candidats.append((evaluer(plateau, joueur), len(candidats), coup, plateau.copier()))
+        plateau.annuler_coup(coup, joueur)
+    candidats.sort(key=lambda candidat: (-candidat[0], candidat[1]))
+    return [(coup, suivant) for _, _, coup, suivant in candidats]
+
+
+class Reflexion:
+    '''
+    Thread de travail unique qui calcule les coups de l'IA
+    '''
+    def __init__(self):
+        '''
+        Initialise la réflexion (le thread est démarré à la première demande)
+        Préconditions: aucune
+        Postconditions: aucune demande n'est en cours
+        '''
+        self._demandes = queue.Queue()
+        self._reponses = queue.Queue()
+        self._verrou = threading.Lock()
+        self._numero = 0
+        # Événement d'annulation de la demande en cours
+        self._annulation = threading.Event()
+        self._thread = None
+        # Réponses méditées : (clé de position, niveau) -> (coup, statistiques)
+        self._meditees = {}
+        # Position en cours de méditation, et demande qui attend sa réponse
+        self._en_cours = None
+        self._attendue = None
+        # Mesures des recherches de méditation, tenues hors de IA.statistiques
+        self._statistiques_meditation = Statistiques(historique=1)
+        self.succes_meditation = 0
+        # Statistiques du dernier coup rendu par reponse (StatistiquesCoup ou None)
+        self.statistiques = None
+
+    def demander(self, plateau, joueur, jetons_restants, niveau):
+        '''
+        Demande un coup à l'IA
+        Préconditions:
+            plateau: objet Plateau (copié : l'interface peut continuer à le modifier)
+            joueur: le joueur au trait
+            jetons_restants: nombre de jetons restants du joueur
+            niveau: niveau de IA.jouer
+        Postconditions: annule la demande précédente ; rend la réponse méditée si elle
+                        existe, sinon lance le calcul en arrière-plan
+        '''
+        cle = (plateau.cle_position(joueur), niveau)
+        with self._verrou:
+            self._numero += 1
+            numero = self._numero
+            if cle in self._meditees:
+                self.succes_meditation += 1
+                coup, statistiques = self._meditees[cle]
+                self._jouer_meditee(statistiques)
+                self._reponses.put((numero, coup, statistiques, None))
+                cle = None
+            elif cle == self._en_cours:
+                # La méditation en cours cherche justement ce coup : elle servira de réponse
+                self.succes_meditation += 1
+                self._attendue = numero
+                return
+            annulation = self._remplacer_annulation()
+        if cle is not None:
+            self._envoyer((numero, "jouer", plateau.copier(), joueur, jetons_restants, niveau,
+                           annulation))
+
+    def mediter(self, plateau, adversaire, niveau):
+        '''
+        Médite pendant le tour de l'adversaire de l'IA
+        Préconditions:
+            plateau: objet Plateau, l'adversaire au trait (copié)
+            adversaire: le joueur au trait, contre qui l'IA joue
+            niveau: niveau de IA.jouer utilisé pour les réponses
+        Postconditions: annule la demande précédente et calcule en arrière-plan les
+                        réponses aux coups probables, jusqu'à la prochaine demande
+        '''
+        with self._verrou:
+            self._numero += 1
+            numero = self._numero
+            self._meditees = {}
+            annulation = self._remplacer_annulation()
+        self._envoyer((numero, "mediter", plateau.copier(), adversaire, None, niveau, annulation))
+
+    def annuler(self):
+        '''
+        Annule la demande en cours
+        Préconditions: aucune
+        Postconditions: la recherche en cours est interrompue et sa réponse ne sera pas rendue
+        '''
+        with self._verrou:
+            self._numero += 1
+            self._attendue = None
+            self._remplacer_annulation()
+
+    def _remplacer_annulation(self):
+        '''
+        Annule la recherche de la demande précédente et crée l'événement de la suivante
+        Préconditions: le verrou est tenu
+        Postconditions: renvoie le nouvel événement d'annulation
+        '''
+        self._annulation.set()
+        self._annulation = threading.Event()
+        return self._annulation
+
+    @staticmethod
+    def _jouer_meditee(statistiques):
+        '''
+        Enregistre les mesures d'un coup médité au moment où il est joué
+        Préconditions:
+            statistiques: StatistiquesCoup de la méditation, ou None
+        Postconditions: le coup est marqué médité et ajouté à IA.statistiques
+        '''
+        if statistiques is not None:
+            statistiques.meditee = True
+            IA.statistiques.ajouter(statistiques)
+
+    def reponse(self):
+        '''
+        Relève la réponse de la dernière demande, sans attendre
+        Préconditions: aucune
+        Postconditions: renvoie le coup (format de IA.jouer), ou None s'il n'est pas prêt ;
+                        les réponses des demandes annulées sont ignorées.
+                        statistiques reçoit les mesures du coup rendu.
+                        Une exception levée par le calcul est relevée ici.
+        '''
+        while True:
+            try:
+                numero, coup, statistiques, erreur = self._reponses.get_nowait()
+            except queue.Empty:
+                return None
+            if numero != self._numero:
+                continue
+            if erreur is not None:
+                raise erreur
+            self.statistiques = statistiques
+            return coup
+
+    def _envoyer(self, demande):
+        '''
+        Transmet une demande au thread de travail, démarré au premier appel
+        Préconditions:
+            demande: tuple (numéro, type, plateau, joueur, jetons restants, niveau, annulation)
+        Postconditions: la demande sera traitée après les précédentes
+        '''
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._travailler, daemon=True)
+            self._thread.start()
+        self._demandes.put(demande)
+
+    def _travailler(self):
+        '''
+        Boucle du thread de travail
+        Préconditions: aucune
+        Postconditions: traite les demandes une à une, indéfiniment
+        '''
+        while True:
+            numero, genre, plateau, joueur, jetons_restants, niveau, annulation = self._demandes.get()
+            if numero != self._numero or annulation.is_set():
+                continue
+            try:
+                if genre == "mediter":
+                    self._mediter(numero, plateau, joueur, niveau, annulation)
+                else:
+                    statistiques = Statistiques(historique=1)
+                    coup = IA.jouer(plateau, joueur, jetons_restants, niveau, annulation, statistiques)
+                    if annulation.is_set():
+                        # Réponse d'une demande remplacée : ni rendue, ni mesurée
+                        continue
+                    IA.statistiques.ajouter(statistiques.dernier)
+                    self._reponses.put((numero, coup, statistiques.dernier, None))
+            except Exception as erreur:
+                # Le thread doit survivre : l'erreur est transmise à l'interface
+                with self._verrou:
+                    numero = self._attendue or numero
+                    self._attendue = self._en_cours = None
+                self._reponses.put((numero, None, None, erreur))
+
+    def _mediter(self, numero, plateau, adversaire, niveau, annulation):
+        '''
+        Calcule les réponses de l'IA aux coups probables de l'adversaire
+        Préconditions:
+            numero: numéro de la demande de méditation
+            annulation: événement d'annulation de la méditation
+        Postconditions: s'arrête dès qu'une autre demande arrive, sauf si elle porte
+                        sur la position en cours de méditation
+        '''
+        joueur = ADVERSAIRE[adversaire]
+        for _, suivant in coups_probables(plateau, adversaire):
+            cle = (suivant.cle_position(joueur), niveau)
+            with self._verrou:
+                if self._numero != numero:
+                    return
+                if cle in self._meditees:
+                    continue
+                self._en_cours = cle
+            coup = IA.jouer(suivant, joueur, None, niveau, annulation, self._statistiques_meditation)
+            statistiques = self._statistiques_meditation.dernier
+            with self._verrou:
+                self._en_cours = None
+                if self._attendue is not None:
+                    # Le coup médité vient d'être joué : la réponse est attendue
+                    self._jouer_meditee(statistiques)
+                    self._reponses.put((self._attendue, coup, statistiques, None))
+                    self._attendue = None
+                    return
+                if self._numero != numero:
+                    # Recherche interrompue : son résultat n'a pas la force du niveau
+                    return
+                self._meditees[cle] = (coup, statistiques)
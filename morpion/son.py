@@ -0,0 +1,174 @@
+'''
+Sons du jeu, joués par un thread unique
+
+Les sons sont déposés dans une file bornée et joués un à un par un thread
+de longue durée : jouer ne bloque jamais et ne crée pas de thread. Quand
+la file est pleine, le nouveau son est abandonné. La sortie est
+interchangeable : winsound sous Windows, une sortie muette ailleurs, et
+une sortie qui enregistre les sons pour les essais sans interface.
+'''
+import queue
+import threading
+
+# Nombre de sons en attente au-delà duquel les nouveaux sont abandonnés
+CAPACITE_FILE = 4
+
+
+class SortieMuette:
+    '''
+    Sortie qui ne joue rien
+    '''
+    # Une sortie instantanée est appelée directement, sans thread
+    bloquante = False
+
+    def jouer(self, frequence, duree):
+        '''
+        Ignore un son
+        Préconditions:
+            frequence: fréquence en Hz
+            duree: durée en millisecondes
+        Postconditions: aucune
+        '''
+
+
+class SortieEnregistreuse:
+    '''
+    Sortie qui enregistre les sons au lieu de les jouer (essais, mode sans interface)
+    '''
+    bloquante = False
+
+    def __init__(self):
+        '''
+        Initialise un enregistrement vide
+        Préconditions: aucune
+        Postconditions: sons est une liste vide
+        '''
+        self.sons = []
+
+    def jouer(self, frequence, duree):
+        '''
+        Enregistre un son
+        Préconditions:
+            frequence: fréquence en Hz
+            duree: durée en millisecondes
+        Postconditions: (frequence, duree) est ajouté à sons
+        '''
+        self.sons.append((frequence, duree))
+
+
+class SortieWinsound:
+    '''
+    Sortie par le haut-parleur de Windows
+    '''
+    # winsound.Beep rend la main à la fin du son
+    bloquante = True
+
+    def __init__(self):
+        '''
+        Charge winsound
+        Préconditions: aucune
+        Postconditions: lève ImportError hors de Windows
+        '''
+        import winsound
+
+        self._winsound = winsound
+
+    def jouer(self, frequence, duree):
+        '''
+        Joue un bip
+        Préconditions:
+            frequence: fréquence en Hz (37 à 32767)
+            duree: durée en millisecondes
+        Postconditions: rend la main à la fin du son ; lève RuntimeError sans périphérique audio
+        '''
+        self._winsound.Beep(frequence, duree)
+
+
+def sortie_par_defaut():
+    '''
+    Choisit la sortie adaptée à la plateforme
+    Préconditions: aucune
+    Postconditions: renvoie une SortieWinsound sous Windows, une SortieMuette sinon
+    '''
+    try:
+        return SortieWinsound()
+    except ImportError:
+        return SortieMuette()
+
+
+class LecteurSon:
+    '''
+    Joue les sons dans un thread unique alimenté par une file bornée
+    '''
+    def __init__(self, sortie=None, capacite=CAPACITE_FILE):
+        '''
+        Initialise le lecteur (le thread est démarré au premier son)
+        Préconditions:
+            sortie: objet avec une méthode jouer(frequence, duree) et un attribut
+                    bloquante (None pour sortie_par_defaut())
+            capacite: nombre maximal de sons en attente
+        Postconditions: aucun son n'est en attente
+        '''
+        self.sortie = sortie if sortie is not None else sortie_par_defaut()
+        self._file = queue.Queue(capacite)
+        self._thread = None
+        self.sons_abandonnes = 0
+        self.erreur = None
+
+    def jouer(self, frequence, duree=100):
+        '''
+        Demande un son, sans jamais attendre
+        Préconditions:
+            frequence: fréquence en Hz
+            duree: durée en millisecondes
+        Postconditions: le son est joué plus tard, ou abandonné si la file est pleine
+        '''
+        if not self.sortie.bloquante:
+            self.sortie.jouer(frequence, duree)
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._travailler, daemon=True)
+            self._thread.start()
+        try:
+            self._file.put_nowait((frequence, duree))
+        except queue.Full:
+            self.sons_abandonnes += 1
+
+    def fermer(self):
+        '''
+        Arrête le thread, sans jamais attendre
+        Préconditions: aucune
+        Postconditions: les sons en attente et les suivants sont abandonnés ; le thread
+                        s'arrête à la fin du son en cours
+        '''
+        self.sortie = SortieMuette()
+        if self._thread is not None:
+            # Vider la file garantit une place au signal d'arrêt
+            while True:
+                try:
+                    self._file.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                self._file.put_nowait(None)
+            except queue.Full:
+                # Un son a pris la place entre-temps : le thread muet finira de lui-même (daemon)
+                pass
+            self._thread = None
+
+    def _travailler(self):
+        '''
+        Boucle du thread de lecture
+        Préconditions: aucune
+        Postconditions: joue les sons un à un jusqu'à la fermeture
+        '''
+        while True:
+            son = self._file.get()
+            if son is None:
+                return
+            try:
+                self.sortie.jouer(*son)
+            except RuntimeError as erreur:
+                # Pas de périphérique audio : on se tait, l'erreur reste consultable
+                self.erreur = erreur
+                self.sortie = SortieMuette()
@@ -0,0 +1,204 @@
+'''
+Statistiques des coups de l'IA
+
+Chaque coup de l'IA produit un objet StatistiquesCoup : durée réelle,
+noeuds visités, évaluations, taux de succès de la table de transposition,
+profondeur atteinte et variante principale. Les derniers coups sont gardés
+en mémoire et peuvent être ajoutés à un journal JSON (une ligne par coup),
+qui conserve aussi la position pour retrouver les coups les plus lents.
+'''
+import collections
+import json
+import threading
+import time
+
+from .plateau import coup_vers_texte
+
+# Nombre de coups gardés en mémoire
+HISTORIQUE = 1000
+
+
+class StatistiquesCoup:
+    '''
+    Mesures d'un coup de l'IA
+    '''
+    def __init__(self, plateau, joueur, source, coup, duree, noeuds=0, evaluations=0,
+                 succes_table=0, sondages_table=0, profondeur=0, score=None, variante=(),
+                 simulations=0):
+        '''
+        Enregistre les mesures d'un coup
+        Préconditions:
+            plateau: objet Plateau avant le coup (n'est pas conservé)
+            joueur: le joueur au trait
+            source: "livre", "tablebase", "recherche", "parallele", "mcts" ou "hasard"
+            coup: tuple (source, destination, case, face) joué, ou None
+            duree: temps réel du coup en secondes
+            noeuds, evaluations: noeuds visités et positions évaluées
+            succes_table, sondages_table: lectures réussies et lectures de la table
+            profondeur: profondeur complètement cherchée
+            score: score du coup du point de vue de joueur (None hors recherche)
+            variante: suite de coups attendue, coup joué compris
+            simulations: parties simulées (joueur Monte-Carlo)
+        Postconditions: les mesures sont des attributs de l'objet
+        '''
+        self.date = time.time()
+        self.position = (plateau.occupation["joueur1"], plateau.occupation["joueur2"], plateau.claire)
+        # Les coups sont écrits dans la notation de la variante du plateau
+        self.configuration = plateau.configuration
+        self.joueur = joueur
+        self.source = source
+        self.coup = coup
+        self.duree = duree
+        self.noeuds = noeuds
+        self.evaluations = evaluations
+        self.succes_table = succes_table
+        self.sondages_table = sondages_table
+        self.profondeur = profondeur
+        self.score = score
+        self.variante = list(variante)
+        self.simulations = simulations
+        # Vrai si la réponse avait été calculée pendant le tour de l'adversaire
+        self.meditee = False
+
+    @property
+    def taux_succes(self):
+        '''
+        Taux de succès de la table de transposition pendant le coup
+        Préconditions: aucune
+        Postconditions: renvoie un nombre entre 0 et 1
+        '''
+        return self.succes_table / self.sondages_table if self.sondages_table else 0.0
+
+    @property
+    def noeuds_par_seconde(self):
+        '''
+        Vitesse de la recherche
+        Préconditions: aucune
+        Postconditions: renvoie le nombre de noeuds par seconde (0 si la durée est nulle)
+        '''
+        return self.noeuds / self.duree if self.duree else 0.0
+
+    def en_dict(self):
+        '''
+        Convertit les mesures pour le journal
+        Préconditions: aucune
+        Postconditions: renvoie un dictionnaire sérialisable en JSON ;
+                        les coups sont écrits en notation texte
+        '''
+        return {
+            "date": round(self.date, 3),
+            "joueur1": self.position[0],
+            "joueur2": self.position[1],
+            "claire": self.position[2],
+            "dimensions": [self.configuration.hauteur, self.configuration.largeur,
+                           self.configuration.alignement],
+            "joueur": self.joueur,
+            "source": self.source,
+            "coup": coup_vers_texte(self.coup, self.configuration) if self.coup else None,
+            "duree": round(self.duree, 6),
+            "noeuds": self.noeuds,
+            "evaluations": self.evaluations,
+            "succes_table": self.succes_table,
+            "sondages_table": self.sondages_table,
+            "profondeur": self.profondeur,
+            "score": self.score,
+            "variante": [coup_vers_texte(coup, self.configuration) for coup in self.variante],
+            "simulations": self.simulations,
+        }
+
+    def resume(self):
+        '''
+        Résume les mesures pour l'affichage
+        Préconditions: aucune
+        Postconditions: renvoie un texte de deux lignes
+        '''
+        origine = self.source + (", médité" if self.meditee else "")
+        variante = " ".join(coup_vers_texte(coup, self.configuration) for coup in self.variante) or "-"
+        if self.simulations:
+            return (f"{origine} | {1000 * self.duree:.0f} ms | {self.simulations} simulations"
+                    f" ({self.simulations / self.duree if self.duree else 0:.0f}/s) | {self.noeuds} noeuds"
+                    f" | prof. {self.profondeur}\nVP : {variante}")
+        return (f"{origine} | {1000 * self.duree:.0f} ms | {self.noeuds} noeuds"
+                f" | {self.evaluations} éval. | table {100 * self.taux_succes:.0f} %"
+                f" | prof. {self.profondeur}\nVP : {variante}")
+
+
+class Statistiques:
+    '''
+    Historique des statistiques des coups de l'IA, avec journal facultatif
+    '''
+    def __init__(self, historique=HISTORIQUE):
+        '''
+        Initialise un historique vide, sans journal
+        Préconditions:
+            historique: nombre de coups gardés en mémoire
+        Postconditions: aucun coup n'est enregistré
+        '''
+        self.coups = collections.deque(maxlen=historique)
+        self.journal = None
+        self._verrou = threading.Lock()
+
+    @property
+    def dernier(self):
+        '''
+        Statistiques du dernier coup
+        Préconditions: aucune
+        Postconditions: renvoie un StatistiquesCoup, ou None si aucun coup n'est enregistré
+        '''
+        return self.coups[-1] if self.coups else None
+
+    def ouvrir_journal(self, chemin):
+        '''
+        Ajoute désormais chaque coup à un journal JSON
+        Préconditions:
+            chemin: fichier ouvert en ajout, une ligne JSON par coup
+        Postconditions: le journal précédent est fermé
+        '''
+        with self._verrou:
+            if self.journal is not None:
+                self.journal.close()
+            self.journal = open(chemin, "a", encoding="utf-8")
+
+    def fermer_journal(self):
+        '''
+        Cesse d'écrire le journal
+        Préconditions: aucune
+        Postconditions: le fichier du journal est fermé
+        '''
+        with self._verrou:
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+
+    def ajouter(self, statistiques):
+        '''
+        Enregistre les statistiques d'un coup
+        Préconditions:
+            statistiques: objet StatistiquesCoup
+        Postconditions: le coup est gardé en mémoire et écrit dans le journal s'il est ouvert
+        '''
+        with self._verrou:
+            self.coups.append(statistiques)
+            if self.journal is not None:
+                self.journal.write(json.dumps(statistiques.en_dict()) + "\n")
+                # Une ligne complète par coup : le journal reste lisible si le jeu s'arrête
+                self.journal.flush()
+
+    def resume(self):
+        '''
+        Agrège les coups gardés en mémoire
+        Préconditions: aucune
+        Postconditions: renvoie un dictionnaire (coups, durée moyenne et maximale,
+                        noeuds par seconde, profondeur moyenne, taux de succès de la table)
+        '''
+        coups = list(self.coups)
+        duree = sum(coup.duree for coup in coups)
+        sondages = sum(coup.sondages_table for coup in coups)
+        return {
+            "coups": len(coups),
+            "duree_moyenne": duree / len(coups) if coups else 0.0,
+            "duree_max": max((coup.duree for coup in coups), default=0.0),
+            "noeuds_par_seconde": sum(coup.noeuds for coup in coups) / duree if duree else 0.0,
+            "profondeur_moyenne": sum(coup.profondeur for coup in coups) / len(coups) if coups else 0.0,
+            "taux_succes": sum(coup.succes_table for coup in coups) / sondages if sondages else 0.0,
+        }
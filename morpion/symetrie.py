@@ -0,0 +1,224 @@
+'''
+Symétries du plateau et forme canonique des positions
+
+Les règles sont invariantes par les 8 symétries du carré (rotations et
+réflexions) ainsi que par l'échange des faces claires et sombres de tous
+les jetons : une victoire ne demande que trois faces identiques.
+Une transformation est un entier de 0 à 15 : t % 8 désigne la symétrie
+du carré et t >= 8 indique l'échange des faces.
+'''
+from .plateau import JETONS_PAR_JOUEUR, TAILLE, Plateau
+
+NB_TRANSFORMATIONS = 16
+
+# Position du bit du trait dans une clé canonique
+_DECALAGE_TRAIT = 3 * TAILLE * TAILLE
+
+
+def _calculer_permutations():
+    '''
+    Calcule l'image de chaque case par les 8 symétries du carré
+    Préconditions: aucune
+    Postconditions: renvoie un tuple de 8 tuples (case -> case transformée)
+    '''
+    n = TAILLE - 1
+    images = [
+        lambda l, c: (l, c),
+        lambda l, c: (c, n - l),
+        lambda l, c: (n - l, n - c),
+        lambda l, c: (n - c, l),
+        lambda l, c: (l, n - c),
+        lambda l, c: (n - l, c),
+        lambda l, c: (c, l),
+        lambda l, c: (n - c, n - l),
+    ]
+    permutations = []
+    for image in images:
+        permutation = []
+        for case in range(TAILLE * TAILLE):
+            ligne, col = image(*divmod(case, TAILLE))
+            permutation.append(ligne * TAILLE + col)
+        permutations.append(tuple(permutation))
+    return tuple(permutations)
+
+
+PERMUTATIONS = _calculer_permutations()
+
+
+def _calculer_inverses():
+    '''
+    Calcule l'inverse de chaque symétrie du carré
+    Préconditions: aucune
+    Postconditions: renvoie un tuple (symétrie -> symétrie inverse)
+    '''
+    inverses = []
+    for permutation in PERMUTATIONS:
+        inverse = tuple(permutation.index(case) for case in range(TAILLE * TAILLE))
+        inverses.append(PERMUTATIONS.index(inverse))
+    return tuple(inverses)
+
+
+_INVERSES = _calculer_inverses()
+
+
+def _calculer_tables_lignes():
+    '''
+    Précalcule l'image de chaque ligne possible du plateau par chaque symétrie
+    Préconditions: aucune
+    Postconditions: renvoie TABLES[symetrie][ligne][motif] = masque transformé
+    '''
+    tables = []
+    for permutation in PERMUTATIONS:
+        par_ligne = []
+        for ligne in range(TAILLE):
+            motifs = []
+            for motif in range(1 << TAILLE):
+                masque = 0
+                for col in range(TAILLE):
+                    if motif >> col & 1:
+                        masque |= 1 << permutation[ligne * TAILLE + col]
+                motifs.append(masque)
+            par_ligne.append(tuple(motifs))
+        tables.append(tuple(par_ligne))
+    return tuple(tables)
+
+
+_TABLES = _calculer_tables_lignes()
+_MOTIF = (1 << TAILLE) - 1
+
+
+def transformer_masque(masque, symetrie):
+    '''
+    Applique une symétrie du carré à un masque de cases
+    Préconditions:
+        masque: masque de cases
+        symetrie: entier de 0 à 7
+    Postconditions: renvoie le masque transformé
+    '''
+    resultat = 0
+    for table in _TABLES[symetrie]:
+        resultat |= table[masque & _MOTIF]
+        masque >>= TAILLE
+    return resultat
+
+
+def inverse(transformation):
+    '''
+    Transformation inverse
+    Préconditions:
+        transformation: entier de 0 à 15
+    Postconditions: renvoie la transformation qui annule celle donnée
+    '''
+    return _INVERSES[transformation % 8] + (transformation & 8)
+
+
+def transformer_position(joueur1, joueur2, claire, transformation):
+    '''
+    Applique une transformation aux bitboards d'une position
+    Préconditions:
+        joueur1, joueur2, claire: bitboards de la position
+        transformation: entier de 0 à 15
+    Postconditions: renvoie les bitboards (joueur1, joueur2, claire) transformés
+    '''
+    symetrie = transformation % 8
+    joueur1 = transformer_masque(joueur1, symetrie)
+    joueur2 = transformer_masque(joueur2, symetrie)
+    claire = transformer_masque(claire, symetrie)
+    if transformation & 8:
+        claire ^= joueur1 | joueur2
+    return joueur1, joueur2, claire
+
+
+def transformer_plateau(plateau, transformation):
+    '''
+    Applique une transformation à un plateau
+    Préconditions:
+        plateau: objet Plateau
+        transformation: entier de 0 à 15
+    Postconditions: renvoie un nouveau Plateau transformé
+    '''
+    return Plateau.depuis_masques(*transformer_position(
+        plateau.occupation["joueur1"], plateau.occupation["joueur2"],
+        plateau.claire, transformation
+    ), plateau.jetons_par_joueur)
+
+
+def transformer_coup(coup, transformation):
+    '''
+    Applique une transformation à un coup
+    Préconditions:
+        coup: tuple (source, destination, case, face)
+        transformation: entier de 0 à 15
+    Postconditions: renvoie le coup correspondant dans la position transformée
+    '''
+    source, destination, case, face = coup
+    permutation = PERMUTATIONS[transformation % 8]
+    if source is not None:
+        source = permutation[source]
+        destination = permutation[destination]
+    if case is not None:
+        case = permutation[case]
+        if transformation & 8:
+            face = not face
+    return (source, destination, case, face)
+
+
+def forme_canonique(joueur1, joueur2, claire):
+    '''
+    Forme canonique d'une position donnée par ses bitboards
+    Préconditions:
+        joueur1, joueur2, claire: bitboards de la position
+    Postconditions: renvoie (forme, transformation) où forme est le plus petit
+                    entier joueur1 | joueur2 << 16 | claire << 32 parmi les 16
+                    transformées, obtenu en appliquant transformation
+    '''
+    decalage = TAILLE * TAILLE
+    meilleure = None
+    meilleure_transformation = 0
+    for symetrie in range(8):
+        j1 = transformer_masque(joueur1, symetrie)
+        j2 = transformer_masque(joueur2, symetrie)
+        cl = transformer_masque(claire, symetrie)
+        base = j1 | j2 << decalage
+        for transformation, faces in ((symetrie, cl), (symetrie + 8, cl ^ (j1 | j2))):
+            forme = base | faces << (2 * decalage)
+            if meilleure is None or forme < meilleure:
+                meilleure = forme
+                meilleure_transformation = transformation
+    return meilleure, meilleure_transformation
+
+
+def canonique(plateau, joueur):
+    '''
+    Clé canonique d'une position avec le joueur au trait
+    Préconditions:
+        plateau: objet Plateau
+        joueur: "joueur1" ou "joueur2", le joueur au trait
+    Postconditions: renvoie (cle, transformation) ; deux positions symétriques ont
+                    la même clé, et transformer_coup(coup, inverse(transformation))
+                    ramène un coup de la forme canonique dans l'orientation du plateau
+    '''
+    forme, transformation = forme_canonique(
+        plateau.occupation["joueur1"], plateau.occupation["joueur2"], plateau.claire
+    )
+    if joueur == "joueur2":
+        forme |= 1 << _DECALAGE_TRAIT
+    return forme, transformation
+
+
+def depuis_cle(cle, jetons_par_joueur=JETONS_PAR_JOUEUR):
+    '''
+    Reconstruit la position correspondant à une clé canonique
+    Préconditions:
+        cle: clé renvoyée par canonique
+        jetons_par_joueur: nombre de jetons de chaque joueur en début de partie
+    Postconditions: renvoie (plateau, joueur au trait)
+    '''
+    decalage = TAILLE * TAILLE
+    masque = (1 << decalage) - 1
+    plateau = Plateau.depuis_masques(
+        cle & masque, cle >> decalage & masque, cle >> (2 * decalage) & masque,
+        jetons_par_joueur
+    )
+    joueur = "joueur2" if cle >> _DECALAGE_TRAIT & 1 else "joueur1"
+    return plateau, joueur
@@ -0,0 +1,492 @@
+'''
+Résolution rétrograde complète et table de finales sur disque
+
+Chaque couche regroupe les positions ayant le même nombre de jetons posés.
+Un coup pose un jeton de plus, sauf quand le joueur au trait n'en a plus :
+il ne fait alors que retourner un jeton et la position reste dans sa
+couche. Dès qu'un joueur a posé tous ses jetons, une couche contient donc
+des coups internes et peut boucler ; la dernière couche (les deux joueurs
+à court de jetons) n'a plus que de tels coups. L'analyse rétrograde de
+chaque couche traite ces coups internes, et ce qui n'est ni gagné ni
+perdu est nul.
+
+La construction se fait en deux temps, avec une sauvegarde par couche
+dans un répertoire de travail pour pouvoir la reprendre :
+  1. énumération en avant des positions atteignables (formes canoniques) ;
+  2. analyse rétrograde de la dernière couche vers la première.
+
+Le fichier produit est une table de hachage à adressage ouvert d'entiers
+de 64 bits (clé canonique et valeur), lue par projection mémoire.
+
+Le jeu complet (8 jetons par joueur) compte de l'ordre de 10**10 positions,
+hors de portée d'une construction en Python : la table se construit pour
+un nombre réduit de jetons par joueur (3 par défaut), et ne répond que
+pour les parties jouées avec ce nombre de jetons (Tablebase.couvre). Une
+position du jeu à 8 jetons n'est jamais couverte, même en fin de partie :
+les jetons posés y sont plus nombreux que dans toute position de la table.
+Le jeu (à 8 jetons) ne charge donc pas de table.
+
+Usage: python -m morpion.tablebase --jetons 3 --sortie finales3.tb
+'''
+import argparse
+import heapq
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from .plateau import ADVERSAIRE, Plateau
+from .symetrie import canonique, depuis_cle
+
+# Résultats, du point de vue du joueur au trait
+GAIN = 1
+PERTE = 2
+NUL = 3
+
+_MAGIQUE = b"MDRTB001"
+_ENTETE = struct.Struct("<8sIIQ")
+_ENTREE = struct.Struct("<Q")
+
+# Une entrée vaut cle | code << _DECALAGE_CODE, et code = resultat << _BITS_DISTANCE | distance
+_DECALAGE_CODE = 49
+_BITS_DISTANCE = 13
+_MASQUE_CLE = (1 << _DECALAGE_CODE) - 1
+_MASQUE_DISTANCE = (1 << _BITS_DISTANCE) - 1
+_MULTIPLICATEUR = 0x9E3779B97F4A7C15
+_MASQUE_64 = (1 << 64) - 1
+
+# Nombre de positions traitées entre deux messages de progression
+_INTERVALLE_RAPPORT = 50000
+
+
+def _coder(resultat, distance):
+    '''
+    Code un résultat et sa distance sur 15 bits
+    Préconditions:
+        resultat: GAIN, PERTE ou NUL
+        distance: nombre de coups avant la fin de partie
+    Postconditions: renvoie le code
+    '''
+    return resultat << _BITS_DISTANCE | min(distance, _MASQUE_DISTANCE)
+
+
+def _indice(cle, bits):
+    '''
+    Case de départ d'une clé dans une table de 2**bits entrées
+    Préconditions:
+        cle: clé canonique
+        bits: logarithme en base 2 de la taille de la table
+    Postconditions: renvoie un indice entre 0 et 2**bits - 1
+    '''
+    return (cle * _MULTIPLICATEUR & _MASQUE_64) >> (64 - bits)
+
+
+def _couche(cle):
+    '''
+    Nombre de jetons posés dans une position canonique
+    Préconditions:
+        cle: clé renvoyée par canonique
+    Postconditions: renvoie le numéro de couche
+    '''
+    return (cle & 0xFFFFFFFF).bit_count()
+
+
+def successeurs(plateau, joueur):
+    '''
+    Génère les issues des coups légaux d'une position
+    Préconditions:
+        plateau: objet Plateau (modifié puis restauré entre deux issues)
+        joueur: le joueur au trait
+    Postconditions: génère des tuples (coup, immediat, cle) où immediat vaut GAIN ou
+                    PERTE si le coup termine la partie (cle vaut alors None), et None
+                    sinon (cle est alors la clé canonique de la position suivante)
+    '''
+    adversaire = ADVERSAIRE[joueur]
+    for coup in plateau.coups_legaux(joueur):
+        plateau.jouer_coup(coup, joueur)
+        if plateau.verifier_alignement(adversaire):
+            issue = (coup, PERTE, None)
+        elif plateau.verifier_alignement(joueur):
+            issue = (coup, GAIN, None)
+        else:
+            issue = (coup, None, canonique(plateau, adversaire)[0])
+        plateau.annuler_coup(coup, joueur)
+        yield issue
+
+
+class Tablebase:
+    '''
+    Table de finales projetée en mémoire
+    '''
+    def __init__(self, chemin):
+        '''
+        Ouvre une table construite par construire
+        Préconditions:
+            chemin: chemin du fichier de la table
+        Postconditions: projette le fichier en mémoire ; lève ValueError s'il est invalide
+        '''
+        self._fichier = open(chemin, "rb")
+        self._memoire = mmap.mmap(self._fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        magique, self.jetons, self._bits, self.nb_positions = _ENTETE.unpack_from(self._memoire, 0)
+        if magique != _MAGIQUE:
+            self.fermer()
+            raise ValueError(f"{chemin} n'est pas une table de finales")
+        self._masque = (1 << self._bits) - 1
+
+    def fermer(self):
+        '''
+        Ferme la table
+        Préconditions: aucune
+        Postconditions: libère la projection mémoire et le fichier
+        '''
+        self._memoire.close()
+        self._fichier.close()
+
+    def lire(self, cle):
+        '''
+        Cherche une position par sa clé canonique
+        Préconditions:
+            cle: clé renvoyée par canonique
+        Postconditions: renvoie (resultat, distance) ou None si la position est absente
+        '''
+        indice = _indice(cle, self._bits)
+        while True:
+            entree = _ENTREE.unpack_from(self._memoire, _ENTETE.size + 8 * indice)[0]
+            if not entree:
+                return None
+            if entree & _MASQUE_CLE == cle:
+                code = entree >> _DECALAGE_CODE
+                return code >> _BITS_DISTANCE, code & _MASQUE_DISTANCE
+            indice = (indice + 1) & self._masque
+
+    def couvre(self, plateau):
+        '''
+        Indique si la table s'applique aux parties de ce plateau
+        Préconditions:
+            plateau: objet Plateau
+        Postconditions: renvoie True si le nombre de jetons par joueur correspond
+        '''
+        return plateau.jetons_par_joueur == self.jetons
+
+    def consulter(self, plateau, joueur):
+        '''
+        Résultat théorique d'une position
+        Préconditions:
+            plateau: objet Plateau
+            joueur: le joueur au trait
+        Postconditions: renvoie (resultat, distance) du point de vue de joueur,
+                        ou None si la position n'est pas couverte
+        '''
+        if not self.couvre(plateau):
+            return None
+        return self.lire(canonique(plateau, joueur)[0])
+
+    def meilleur_coup(self, plateau, joueur):
+        '''
+        Coup parfait dans une position couverte
+        Préconditions:
+            plateau: objet Plateau
+            joueur: le joueur au trait
+        Postconditions: renvoie (coup, resultat, distance) ou None si la position
+                        n'est pas couverte ou n'a aucun coup légal. Le coup gagne au
+                        plus vite, sinon annule, sinon perd le plus tard possible.
+        '''
+        if not self.couvre(plateau):
+            return None
+        plateau = plateau.copier()
+        meilleur = None
+        meilleur_rang = None
+        for coup, immediat, cle in successeurs(plateau, joueur):
+            if immediat is not None:
+                resultat, distance = immediat, 1
+            else:
+                valeur = self.lire(cle)
+                if valeur is None:
+                    return None
+                resultat, distance = _inverser(*valeur)
+            # Classement : gain le plus court, puis nul, puis perte la plus longue
+            if resultat == GAIN:
+                rang = (0, distance)
+            elif resultat == NUL:
+                rang = (1, 0)
+            else:
+                rang = (2, -distance)
+            if meilleur_rang is None or rang < meilleur_rang:
+                meilleur, meilleur_rang = (coup, resultat, distance), rang
+        return meilleur
+
+
+def _inverser(resultat, distance):
+    '''
+    Valeur d'un coup à partir de la valeur de la position obtenue
+    Préconditions:
+        resultat, distance: valeur de la position, vue par l'adversaire
+    Postconditions: renvoie (resultat, distance) du point de vue du joueur qui a joué
+    '''
+    if resultat == GAIN:
+        return PERTE, distance + 1
+    if resultat == PERTE:
+        return GAIN, distance + 1
+    return NUL, 0
+
+
+def _chemin(repertoire, nom, couche):
+    '''
+    Chemin d'un fichier de sauvegarde d'une couche
+    Préconditions:
+        repertoire: répertoire de travail
+        nom: "cles", "graines" ou "valeurs"
+        couche: numéro de couche
+    Postconditions: renvoie le chemin du fichier
+    '''
+    return os.path.join(repertoire, f"couche{couche:02d}.{nom}")
+
+
+def _sauver(chemin, tableau):
+    '''
+    Écrit un tableau de façon atomique
+    Préconditions:
+        chemin: fichier de destination
+        tableau: objet array
+    Postconditions: le fichier n'apparaît qu'une fois entièrement écrit
+    '''
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "wb") as fichier:
+        tableau.tofile(fichier)
+    os.replace(temporaire, chemin)
+
+
+def _charger(chemin, type_code):
+    '''
+    Relit un tableau écrit par _sauver
+    Préconditions:
+        chemin: fichier existant
+        type_code: type des éléments ("Q" ou "H")
+    Postconditions: renvoie l'objet array
+    '''
+    tableau = array(type_code)
+    with open(chemin, "rb") as fichier:
+        tableau.frombytes(fichier.read())
+    return tableau
+
+
+def _enumerer(jetons, repertoire, rapport):
+    '''
+    Énumère les positions atteignables couche par couche
+    Préconditions:
+        jetons: nombre de jetons par joueur
+        repertoire: répertoire de travail (les couches déjà énumérées sont reprises)
+        rapport: fonction recevant les messages de progression
+    Postconditions: renvoie le nombre de couches ; chaque couche est sauvegardée
+    '''
+    derniere = 2 * jetons
+    cle_initiale = canonique(Plateau(jetons), "joueur1")[0]
+    graines = array("Q", [cle_initiale])
+    for couche in range(derniere + 1):
+        if os.path.exists(_chemin(repertoire, "cles", couche)):
+            if couche < derniere:
+                graines = _charger(_chemin(repertoire, "graines", couche + 1), "Q")
+            continue
+
+        debut = time.perf_counter()
+        vues = set(graines)
+        a_traiter = list(graines)
+        suivantes = set()
+        traitees = 0
+        while a_traiter:
+            plateau, joueur = depuis_cle(a_traiter.pop(), jetons)
+            for _, immediat, cle in successeurs(plateau, joueur):
+                if immediat is not None:
+                    continue
+                if _couche(cle) == couche:
+                    if cle not in vues:
+                        vues.add(cle)
+                        a_traiter.append(cle)
+                else:
+                    suivantes.add(cle)
+            traitees += 1
+            if not traitees % _INTERVALLE_RAPPORT:
+                rapport(f"  couche {couche}: {traitees} positions énumérées")
+
+        if couche < derniere:
+            _sauver(_chemin(repertoire, "graines", couche + 1), array("Q", sorted(suivantes)))
+        _sauver(_chemin(repertoire, "cles", couche), array("Q", sorted(vues)))
+        rapport(f"Énumération couche {couche}: {len(vues)} positions "
+                f"({time.perf_counter() - debut:.1f} s)")
+        graines = array("Q", sorted(suivantes))
+    return derniere + 1
+
+
+def _resoudre_couche(cles, jetons, valeurs_suivantes, rapport, couche):
+    '''
+    Analyse rétrograde d'une couche
+    Préconditions:
+        cles: clés triées des positions de la couche
+        jetons: nombre de jetons par joueur
+        valeurs_suivantes: dictionnaire clé -> code de la couche suivante
+        rapport: fonction recevant les messages de progression
+        couche: numéro de la couche (pour les messages)
+    Postconditions: renvoie un array "H" des codes des positions de la couche
+    '''
+    nb = len(cles)
+    indices = {cle: i for i, cle in enumerate(cles)}
+
+    # Coups sortant de la couche (ou finissant la partie) : valeur déjà connue
+    gain_externe = array("H", [0]) * nb
+    perte_externe = array("H", [0]) * nb
+    nul_externe = bytearray(nb)
+    # Coups restant dans la couche : arêtes vers les positions filles
+    aretes_parents = array("l")
+    aretes_enfants = array("l")
+    restants = array("l", [0]) * nb
+
+    for i, cle in enumerate(cles):
+        plateau, joueur = depuis_cle(cle, jetons)
+        for _, immediat, enfant in successeurs(plateau, joueur):
+            if immediat is not None:
+                resultat, distance = immediat, 1
+            elif enfant in indices:
+                aretes_parents.append(i)
+                aretes_enfants.append(indices[enfant])
+                restants[i] += 1
+                continue
+            else:
+                code = valeurs_suivantes[enfant]
+                resultat, distance = _inverser(code >> _BITS_DISTANCE, code & _MASQUE_DISTANCE)
+            if resultat == GAIN:
+                if not gain_externe[i] or distance < gain_externe[i]:
+                    gain_externe[i] = distance
+            elif resultat == PERTE:
+                perte_externe[i] = max(perte_externe[i], distance)
+            else:
+                nul_externe[i] = 1
+        if not (i + 1) % _INTERVALLE_RAPPORT:
+            rapport(f"  couche {couche}: {i + 1}/{nb} positions développées")
+
+    # Parents de chaque position, au format compressé (début, liste)
+    debuts = array("l", [0]) * (nb + 1)
+    for enfant in aretes_enfants:
+        debuts[enfant + 1] += 1
+    for i in range(nb):
+        debuts[i + 1] += debuts[i]
+    parents = array("l", [0]) * len(aretes_enfants)
+    remplis = array("l", debuts[:nb])
+    for parent, enfant in zip(aretes_parents, aretes_enfants):
+        parents[remplis[enfant]] = parent
+        remplis[enfant] += 1
+    del aretes_parents, aretes_enfants, remplis
+
+    # Positions résolues par ordre de distance croissante
+    codes = array("H", [0]) * nb
+    file = []
+    for i in range(nb):
+        if gain_externe[i]:
+            file.append((gain_externe[i], i, GAIN))
+        elif not restants[i]:
+            if perte_externe[i] and not nul_externe[i]:
+                file.append((perte_externe[i], i, PERTE))
+            else:
+                # Aucun coup possible, ou seulement des coups menant à la nulle
+                codes[i] = _coder(NUL, 0)
+    heapq.heapify(file)
+
+    while file:
+        distance, i, resultat = heapq.heappop(file)
+        if codes[i]:
+            continue
+        codes[i] = _coder(resultat, distance)
+        for parent in parents[debuts[i]:debuts[i + 1]]:
+            if codes[parent]:
+                continue
+            if resultat == PERTE:
+                heapq.heappush(file, (distance + 1, parent, GAIN))
+            else:
+                perte_externe[parent] = max(perte_externe[parent], distance + 1)
+                restants[parent] -= 1
+                if not restants[parent] and not gain_externe[parent] and not nul_externe[parent]:
+                    heapq.heappush(file, (perte_externe[parent], parent, PERTE))
+
+    # Ce qui n'est ni gagné ni perdu peut durer indéfiniment : nulle
+    for i in range(nb):
+        if not codes[i]:
+            codes[i] = _coder(NUL, 0)
+    return codes
+
+
+def construire(chemin, jetons=3, repertoire=None, rapport=print):
+    '''
+    Résout le jeu et écrit la table de finales
+    Préconditions:
+        chemin: fichier de la table à produire
+        jetons: nombre de jetons par joueur
+        repertoire: répertoire de travail pour les sauvegardes intermédiaires
+                    (par défaut chemin + ".travail") ; une construction
+                    interrompue reprend là où elle s'était arrêtée
+        rapport: fonction recevant les messages de progression
+    Postconditions: écrit la table et renvoie le nombre de positions
+    '''
+    if repertoire is None:
+        repertoire = chemin + ".travail"
+    os.makedirs(repertoire, exist_ok=True)
+
+    nb_couches = _enumerer(jetons, repertoire, rapport)
+
+    valeurs_suivantes = {}
+    for couche in reversed(range(nb_couches)):
+        cles = _charger(_chemin(repertoire, "cles", couche), "Q")
+        fichier_valeurs = _chemin(repertoire, "valeurs", couche)
+        if os.path.exists(fichier_valeurs):
+            codes = _charger(fichier_valeurs, "H")
+        else:
+            debut = time.perf_counter()
+            codes = _resoudre_couche(cles, jetons, valeurs_suivantes, rapport, couche)
+            _sauver(fichier_valeurs, codes)
+            rapport(f"Résolution couche {couche}: {len(cles)} positions "
+                    f"({time.perf_counter() - debut:.1f} s)")
+        valeurs_suivantes = dict(zip(cles, codes))
+
+    # Table de hachage à adressage ouvert, remplie au plus à moitié
+    nb_positions = sum(len(_charger(_chemin(repertoire, "cles", couche), "Q"))
+                       for couche in range(nb_couches))
+    bits = max(1, (2 * nb_positions - 1).bit_length())
+    masque = (1 << bits) - 1
+    table = array("Q", [0]) * (1 << bits)
+    for couche in range(nb_couches):
+        cles = _charger(_chemin(repertoire, "cles", couche), "Q")
+        codes = _charger(_chemin(repertoire, "valeurs", couche), "H")
+        for cle, code in zip(cles, codes):
+            indice = _indice(cle, bits)
+            while table[indice]:
+                indice = (indice + 1) & masque
+            table[indice] = cle | code << _DECALAGE_CODE
+
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "wb") as fichier:
+        fichier.write(_ENTETE.pack(_MAGIQUE, jetons, bits, nb_positions))
+        table.tofile(fichier)
+    os.replace(temporaire, chemin)
+    rapport(f"Table écrite dans {chemin}: {nb_positions} positions")
+    return nb_positions
+
+
+def main(args=None):
+    '''
+    Point d'entrée en ligne de commande
+    Préconditions:
+        args: liste d'arguments (None pour sys.argv)
+    Postconditions: construit la table et renvoie 0
+    '''
+    parser = argparse.ArgumentParser(description="Construction de la table de finales")
+    parser.add_argument("--jetons", type=int, default=3, help="jetons par joueur")
+    parser.add_argument("--sortie", required=True, help="fichier de la table")
+    parser.add_argument("--travail", default=None, help="répertoire des sauvegardes")
+    options = parser.parse_args(args)
+
+    construire(options.sortie, options.jetons, options.travail)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+'''
+Tournoi entre moteurs, sans interface graphique
+
+Deux moteurs jouent un nombre donné de parties en alternant le premier
+joueur. Les parties sont réparties entre plusieurs processus ; chacune
+tire ses nombres aléatoires d'une graine dérivée de la graine du tournoi
+et de son numéro, si bien qu'un tournoi entre moteurs à profondeur fixe
+est reproductible quel que soit le nombre de processus.
+
+Moteurs : facile, moyen, difficile, mcts (niveaux de IA.jouer, limités en temps,
+les mêmes que dans le jeu), hasard (coups au hasard, IA.jouer_facile) et
+profondeurN (recherche à profondeur fixe N, sans limite de temps).
+
+Usage: python -m morpion.tournoi hasard profondeur2 --parties 1000 --processus 4 --graine 1
+'''
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .evaluation import evaluer_motifs
+from .ia import IA
+from .plateau import ADVERSAIRE, Plateau, dict_vers_coup
+from .recherche import Recherche
+
+# Résultats d'une partie, du point de vue du premier moteur
+GAIN = 1
+NUL = 0
+PERTE = -1
+
+# Au-delà, une partie est déclarée nulle (les deux joueurs n'ont plus de jetons)
+PLIS_MAX = 200
+
+# Quantile de la loi normale pour les intervalles de confiance à 95 %
+_Z = 1.96
+
+
+def _moteur_niveau(niveau):
+    '''
+    Moteur jouant au niveau donné de IA.jouer
+    Préconditions:
+        niveau: clé de IA.BUDGETS
+    Postconditions: renvoie une fonction (plateau, joueur) -> coup
+    '''
+    return lambda plateau, joueur: dict_vers_coup(IA.jouer(plateau, joueur, niveau=niveau))
+
+
+def _moteur_profondeur(profondeur):
+    '''
+    Moteur cherchant à profondeur fixe, reproductible
+    Préconditions:
+        profondeur: profondeur de recherche en coups (>= 1)
+    Postconditions: renvoie une fonction (plateau, joueur) -> coup
+    '''
+    recherche = Recherche(evaluer_motifs, budget=math.inf, profondeur_max=profondeur)
+    return lambda plateau, joueur: recherche.meilleur_coup(plateau, joueur)[0]
+
+
+# Moteurs disponibles ; un nouveau niveau s'ajoute ici
+MOTEURS = {
+    "hasard": lambda: lambda plateau, joueur: dict_vers_coup(IA.jouer_facile(plateau, joueur)),
+    "facile": lambda: _moteur_niveau("facile"),
+    "moyen": lambda: _moteur_niveau("moyen"),
+    "difficile": lambda: _moteur_niveau("difficile"),
+    "mcts": lambda: _moteur_niveau("mcts"),
+}
+
+
+def creer_moteur(nom):
+    '''
+    Crée un moteur à partir de son nom
+    Préconditions:
+        nom: clé de MOTEURS ou "profondeurN"
+    Postconditions: renvoie une fonction (plateau, joueur) -> coup ;
+                    lève ValueError si le nom est inconnu
+    '''
+    if nom in MOTEURS:
+        return MOTEURS[nom]()
+    if nom.startswith("profondeur") and nom[len("profondeur"):].isdigit():
+        return _moteur_profondeur(int(nom[len("profondeur"):]))
+    raise ValueError(f"Moteur inconnu : {nom}")
+
+
+def jouer_partie(moteur1, moteur2, plis_max=PLIS_MAX):
+    '''
+    Joue une partie complète entre deux moteurs
+    Préconditions:
+        moteur1, moteur2: fonctions (plateau, joueur) -> coup ; moteur1 commence
+        plis_max: nombre de demi-coups au-delà duquel la partie est nulle
+    Postconditions: renvoie (résultat pour moteur1, nombre de demi-coups) ;
+                    un coup illégal fait perdre le moteur qui l'a joué
+    '''
+    plateau = Plateau()
+    moteurs = {"joueur1": moteur1, "joueur2": moteur2}
+    joueur = "joueur1"
+    for pli in range(plis_max):
+        coups = set(plateau.coups_legaux(joueur))
+        if not coups:
+            return NUL, pli
+        coup = moteurs[joueur](plateau, joueur)
+        gagnant = None
+        if coup not in coups:
+            gagnant = ADVERSAIRE[joueur]
+        else:
+            plateau.jouer_coup(coup, joueur)
+            if plateau.verifier_alignement(ADVERSAIRE[joueur]):
+                gagnant = ADVERSAIRE[joueur]
+            elif plateau.verifier_alignement(joueur):
+                gagnant = joueur
+        if gagnant is not None:
+            return (GAIN if gagnant == "joueur1" else PERTE), pli + 1
+        joueur = ADVERSAIRE[joueur]
+    return NUL, plis_max
+
+
+def _initialiser_processus():
+    '''
+    Prépare un processus de travail du tournoi
+    Préconditions: appelé dans un processus de travail, jamais dans le processus principal
+    Postconditions: les moteurs n'ouvrent pas eux-mêmes de processus
+    '''
+    IA.PROCESSUS = 1
+
+
+def _jouer_serie(nom1, nom2, graine, premiere, nombre, plis_max):
+    '''
+    Joue une série de parties consécutives du tournoi
+    Préconditions:
+        nom1, nom2: noms des moteurs comparés
+        graine: graine du tournoi
+        premiere: numéro de la première partie de la série
+        nombre: nombre de parties de la série
+    Postconditions: renvoie la liste des (résultat pour nom1, demi-coups) ;
+                    nom1 commence les parties de numéro pair
+    '''
+    moteurs = (creer_moteur(nom1), creer_moteur(nom2))
+    resultats = []
+    for partie in range(premiere, premiere + nombre):
+        random.seed(graine * 1000003 + partie)
+        if partie % 2 == 0:
+            resultat, plis = jouer_partie(moteurs[0], moteurs[1], plis_max)
+        else:
+            resultat, plis = jouer_partie(moteurs[1], moteurs[0], plis_max)
+            resultat = -resultat
+        resultats.append((resultat, plis))
+    return resultats
+
+
+def intervalle_wilson(succes, total, z=_Z):
+    '''
+    Intervalle de confiance de Wilson d'une proportion
+    Préconditions:
+        succes, total: entiers avec 0 <= succes <= total
+    Postconditions: renvoie (borne basse, borne haute) entre 0 et 1
+    '''
+    if total == 0:
+        return 0.0, 1.0
+    p = succes / total
+    denominateur = 1 + z * z / total
+    centre = (p + z * z / (2 * total)) / denominateur
+    marge = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominateur
+    return max(0.0, centre - marge), min(1.0, centre + marge)
+
+
+def tournoi(nom1, nom2, parties=100, processus=None, graine=0, plis_max=PLIS_MAX):
+    '''
+    Fait jouer deux moteurs l'un contre l'autre
+    Préconditions:
+        nom1, nom2: noms de moteurs acceptés par creer_moteur
+        parties: nombre de parties
+        processus: nombre de processus (None pour le nombre de coeurs)
+        graine: graine du tournoi
+    Postconditions: renvoie un dictionnaire de statistiques, du point de vue de nom1 ;
+                    IA.PROCESSUS retrouve sa valeur à la fin du tournoi
+    '''
+    creer_moteur(nom1), creer_moteur(nom2)
+    processus = processus or os.cpu_count() or 1
+    # Assez de séries pour équilibrer la charge, assez longues pour amortir l'envoi
+    taille = max(1, min(50, parties // (4 * processus)))
+    series = [(premiere, min(taille, parties - premiere)) for premiere in range(0, parties, taille)]
+
+    debut = time.perf_counter()
+    resultats = []
+    if processus == 1:
+        precedent = IA.PROCESSUS
+        IA.PROCESSUS = 1
+        try:
+            for premiere, nombre in series:
+                resultats += _jouer_serie(nom1, nom2, graine, premiere, nombre, plis_max)
+        finally:
+            IA.PROCESSUS = precedent
+    else:
+        with ProcessPoolExecutor(processus, initializer=_initialiser_processus) as executeur:
+            taches = [executeur.submit(_jouer_serie, nom1, nom2, graine, premiere, nombre, plis_max)
+                      for premiere, nombre in series]
+            for tache in taches:
+                resultats += tache.result()
+    duree = time.perf_counter() - debut
+
+    gains = sum(1 for resultat, _ in resultats if resultat == GAIN)
+    nuls = sum(1 for resultat, _ in resultats if resultat == NUL)
+    pertes = len(resultats) - gains - nuls
+    return {
+        "moteurs": (nom1, nom2),
+        "parties": len(resultats),
+        "gains": gains,
+        "nuls": nuls,
+        "pertes": pertes,
+        "intervalle_gains": intervalle_wilson(gains, len(resultats)),
+        "intervalle_nuls": intervalle_wilson(nuls, len(resultats)),
+        "intervalle_pertes": intervalle_wilson(pertes, len(resultats)),
+        "longueur_moyenne": sum(plis for _, plis in resultats) / max(len(resultats), 1),
+        "duree": duree,
+        "parties_par_seconde": len(resultats) / duree if duree else 0.0,
+    }
+
+
+def rapport(statistiques):
+    '''
+    Met en forme les statistiques d'un tournoi
+    Préconditions:
+        statistiques: dictionnaire renvoyé par tournoi
+    Postconditions: renvoie un texte de quelques lignes
+    '''
+    nom1, nom2 = statistiques["moteurs"]
+    total = max(statistiques["parties"], 1)
+    lignes = [f"{nom1} contre {nom2} : {statistiques['parties']} parties"]
+    for cle, libelle in (("gains", "Gains"), ("nuls", "Nuls"), ("pertes", "Pertes")):
+        bas, haut = statistiques["intervalle_" + cle]
+        lignes.append(f"  {libelle:<7}{statistiques[cle]:>7}  {100 * statistiques[cle] / total:5.1f} %"
+                      f"  (IC 95 % : {100 * bas:.1f} - {100 * haut:.1f} %)")
+    lignes.append(f"  Longueur moyenne : {statistiques['longueur_moyenne']:.1f} demi-coups")
+    lignes.append(f"  Vitesse : {statistiques['parties_par_seconde']:.1f} parties/s"
+                  f" ({statistiques['duree']:.1f} s)")
+    return "\n".join(lignes)
+
+
+def main(args=None):
+    '''
+    Point d'entrée en ligne de commande
+    Préconditions:
+        args: liste d'arguments (None pour sys.argv)
+    Postconditions: affiche le rapport du tournoi et renvoie 0
+    '''
+    parser = argparse.ArgumentParser(description="Tournoi entre moteurs")
+    parser.add_argument("moteur1", help="facile, moyen, difficile, mcts, hasard ou profondeurN")
+    parser.add_argument("moteur2", help="facile, moyen, difficile, mcts, hasard ou profondeurN")
+    parser.add_argument("--parties", type=int, default=100, help="nombre de parties")
+    parser.add_argument("--processus", type=int, default=None, help="nombre de processus")
+    parser.add_argument("--graine", type=int, default=0, help="graine du tournoi")
+    parser.add_argument("--plis-max", type=int, default=PLIS_MAX,
+                        help="demi-coups avant de déclarer la partie nulle")
+    options = parser.parse_args(args)
+
+    try:
+        statistiques = tournoi(options.moteur1, options.moteur2, options.parties,
+                               options.processus, options.graine, options.plis_max)
+    except ValueError as erreur:
+        parser.error(str(erreur))
+    print(rapport(statistiques))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+'''
+Table de transposition de taille fixe
+'''
+
+# Types de borne d'un score enregistré
+EXACTE = 0
+INFERIEURE = 1
+SUPERIEURE = 2
+
+# Estimation de la mémoire occupée par une entrée (listes et entiers Python compris)
+OCTETS_PAR_ENTREE = 160
+
+# Mémoire allouée par défaut à la table
+MEMOIRE_DEFAUT = 16 * 1024 * 1024
+
+
+class TableTransposition:
+    '''
+    Table de transposition à adressage direct et mémoire bornée
+
+    Chaque position est rangée dans la case d'indice cle & masque. Une entrée
+    n'est remplacée que par une recherche au moins aussi profonde, sauf si elle
+    date d'une recherche précédente.
+    '''
+    def __init__(self, memoire=MEMOIRE_DEFAUT):
+        '''
+        Initialise une table vide
+        Préconditions:
+            memoire: mémoire maximale en octets
+        Postconditions: crée une table dont le nombre d'entrées est la plus grande
+                        puissance de 2 tenant dans la mémoire donnée
+        '''
+        taille = 1
+        while taille * 2 * OCTETS_PAR_ENTREE <= memoire:
+            taille *= 2
+        self.taille = taille
+        self._masque = taille - 1
+        self._cles = [None] * taille
+        self._profondeurs = [0] * taille
+        self._bornes = [EXACTE] * taille
+        self._scores = [0] * taille
+        self._coups = [None] * taille
+        self._generations = [0] * taille
+        self.generation = 0
+        self.succes = 0
+        self.echecs = 0
+        self.remplacements = 0
+
+    def nouvelle_recherche(self):
+        '''
+        Signale le début d'une nouvelle recherche
+        Préconditions: aucune
+        Postconditions: les entrées existantes deviennent remplaçables en priorité
+        '''
+        self.generation += 1
+
+    def lire(self, cle):
+        '''
+        Cherche une position dans la table
+        Préconditions:
+            cle: clé de hachage de la position
+        Postconditions: renvoie (profondeur, borne, score, coup) ou None si absente
+        '''
+        indice = cle & self._masque
+        if self._cles[indice] != cle:
+            self.echecs += 1
+            return None
+        self.succes += 1
+        return (self._profondeurs[indice], self._bornes[indice],
+                self._scores[indice], self._coups[indice])
+
+    def coup(self, cle):
+        '''
+        Meilleur coup enregistré pour une position, sans compter la lecture
+        Préconditions:
+            cle: clé de hachage de la position
+        Postconditions: renvoie le coup, ou None si la position est absente ;
+                        les compteurs de succès et d'échecs ne changent pas
+        '''
+        indice = cle & self._masque
+        if self._cles[indice] != cle:
+            return None
+        return self._coups[indice]
+
+    def ecrire(self, cle, profondeur, borne, score, coup):
+        '''
+        Enregistre le résultat de la recherche d'une position
+        Préconditions:
+            cle: clé de hachage de la position
+            profondeur: profondeur de la recherche
+            borne: EXACTE, INFERIEURE ou SUPERIEURE
+            score: score trouvé
+            coup: meilleur coup trouvé (ou None)
+        Postconditions: l'entrée est écrite si la politique de remplacement l'accepte
+        '''
+        indice = cle & self._masque
+        ancienne = self._cles[indice]
+        if ancienne is not None and ancienne != cle:
+            if (self._generations[indice] == self.generation
+                    and self._profondeurs[indice] > profondeur):
+                return
+            self.remplacements += 1
+        self._cles[indice] = cle
+        self._profondeurs[indice] = profondeur
+        self._bornes[indice] = borne
+        self._scores[indice] = score
+        self._coups[indice] = coup
+        self._generations[indice] = self.generation
+
+    def vider(self):
+        '''
+        Vide la table et remet les compteurs à zéro
+        Préconditions: aucune
+        Postconditions: la table ne contient plus aucune entrée
+        '''
+        self.__init__(self.taille * OCTETS_PAR_ENTREE)
+
+    def statistiques(self):
+        '''
+        Compteurs d'utilisation de la table
+        Préconditions: aucune
+        Postconditions: renvoie un dictionnaire (succès, échecs, taux de succès,
+                        remplacements, taille, mémoire estimée)
+        '''
+        sondages = self.succes + self.echecs
+        return {
+            "succes": self.succes,
+            "echecs": self.echecs,
+            "taux_succes": self.succes / sondages if sondages else 0.0,
+            "remplacements": self.remplacements,
+            "taille": self.taille,
+            "memoire": self.taille * OCTETS_PAR_ENTREE,
+        }
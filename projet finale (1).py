@@ -2,330 +2,194 @@ import tkinter as tk
 from tkinter import messagebox
 import random
 import math
-import winsound
-import threading
+import os
 
-class Jeton:
-    '''
-    Classe représentant un jeton du jeu
-    '''
-    def __init__(self, joueur, face_claire=True):
-        '''
-        Initialise un jeton
-        Préconditions:
-            joueur: "joueur1" ou "joueur2"
-            face_claire: booléen indiquant si la face claire est visible
-        Postconditions:
-            Crée un objet Jeton avec les attributs joueur et face_claire
-        '''
-        self.joueur = joueur
-        self.face_claire = face_claire
+from morpion import Jeton, Plateau, IA
+from morpion.enregistrement import ABANDONS, GAIN_JOUEUR2, GAINS, NUL, Enregistreur, coup_joue
+from morpion.plateau import CLASSIQUE, JETONS_PAR_JOUEUR, configuration
+from morpion.reflexion import Reflexion
+from morpion.son import LecteurSon
 
-    def retourner(self):
-        '''
-        Retourne le jeton (change la face visible)
-        Préconditions: aucune
-        Postconditions: inverse la valeur de face_claire
-        '''
-        self.face_claire = not self.face_claire
 
+# Livre d'ouvertures chargé au démarrage s'il existe (construit par morpion.ouvertures)
+FICHIER_LIVRE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ouvertures.livre")
 
-class Plateau:
-    '''
-    Classe représentant le plateau de jeu 4x4
-    '''
-    def __init__(self):
-        '''
-        Initialise un plateau vide
-        Préconditions: aucune
-        Postconditions: crée une grille 4x4 vide
-        '''
-        self.grille = [[None for _ in range(4)] for _ in range(4)]
+# Fichier où chaque partie est enregistrée coup par coup, choisi par la variable
+# d'environnement MORPION_PARTIES (None, par défaut, pour ne rien enregistrer)
+FICHIER_PARTIES = os.environ.get("MORPION_PARTIES") or None
 
-    def placer_jeton(self, ligne, colonne, jeton):
-        '''
-        Place un jeton sur le plateau
-        Préconditions:
-            ligne: entier entre 0 et 3
-            colonne: entier entre 0 et 3
-            jeton: objet Jeton
-        Postconditions: place le jeton à la position donnée
-        '''
-        self.grille[ligne][colonne] = jeton
+# Variantes proposées : (hauteur, largeur, jetons à aligner, jetons par joueur)
+VARIANTES = {
+    "4x4": (4, 4, 3, JETONS_PAR_JOUEUR),
+    "6x6": (6, 6, 4, 12),
+    "8x8": (8, 8, 5, 16),
+}
 
-    def retirer_jeton(self, ligne, colonne):
-        '''
-        Retire un jeton du plateau
-        Préconditions:
-            ligne: entier entre 0 et 3
-            colonne: entier entre 0 et 3
-        Postconditions: met None à la position donnée et renvoie le jeton retiré
-        '''
-        jeton = self.grille[ligne][colonne]
-        self.grille[ligne][colonne] = None
-        return jeton
+# Côté du plus grand plateau en pixels : les cases rétrécissent sur les grands plateaux
+TAILLE_PLATEAU = 400
 
-    def est_vide(self, ligne, colonne):
-        '''
-        Vérifie si une case est vide
-        Préconditions:
-            ligne: entier entre 0 et 3
-            colonne: entier entre 0 et 3
-        Postconditions: renvoie True si la case est vide, False sinon
-        '''
-        return self.grille[ligne][colonne] is None
+# Règles affichées sur l'écran d'accueil, pour l'alignement de la variante choisie
+REGLES = """🎯 BUT: Aligner {alignement} jetons de MÊME FACE
+(horizontalement, verticalement ou diagonalement)
 
-    def est_contigu(self, ligne1, col1, ligne2, col2):
-        '''
-        Vérifie si deux cases sont contiguës
-        Préconditions:
-            ligne1, col1, ligne2, col2: entiers entre 0 et 3
-        Postconditions: renvoie True si les cases sont adjacentes, False sinon
-        '''
-        diff_ligne = abs(ligne1 - ligne2)
-        diff_col = abs(col1 - col2)
-        return (diff_ligne == 1 and diff_col == 0) or (diff_ligne == 0 and diff_col == 1)
+🎮 DÉROULEMENT:
+1️⃣ Premier coup: Placez 1 jeton
+2️⃣ Tours suivants (2 actions):
+   • Retournez un jeton adverse vers case vide adjacente
+   • Placez un de vos jetons (face claire ☀️ ou sombre 🌙)
 
-    def verifier_alignement(self, joueur):
-        '''
-        Vérifie si un joueur a trois jetons alignés avec la même face
-        Préconditions:
-            joueur: "joueur1" ou "joueur2"
-        Postconditions: renvoie True si le joueur a gagné, False sinon
-        '''
-        # Vérification horizontale
-        for ligne in range(4):
-            for col in range(2):
-                if (self.grille[ligne][col] and
-                    self.grille[ligne][col+1] and
-                    self.grille[ligne][col+2]):
-                    if (self.grille[ligne][col].joueur == joueur and
-                        self.grille[ligne][col+1].joueur == joueur and
-                        self.grille[ligne][col+2].joueur == joueur and
-                        self.grille[ligne][col].face_claire == self.grille[ligne][col+1].face_claire and
-                        self.grille[ligne][col+1].face_claire == self.grille[ligne][col+2].face_claire):
-                        return True
-
-        # Vérification verticale
-        for col in range(4):
-            for ligne in range(2):
-                if (self.grille[ligne][col] and
-                    self.grille[ligne+1][col] and
-                    self.grille[ligne+2][col]):
-                    if (self.grille[ligne][col].joueur == joueur and
-                        self.grille[ligne+1][col].joueur == joueur and
-                        self.grille[ligne+2][col].joueur == joueur and
-                        self.grille[ligne][col].face_claire == self.grille[ligne+1][col].face_claire and
-                        self.grille[ligne+1][col].face_claire == self.grille[ligne+2][col].face_claire):
-                        return True
-
-        # Vérification diagonale
-        for ligne in range(2):
-            for col in range(2):
-                if (self.grille[ligne][col] and
-                    self.grille[ligne+1][col+1] and
-                    self.grille[ligne+2][col+2]):
-                    if (self.grille[ligne][col].joueur == joueur and
-                        self.grille[ligne+1][col+1].joueur == joueur and
-                        self.grille[ligne+2][col+2].joueur == joueur and
-                        self.grille[ligne][col].face_claire == self.grille[ligne+1][col+1].face_claire and
-                        self.grille[ligne+1][col+1].face_claire == self.grille[ligne+2][col+2].face_claire):
-                        return True
-
-        for ligne in range(2, 4):
-            for col in range(2):
-                if (self.grille[ligne][col] and
-                    self.grille[ligne-1][col+1] and
-                    self.grille[ligne-2][col+2]):
-                    if (self.grille[ligne][col].joueur == joueur and
-                        self.grille[ligne-1][col+1].joueur == joueur and
-                        self.grille[ligne-2][col+2].joueur == joueur and
-                        self.grille[ligne][col].face_claire == self.grille[ligne-1][col+1].face_claire and
-                        self.grille[ligne-1][col+1].face_claire == self.grille[ligne-2][col+2].face_claire):
-                        return True
-
-        return False
-
-    def copier(self):
-        '''
-        Crée une copie du plateau
-        Préconditions: aucune
-        Postconditions: renvoie une copie du plateau
-        '''
-        nouveau = Plateau()
-        for i in range(4):
-            for j in range(4):
-                if self.grille[i][j]:
-                    nouveau.grille[i][j] = Jeton(
-                        self.grille[i][j].joueur,
-                        self.grille[i][j].face_claire
-                    )
-        return nouveau
+⚠️ ATTENTION: En retournant un jeton adverse,
+vous pouvez créer son alignement gagnant!"""
+
+# Couleurs des jetons : (face claire, face sombre, symbole) de chaque joueur
+COULEURS_JETONS = {
+    "joueur1": ("#4dabf7", "#1971c2", "#1c7ed6"),
+    "joueur2": ("#ff6b6b", "#c92a2a", "#e03131"),
+}
 
 
-class IA:
+class Sprites:
     '''
-    Classe pour l'intelligence artificielle
+    Images des jetons et des fonds étoilés, dessinées une seule fois
+
+    Les images sont tracées pixel par pixel dans des PhotoImage (une ligne de
+    pixels par appel à put) au premier usage, puis réutilisées : le plateau
+    n'a plus à composer de texte emoji ni à tirer d'étoiles à chaque dessin.
     '''
-    @staticmethod
-    def jouer_facile(plateau, joueur):
+    def __init__(self):
         '''
-        IA facile - joue aléatoirement
-        Préconditions:
-            plateau: objet Plateau
-            joueur: "joueur1" ou "joueur2"
-        Postconditions: renvoie (action, params) pour un coup valide
-        '''
-        adversaire = "joueur1" if joueur == "joueur2" else "joueur2"
-
-        # Trouver les jetons adverses
-        jetons_adv = []
-        for i in range(4):
-            for j in range(4):
-                if plateau.grille[i][j] and plateau.grille[i][j].joueur == adversaire:
-                    jetons_adv.append((i, j))
-
-        # Choisir un jeton à retourner
-        if jetons_adv:
-            ligne_src, col_src = random.choice(jetons_adv)
-
-            # Trouver cases contiguës vides
-            cases_contigues = []
-            for di, dj in [(-1,0), (1,0), (0,-1), (0,1)]:
-                ni, nj = ligne_src + di, col_src + dj
-                if 0 <= ni < 4 and 0 <= nj < 4 and plateau.est_vide(ni, nj):
-                    cases_contigues.append((ni, nj))
-
-            if cases_contigues:
-                ligne_dest, col_dest = random.choice(cases_contigues)
-            else:
-                ligne_dest, col_dest = ligne_src, col_src
-        else:
-            ligne_src = col_src = ligne_dest = col_dest = 0
-
-        # Trouver une case vide pour placer
-        cases_vides = []
-        for i in range(4):
-            for j in range(4):
-                if plateau.est_vide(i, j) and (i, j) != (ligne_dest, col_dest):
-                    cases_vides.append((i, j))
-
-        if cases_vides:
-            ligne_place, col_place = random.choice(cases_vides)
-        else:
-            ligne_place, col_place = 0, 0
-
-        face = random.choice([True, False])
-
-        return {
-            'retourner': (ligne_src, col_src, ligne_dest, col_dest),
-            'placer': (ligne_place, col_place, face)
-        }
+        Initialise un cache vide
+        Préconditions: une fenêtre Tk existe
+        Postconditions: aucune image n'est encore dessinée
+        '''
+        self.images = {}
 
     @staticmethod
-    def jouer_difficile(plateau, joueur, jetons_restants):
+    def _ellipse(image, cx, cy, rx, ry, couleur, trou=None):
         '''
-        IA difficile - stratégie avancée
+        Remplit une ellipse dans une image
         Préconditions:
-            plateau: objet Plateau
-            joueur: "joueur1" ou "joueur2"
-            jetons_restants: nombre de jetons restants
-        Postconditions: renvoie (action, params) pour un coup optimal
-        '''
-        adversaire = "joueur1" if joueur == "joueur2" else "joueur2"
-
-        # Trouver jetons adverses
-        jetons_adv = []
-        for i in range(4):
-            for j in range(4):
-                if plateau.grille[i][j] and plateau.grille[i][j].joueur == adversaire:
-                    jetons_adv.append((i, j))
-
-        meilleur_coup = None
-        meilleur_score = -999999
-
-        # Évaluer tous les coups possibles
-        for ligne_src, col_src in jetons_adv:
-            for di, dj in [(-1,0), (1,0), (0,-1), (0,1)]:
-                ni, nj = ligne_src + di, col_src + dj
-                if 0 <= ni < 4 and 0 <= nj < 4 and plateau.est_vide(ni, nj):
-                    for ligne_place in range(4):
-                        for col_place in range(4):
-                            if plateau.est_vide(ligne_place, col_place) and (ligne_place, col_place) != (ni, nj):
-                                for face in [True, False]:
-                                    # Simuler le coup
-                                    test_plateau = plateau.copier()
-                                    jeton = test_plateau.retirer_jeton(ligne_src, col_src)
-                                    if jeton:
-                                        jeton.retourner()
-                                        test_plateau.placer_jeton(ni, nj, jeton)
-                                        test_plateau.placer_jeton(ligne_place, col_place, Jeton(joueur, face))
-
-                                        # Évaluer la position
-                                        score = IA.evaluer_plateau(test_plateau, joueur)
-
-                                        if score > meilleur_score:
-                                            meilleur_score = score
-                                            meilleur_coup = {
-                                                'retourner': (ligne_src, col_src, ni, nj),
-                                                'placer': (ligne_place, col_place, face)
-                                            }
-
-        if meilleur_coup:
-            return meilleur_coup
+            image: PhotoImage
+            cx, cy, rx, ry: centre et rayons en pixels
+            couleur: couleur "#rrggbb"
+            trou: (cx, cy, r) d'un disque laissé intact, ou None
+        Postconditions: les pixels dont le centre est dans l'ellipse (hors trou) sont peints
+        '''
+        for y in range(max(0, int(cy - ry)), int(cy + ry) + 1):
+            dy = (y + 0.5 - cy) / ry
+            if dy * dy > 1:
+                continue
+            demi = rx * math.sqrt(1 - dy * dy)
+            debut, fin = round(cx - demi), round(cx + demi)
+            segments = [(debut, fin)]
+            if trou:
+                tx, ty, tr = trou
+                ecart = tr * tr - (y + 0.5 - ty) ** 2
+                if ecart > 0:
+                    t_debut, t_fin = round(tx - math.sqrt(ecart)), round(tx + math.sqrt(ecart))
+                    segments = [(debut, min(fin, t_debut)), (max(debut, t_fin), fin)]
+            for x1, x2 in segments:
+                if x2 > x1:
+                    image.put(couleur, to=(max(0, x1), y, x2, y + 1))
+
+    def _soleil_ou_lune(self, image, cx, cy, r, face_claire):
+        '''
+        Dessine l'indicateur de face d'un jeton
+        Préconditions:
+            image: PhotoImage
+            cx, cy, r: centre et rayon de l'indicateur
+            face_claire: True pour un soleil, False pour une lune
+        Postconditions: l'indicateur est peint dans l'image
+        '''
+        if face_claire:
+            self._ellipse(image, cx, cy, r + 2, r + 2, "#f08c00")
+            self._ellipse(image, cx, cy, r, r, "#ffd43b")
         else:
-            return IA.jouer_facile(plateau, joueur)
+            self._ellipse(image, cx, cy, r, r, "#fff3bf", trou=(cx + r * 0.5, cy - r * 0.4, r * 0.8))
 
-    @staticmethod
-    def evaluer_plateau(plateau, joueur):
+    def jeton(self, joueur, face_claire, taille=76):
         '''
-        Évalue la qualité d'une position
+        Image d'un jeton du plateau
+        Préconditions:
+            joueur: "joueur1" ou "joueur2"
+            face_claire: face visible
+            taille: côté de l'image en pixels (76 pour des cases de 100 pixels)
+        Postconditions: renvoie une PhotoImage de taille x taille pixels, fond transparent
+        '''
+        cle = ("jeton", joueur, face_claire, taille)
+        if cle not in self.images:
+            claire, sombre, symbole = COULEURS_JETONS[joueur]
+            image = tk.PhotoImage(width=taille, height=taille)
+            # Cercle avec effet de lumière, symbole du joueur et indicateur de face,
+            # dessinés à l'échelle d'un jeton de 76 pixels
+            f = taille / 76
+            self._ellipse(image, 38 * f, 38 * f, 37 * f, 37 * f, "#ffffff")
+            self._ellipse(image, 38 * f, 38 * f, 34 * f, 34 * f, claire if face_claire else sombre)
+            self._ellipse(image, 38 * f, 32 * f, 17 * f, 17 * f, "#ffffff")
+            self._ellipse(image, 38 * f, 32 * f, 15 * f, 15 * f, symbole)
+            self._soleil_ou_lune(image, 38 * f, 61 * f, 7 * f, face_claire)
+            self.images[cle] = image
+        return self.images[cle]
+
+    def reserve(self, joueur):
+        '''
+        Image d'un jeton de la réserve d'un joueur
         Préconditions:
-            plateau: objet Plateau
             joueur: "joueur1" ou "joueur2"
-        Postconditions: renvoie un score (plus élevé = meilleur)
-        '''
-        score = 0
-        adversaire = "joueur1" if joueur == "joueur2" else "joueur2"
-
-        # Vérifier si victoire
-        if plateau.verifier_alignement(joueur):
-            return 10000
-        if plateau.verifier_alignement(adversaire):
-            return -10000
-
-        # Compter les alignements partiels
-        for i in range(4):
-            for j in range(2):
-                # Horizontal
-                seq_joueur = 0
-                seq_adv = 0
-                meme_face_j = True
-                meme_face_a = True
-                face_ref_j = None
-                face_ref_a = None
-
-                for k in range(3):
-                    if plateau.grille[i][j+k]:
-                        if plateau.grille[i][j+k].joueur == joueur:
-                            seq_joueur += 1
-                            if face_ref_j is None:
-                                face_ref_j = plateau.grille[i][j+k].face_claire
-                            elif face_ref_j != plateau.grille[i][j+k].face_claire:
-                                meme_face_j = False
-                        elif plateau.grille[i][j+k].joueur == adversaire:
-                            seq_adv += 1
-                            if face_ref_a is None:
-                                face_ref_a = plateau.grille[i][j+k].face_claire
-                            elif face_ref_a != plateau.grille[i][j+k].face_claire:
-                                meme_face_a = False
-
-                if seq_joueur == 2 and meme_face_j:
-                    score += 50
-                if seq_adv == 2 and meme_face_a:
-                    score -= 50
-
-        return score
+        Postconditions: renvoie une PhotoImage de 42x37 pixels, fond transparent
+        '''
+        cle = ("reserve", joueur)
+        if cle not in self.images:
+            claire, _, symbole = COULEURS_JETONS[joueur]
+            image = tk.PhotoImage(width=42, height=37)
+            self._ellipse(image, 21, 18.5, 21, 18.5, "#ffffff")
+            self._ellipse(image, 21, 18.5, 19, 16.5, claire)
+            self._ellipse(image, 21, 18.5, 9, 9, "#ffffff")
+            self._ellipse(image, 21, 18.5, 8, 8, symbole)
+            self.images[cle] = image
+        return self.images[cle]
+
+    def fond(self, nom, largeur, hauteur, etoiles, cases=(0, 0), taille_case=100):
+        '''
+        Image d'un fond étoilé, éventuellement quadrillé
+        Préconditions:
+            nom: nom du fond dans le cache
+            largeur, hauteur: dimensions en pixels
+            etoiles: liste de (x, y, taille) des étoiles
+            cases: (lignes, colonnes) des cases à dessiner par-dessus ((0, 0) pour aucune)
+            taille_case: côté d'une case en pixels
+        Postconditions: renvoie une PhotoImage opaque ; le premier appel pour un nom la dessine
+        '''
+        if nom not in self.images:
+            image = tk.PhotoImage(width=largeur, height=hauteur)
+            image.put("#0a0520", to=(0, 0, largeur, hauteur))
+            for x, y, taille in etoiles:
+                if x >= largeur or y >= hauteur:
+                    continue
+                image.put("#ffffff", to=(x, y, min(x + taille, largeur), min(y + taille, hauteur)))
+            lignes, colonnes = cases
+            for case in range(lignes * colonnes):
+                x1 = (case % colonnes) * taille_case + 2
+                y1 = (case // colonnes) * taille_case + 2
+                x2 = x1 + taille_case - 4
+                y2 = y1 + taille_case - 4
+                # Case avec effet néon : bordure de 2 pixels
+                image.put("#00ffff", to=(x1, y1, x2, y2))
+                image.put("#0f1535", to=(x1 + 2, y1 + 2, x2 - 2, y2 - 2))
+            self.images[nom] = image
+        return self.images[nom]
+
+    def prechauffer(self, taille=76):
+        '''
+        Dessine d'avance toutes les images des jetons
+        Préconditions:
+            taille: côté des jetons du plateau en pixels
+        Postconditions: les dessins suivants ne créent plus d'image
+        '''
+        for joueur in COULEURS_JETONS:
+            self.reserve(joueur)
+            for face_claire in (True, False):
+                self.jeton(joueur, face_claire, taille)
 
 
 class JeuMorpionReversi:
@@ -360,7 +224,7 @@ class JeuMorpionReversi:
         self.joueur1_nom = ""
         self.joueur2_nom = ""
         self.joueur_actuel = "joueur1"
-        self.jetons_restants = {"joueur1": 8, "joueur2": 8}
+        self.jetons_restants = {"joueur1": JETONS_PAR_JOUEUR, "joueur2": JETONS_PAR_JOUEUR}
         self.premier_coup = True
         self.phase_action = "placer"
         self.jeton_selectionne = None
@@ -369,6 +233,18 @@ class JeuMorpionReversi:
         self.niveau_ia = None
         self.partie_en_cours = False
 
+        # Variante jouée (jeu classique par défaut) et côté d'une case en pixels
+        self.configuration = CLASSIQUE
+        self.jetons_par_joueur = JETONS_PAR_JOUEUR
+        self.taille_case = TAILLE_PLATEAU // CLASSIQUE.largeur
+
+        # L'IA réfléchit dans un thread ; tache_ia est le prochain rappel after de son tour
+        self.reflexion = Reflexion()
+        self.tache_ia = None
+
+        # Statistiques de recherche de l'IA affichées par-dessus le jeu (touche F2)
+        self.afficher_statistiques = False
+
         # Message d'erreur intégré
         self.message_erreur = ""
         self.message_timer = None
@@ -382,24 +258,42 @@ class JeuMorpionReversi:
                 'taille': random.randint(1, 3),
             })
 
+        # Sons joués par un thread unique (muet hors de Windows)
+        self.son = LecteurSon()
+
+        # Images des jetons et des fonds, dessinées une seule fois
+        self.sprites = Sprites()
+
+        # Premiers coups de l'IA joués sans recherche, si un livre a été construit
+        if os.path.exists(FICHIER_LIVRE):
+            try:
+                IA.charger_livre(FICHIER_LIVRE)
+            except (OSError, ValueError):
+                # Livre illisible : l'IA cherche dès le premier coup
+                pass
+
+        # Enregistrement des parties ; position_tour est le plateau au début du tour
+        self.enregistreur = None
+        if FICHIER_PARTIES:
+            try:
+                self.enregistreur = Enregistreur(FICHIER_PARTIES)
+            except OSError:
+                # Dossier en lecture seule : on joue sans enregistrer
+                pass
+        # Le format d'enregistrement ne décrit que le plateau 4x4
+        self.enregistrer_partie = False
+        self.position_tour = None
+
         self.creer_ecran_connexion()
 
     def jouer_son(self):
         '''
         Joue un son lors du placement d'un jeton
         Préconditions: aucune
-        Postconditions: joue un bip sonore
+        Postconditions: demande un bip au lecteur de sons, sans attendre
         '''
-        def beep():
-            try:
-                # Fréquence aléatoire pour varier les sons
-                freq = random.choice([800, 1000, 1200])
-                winsound.Beep(freq, 100)
-            except:
-                pass
-
-        # Lancer dans un thread pour ne pas bloquer
-        threading.Thread(target=beep, daemon=True).start()
+        # Fréquence aléatoire pour varier les sons
+        self.son.jouer(random.choice([800, 1000, 1200]), 100)
 
     def afficher_message(self, texte, couleur="#ff6b6b"):
         '''
@@ -451,12 +345,10 @@ class JeuMorpionReversi:
         self.canvas_fond.place(x=0, y=0)
 
         # Dessiner les étoiles
-        for etoile in self.etoiles:
-            self.canvas_fond.create_oval(
-                etoile['x'], etoile['y'],
-                etoile['x'] + etoile['taille'], etoile['y'] + etoile['taille'],
-                fill="white", outline=""
-            )
+        etoiles = [(etoile['x'], etoile['y'], etoile['taille']) for etoile in self.etoiles]
+        self.canvas_fond.create_image(
+            0, 0, anchor="nw", image=self.sprites.fond("connexion", 600, 650, etoiles)
+        )
 
         # Titre
         titre = tk.Label(
@@ -480,26 +372,15 @@ class JeuMorpionReversi:
             bg="#1a1f3a"
         ).pack(pady=5)
 
-        regles_texte = """🎯 BUT: Aligner 3 jetons de MÊME FACE
-(horizontalement, verticalement ou diagonalement)
-
-🎮 DÉROULEMENT:
-1️⃣ Premier coup: Placez 1 jeton
-2️⃣ Tours suivants (2 actions):
-   • Retournez un jeton adverse vers case vide adjacente
-   • Placez un de vos jetons (face claire ☀️ ou sombre 🌙)
-
-⚠️ ATTENTION: En retournant un jeton adverse,
-vous pouvez créer son alignement gagnant!"""
-
-        tk.Label(
+        self.label_regles = tk.Label(
             regles_frame,
-            text=regles_texte,
+            text=REGLES.format(alignement=self.configuration.alignement),
             font=("Courier", 9),
             fg="#ffffff",
             bg="#1a1f3a",
             justify=tk.LEFT
-        ).pack(pady=5, padx=10)
+        )
+        self.label_regles.pack(pady=5, padx=10)
 
         # Énigme
         enigme_frame = tk.Frame(self.frame_connexion, bg="#1a1f3a", bd=3, relief=tk.RIDGE)
@@ -648,6 +529,38 @@ vous pouvez créer son alignement gagnant!"""
 
         self.niveau_frame = tk.Frame(noms_frame, bg="#0a0520")
 
+        tk.Label(
+            noms_frame,
+            text="📐 Plateau:",
+            font=("Courier", 12, "bold"),
+            fg="#00ffff",
+            bg="#0a0520"
+        ).grid(row=3, column=0, pady=5, padx=5)
+
+        self.variante_var = tk.StringVar(value="4x4")
+
+        variante_frame = tk.Frame(noms_frame, bg="#0a0520")
+        variante_frame.grid(row=3, column=1, pady=5, padx=5)
+
+        self.radios_variante = []
+        for nom, (_, _, alignement, _) in VARIANTES.items():
+            radio = tk.Radiobutton(
+                variante_frame,
+                text=f"{nom} ({alignement})",
+                variable=self.variante_var,
+                value=nom,
+                font=("Courier", 10),
+                fg="#ffffff",
+                bg="#0a0520",
+                selectcolor="#1a1f3a",
+                activebackground="#0a0520",
+                activeforeground="#00ffff",
+                state=tk.DISABLED,
+                command=self.afficher_regles
+            )
+            radio.pack(side=tk.LEFT)
+            self.radios_variante.append(radio)
+
         self.btn_commencer_partie = tk.Button(
             self.frame_connexion,
             text="🎮 COMMENCER LA PARTIE",
@@ -666,6 +579,15 @@ vous pouvez créer son alignement gagnant!"""
 
         self.entry_enigme.focus()
 
+    def afficher_regles(self):
+        '''
+        Met les règles de l'écran d'accueil à l'alignement de la variante choisie
+        Préconditions: l'écran d'accueil est affiché
+        Postconditions: le texte des règles est à jour
+        '''
+        alignement = VARIANTES[self.variante_var.get()][2]
+        self.label_regles.config(text=REGLES.format(alignement=alignement))
+
     def changer_mode(self):
         '''
         Change le mode de jeu (2 joueurs ou vs IA)
@@ -703,6 +625,18 @@ vous pouvez créer son alignement gagnant!"""
                 activebackground="#0a0520"
             ).pack()
 
+            tk.Radiobutton(
+                self.niveau_frame,
+                text="😐 Moyen",
+                variable=self.niveau_var,
+                value="moyen",
+                font=("Courier", 10),
+                fg="#ffcc00",
+                bg="#0a0520",
+                selectcolor="#1a1f3a",
+                activebackground="#0a0520"
+            ).pack()
+
             tk.Radiobutton(
                 self.niveau_frame,
                 text="💀 Extrêmement Dur",
@@ -714,6 +648,18 @@ vous pouvez créer son alignement gagnant!"""
                 selectcolor="#1a1f3a",
                 activebackground="#0a0520"
             ).pack()
+
+            tk.Radiobutton(
+                self.niveau_frame,
+                text="🎲 Monte-Carlo",
+                variable=self.niveau_var,
+                value="mcts",
+                font=("Courier", 10),
+                fg="#b197fc",
+                bg="#0a0520",
+                selectcolor="#1a1f3a",
+                activebackground="#0a0520"
+            ).pack()
         else:
             self.niveau_frame.grid_forget()
             self.label_j2.grid(row=2, column=0, pady=5, padx=5)
@@ -734,6 +680,8 @@ vous pouvez créer son alignement gagnant!"""
             self.entry_j2.config(state=tk.NORMAL)
             self.radio_2j.config(state=tk.NORMAL)
             self.radio_ia.config(state=tk.NORMAL)
+            for radio in self.radios_variante:
+                radio.config(state=tk.NORMAL)
             self.label_msg_enigme.config(text="✅ Bravo! Entrez les noms des joueurs", fg="#00ff00")
         else:
             self.entry_enigme.delete(0, tk.END)
@@ -767,6 +715,11 @@ vous pouvez créer son alignement gagnant!"""
             self.joueur2_nom = j2
             self.mode_ia = False
 
+        hauteur, largeur, alignement, jetons = VARIANTES[self.variante_var.get()]
+        self.configuration = configuration(hauteur, largeur, alignement)
+        self.jetons_par_joueur = jetons
+        self.taille_case = TAILLE_PLATEAU // max(hauteur, largeur)
+
         self.frame_connexion.destroy()
         self.creer_interface_jeu()
         self.commencer_partie()
@@ -801,6 +754,17 @@ vous pouvez créer son alignement gagnant!"""
         )
         self.label_message.pack()
 
+        # Statistiques de l'IA, superposées au bas de la fenêtre quand elles sont affichées
+        self.label_statistiques = tk.Label(
+            main_frame,
+            text="",
+            font=("Courier", 8),
+            fg="#b197fc",
+            bg="#0a0520",
+            justify=tk.LEFT
+        )
+        self.fenetre.bind("<F2>", lambda e: self.basculer_statistiques())
+
         # Frame jeu
         game_frame = tk.Frame(main_frame, bg="#0a0520")
         game_frame.pack(expand=True)
@@ -825,7 +789,13 @@ vous pouvez créer son alignement gagnant!"""
         center_frame = tk.Frame(game_frame, bg="#0a0520")
         center_frame.pack(side=tk.LEFT, padx=20)
 
-        self.canvas_plateau = tk.Canvas(center_frame, width=400, height=400, bg="#0a0520", highlightthickness=0)
+        self.canvas_plateau = tk.Canvas(
+            center_frame,
+            width=self.configuration.largeur * self.taille_case,
+            height=self.configuration.hauteur * self.taille_case,
+            bg="#0a0520",
+            highlightthickness=0
+        )
         self.canvas_plateau.pack()
         self.canvas_plateau.bind("<Button-1>", self.clic_plateau)
 
@@ -884,6 +854,8 @@ vous pouvez créer son alignement gagnant!"""
         self.canvas_j2 = tk.Canvas(right_frame, width=120, height=350, bg="#0a0520", highlightthickness=0)
         self.canvas_j2.pack()
 
+        self.creer_elements_plateau()
+
         # Boutons contrôle
         ctrl_frame = tk.Frame(main_frame, bg="#0a0520")
         ctrl_frame.pack(pady=10)
@@ -939,9 +911,9 @@ vous pouvez créer son alignement gagnant!"""
         Préconditions: aucune
         Postconditions: initialise la partie
         '''
-        self.plateau = Plateau()
+        self.plateau = Plateau(self.jetons_par_joueur, self.configuration)
         self.joueur_actuel = "joueur1"
-        self.jetons_restants = {"joueur1": 8, "joueur2": 8}
+        self.jetons_restants = {"joueur1": self.jetons_par_joueur, "joueur2": self.jetons_par_joueur}
         self.premier_coup = True
         self.phase_action = "placer"
         self.jeton_selectionne = None
@@ -951,101 +923,111 @@ vous pouvez créer son alignement gagnant!"""
         self.btn_abandonner.config(state=tk.NORMAL)
         self.btn_rejouer.config(state=tk.DISABLED)
 
-        self.label_joueur1.config(text=f"⭐ {self.joueur1_nom}\n🔵 Jetons: 8")
-        self.label_joueur2.config(text=f"⭐ {self.joueur2_nom}\n🔴 Jetons: 8")
+        self.label_joueur1.config(text=f"⭐ {self.joueur1_nom}\n🔵 Jetons: {self.jetons_par_joueur}")
+        self.label_joueur2.config(text=f"⭐ {self.joueur2_nom}\n🔴 Jetons: {self.jetons_par_joueur}")
 
         self.dessiner_plateau()
         self.dessiner_jetons()
         self.mettre_a_jour_info()
         self.effacer_message()
 
+        self.position_tour = self.plateau.copier()
+        self.enregistrer_partie = bool(self.enregistreur) and self.configuration is CLASSIQUE
+        if self.enregistrer_partie:
+            mode = f"ia {self.niveau_ia}" if self.mode_ia else "2 joueurs"
+            self.enregistreur.commencer(self.joueur1_nom, self.joueur2_nom, mode)
+
+        if self.mode_ia:
+            self.reflexion.mediter(self.plateau, self.joueur_actuel, self.niveau_ia)
+
+    def creer_elements_plateau(self):
+        '''
+        Crée une fois pour toutes les éléments des canevas
+        Préconditions: les canevas du plateau et des joueurs existent
+        Postconditions: le fond, les jetons (cachés) et les réserves sont créés ;
+                        les dessins suivants ne font que modifier ces éléments
+        '''
+        # Fond spatial et cases, dessinés une fois dans une seule image
+        hauteur, largeur = self.configuration.hauteur, self.configuration.largeur
+        taille = self.taille_case
+        etoiles = [(random.randint(0, largeur * taille), random.randint(0, hauteur * taille), 2)
+                   for _ in range(20)]
+        fond = self.sprites.fond(f"plateau {hauteur}x{largeur}", largeur * taille, hauteur * taille,
+                                 etoiles, cases=(hauteur, largeur), taille_case=taille)
+        self.canvas_plateau.create_image(0, 0, anchor="nw", image=fond)
+        # Les jetons occupent les trois quarts de leur case
+        self.taille_jeton = round(taille * 0.76)
+        self.sprites.prechauffer(self.taille_jeton)
+
+        # Image du jeton de chaque case, cachée tant que la case est vide
+        self.elements_cases = []
+        for case in range(self.configuration.cases):
+            i, j = divmod(case, largeur)
+            cx = j * taille + taille / 2
+            cy = i * taille + taille / 2
+            self.elements_cases.append(self.canvas_plateau.create_image(cx, cy, state=tk.HIDDEN))
+
+        # Dernier état dessiné de chaque case : None ou (joueur, face_claire)
+        self.etat_cases = [None] * self.configuration.cases
+
+        # Réserves de jetons, affichés du haut vers le bas (en piles serrées s'ils sont nombreux)
+        pas = min(40, 290 // max(self.jetons_par_joueur - 1, 1))
+        self.elements_reserves = {}
+        for joueur, canvas in (("joueur1", self.canvas_j1), ("joueur2", self.canvas_j2)):
+            image = self.sprites.reserve(joueur)
+            self.elements_reserves[joueur] = [
+                canvas.create_image(10, 20 + i * pas, anchor="nw", image=image, state=tk.HIDDEN)
+                for i in range(self.jetons_par_joueur)
+            ]
+        self.reserves_affichees = {"joueur1": 0, "joueur2": 0}
+
     def dessiner_plateau(self):
         '''
         Dessine le plateau de jeu
-        Préconditions: aucune
-        Postconditions: affiche le plateau avec jetons
-        '''
-        self.canvas_plateau.delete("all")
-
-        # Fond spatial
-        for i in range(20):
-            x = random.randint(0, 400)
-            y = random.randint(0, 400)
-            self.canvas_plateau.create_oval(x, y, x+2, y+2, fill="white", outline="")
-
-        taille = 100
-        for i in range(4):
-            for j in range(4):
-                x1 = j * taille
-                y1 = i * taille
-                x2 = x1 + taille
-                y2 = y1 + taille
-
-                # Case avec effet néon
-                self.canvas_plateau.create_rectangle(
-                    x1+2, y1+2, x2-2, y2-2,
-                    fill="#0f1535",
-                    outline="#00ffff",
-                    width=2
-                )
+        Préconditions: creer_elements_plateau a été appelée
+        Postconditions: met à jour les seules cases qui ont changé depuis le dernier dessin
+        '''
+        if self.plateau:
+            joueur1 = self.plateau.occupation["joueur1"]
+            joueur2 = self.plateau.occupation["joueur2"]
+            claire = self.plateau.claire
+        else:
+            joueur1 = joueur2 = claire = 0
+
+        for case in range(len(self.etat_cases)):
+            bit = 1 << case
+            if joueur1 & bit:
+                etat = ("joueur1", bool(claire & bit))
+            elif joueur2 & bit:
+                etat = ("joueur2", bool(claire & bit))
+            else:
+                etat = None
+            if etat == self.etat_cases[case]:
+                continue
+            self.etat_cases[case] = etat
 
-                # Jeton si présent
-                if self.plateau and self.plateau.grille[i][j]:
-                    jeton = self.plateau.grille[i][j]
-                    cx = (x1 + x2) / 2
-                    cy = (y1 + y2) / 2
-
-                    if jeton.joueur == "joueur1":
-                        couleur = "#4dabf7" if jeton.face_claire else "#1971c2"
-                        symbole = "🔵"
-                    else:
-                        couleur = "#ff6b6b" if jeton.face_claire else "#c92a2a"
-                        symbole = "🔴"
-
-                    # Cercle avec effet de lumière
-                    self.canvas_plateau.create_oval(
-                        cx-35, cy-35, cx+35, cy+35,
-                        fill=couleur,
-                        outline="#ffffff",
-                        width=3
-                    )
-
-                    # Symbole
-                    self.canvas_plateau.create_text(
-                        cx, cy,
-                        text=symbole,
-                        font=("Arial", 40),
-                        fill="white"
-                    )
-
-                    # Indicateur de face
-                    face_txt = "☀️" if jeton.face_claire else "🌙"
-                    self.canvas_plateau.create_text(
-                        cx, cy+25,
-                        text=face_txt,
-                        font=("Arial", 16)
-                    )
+            if etat is None:
+                self.canvas_plateau.itemconfig(self.elements_cases[case], state=tk.HIDDEN)
+            else:
+                self.canvas_plateau.itemconfig(
+                    self.elements_cases[case], image=self.sprites.jeton(*etat, self.taille_jeton),
+                    state=tk.NORMAL
+                )
 
     def dessiner_jetons(self):
         '''
         Dessine les jetons restants
-        Préconditions: aucune
-        Postconditions: affiche les jetons disponibles
-        '''
-        self.canvas_j1.delete("all")
-        self.canvas_j2.delete("all")
-
-        # Jetons joueur 1
-        for i in range(self.jetons_restants["joueur1"]):
-            y = 20 + i * 40
-            self.canvas_j1.create_oval(10, y, 50, y+35, fill="#4dabf7", outline="#ffffff", width=2)
-            self.canvas_j1.create_text(30, y+17, text="🔵", font=("Arial", 20))
-
-        # Jetons joueur 2
-        for i in range(self.jetons_restants["joueur2"]):
-            y = 20 + i * 40
-            self.canvas_j2.create_oval(10, y, 50, y+35, fill="#ff6b6b", outline="#ffffff", width=2)
-            self.canvas_j2.create_text(30, y+17, text="🔴", font=("Arial", 20))
+        Préconditions: creer_elements_plateau a été appelée
+        Postconditions: affiche ou cache les seuls jetons dont l'état a changé
+        '''
+        for joueur, canvas in (("joueur1", self.canvas_j1), ("joueur2", self.canvas_j2)):
+            elements = self.elements_reserves[joueur]
+            avant = self.reserves_affichees[joueur]
+            apres = max(0, min(self.jetons_restants[joueur], len(elements)))
+            etat = tk.NORMAL if apres > avant else tk.HIDDEN
+            for i in range(min(avant, apres), max(avant, apres)):
+                canvas.itemconfig(elements[i], state=etat)
+            self.reserves_affichees[joueur] = apres
 
     def mettre_a_jour_info(self):
         '''
@@ -1094,11 +1076,10 @@ vous pouvez créer son alignement gagnant!"""
         if self.mode_ia and self.joueur_actuel == "joueur2":
             return
 
-        taille = 100
-        col = event.x // taille
-        ligne = event.y // taille
+        col = event.x // self.taille_case
+        ligne = event.y // self.taille_case
 
-        if not (0 <= ligne < 4 and 0 <= col < 4):
+        if not (0 <= ligne < self.configuration.hauteur and 0 <= col < self.configuration.largeur):
             return
 
         if self.premier_coup:
@@ -1114,7 +1095,7 @@ vous pouvez créer son alignement gagnant!"""
         '''
         Place le premier jeton
         Préconditions:
-            ligne, col: entiers 0-3
+            ligne, col: coordonnées d'une case du plateau
         Postconditions: place le jeton et change de joueur
         '''
         if not self.plateau.est_vide(ligne, col):
@@ -1127,34 +1108,34 @@ vous pouvez créer son alignement gagnant!"""
         self.jetons_restants[self.joueur_actuel] -= 1
 
         self.premier_coup = False
-        self.phase_action = "retourner"
-        self.changer_joueur()
 
         self.dessiner_plateau()
         self.dessiner_jetons()
-        self.mettre_a_jour_info()
-
-        if self.mode_ia and self.joueur_actuel == "joueur2":
-            self.fenetre.after(1000, self.jouer_ia)
+        self.terminer_tour()
 
     def selectionner_retourner(self, ligne, col):
         '''
         Sélectionne un jeton à retourner
         Préconditions:
-            ligne, col: entiers 0-3
+            ligne, col: coordonnées d'une case du plateau
         Postconditions: enregistre le jeton sélectionné
         '''
         if self.plateau.est_vide(ligne, col):
             self.afficher_message("⚠️ Sélectionnez une case avec un jeton!")
             return
 
-        jeton = self.plateau.grille[ligne][col]
+        jeton = self.plateau.obtenir_jeton(ligne, col)
         adversaire = "joueur2" if self.joueur_actuel == "joueur1" else "joueur1"
 
         if jeton.joueur != adversaire:
             self.afficher_message("⚠️ Vous devez sélectionner un jeton ADVERSE!")
             return
 
+        case = ligne * self.configuration.largeur + col
+        if not any(source == case for source, _ in self.plateau.glissements(self.joueur_actuel)):
+            self.afficher_message("⚠️ Ce jeton n'a aucune case vide adjacente!")
+            return
+
         self.jeton_selectionne = (ligne, col)
         self.phase_action = "choisir_dest"
         self.mettre_a_jour_info()
@@ -1164,7 +1145,7 @@ vous pouvez créer son alignement gagnant!"""
         '''
         Choisit où déplacer le jeton retourné
         Préconditions:
-            ligne, col: entiers 0-3
+            ligne, col: coordonnées d'une case du plateau
         Postconditions: déplace et retourne le jeton
         '''
         if not self.plateau.est_vide(ligne, col):
@@ -1172,8 +1153,10 @@ vous pouvez créer son alignement gagnant!"""
             return
 
         l_src, c_src = self.jeton_selectionne
+        largeur = self.configuration.largeur
+        glissement = (l_src * largeur + c_src, ligne * largeur + col)
 
-        if not self.plateau.est_contigu(l_src, c_src, ligne, col):
+        if glissement not in self.plateau.glissements(self.joueur_actuel):
             self.afficher_message("⚠️ Choisissez une case ADJACENTE (haut/bas/gauche/droite)!")
             return
 
@@ -1186,20 +1169,27 @@ vous pouvez créer son alignement gagnant!"""
         if self.plateau.verifier_alignement(adversaire):
             self.dessiner_plateau()
             nom = self.joueur2_nom if adversaire == "joueur2" else self.joueur1_nom
-            self.afficher_message(f"🎉 {nom} a gagné en alignant 3 jetons!", "#00ff00")
-            self.fin_partie()
+            self.afficher_message(f"🎉 {nom} a gagné en alignant {self.configuration.alignement} jetons!",
+                                  "#00ff00")
+            self.fin_partie(GAINS[adversaire])
             return
 
-        self.phase_action = "placer"
         self.dessiner_plateau()
-        self.mettre_a_jour_info()
         self.effacer_message()
 
+        if self.jetons_restants[self.joueur_actuel] <= 0:
+            # Plus de jeton à poser : le tour s'arrête là
+            self.terminer_tour()
+            return
+
+        self.phase_action = "placer"
+        self.mettre_a_jour_info()
+
     def placer_jeton(self, ligne, col):
         '''
         Place un nouveau jeton
         Préconditions:
-            ligne, col: entiers 0-3
+            ligne, col: coordonnées d'une case du plateau
         Postconditions: place le jeton et vérifie victoire
         '''
         if not self.plateau.est_vide(ligne, col):
@@ -1221,54 +1211,101 @@ vous pouvez créer son alignement gagnant!"""
         if self.plateau.verifier_alignement(self.joueur_actuel):
             nom = self.joueur1_nom if self.joueur_actuel == "joueur1" else self.joueur2_nom
             self.afficher_message(f"🎉 Félicitations {nom}! Vous avez gagné!", "#00ff00")
-            self.fin_partie()
+            self.fin_partie(GAINS[self.joueur_actuel])
             return
 
-        self.phase_action = "retourner"
-        self.changer_joueur()
-        self.mettre_a_jour_info()
         self.effacer_message()
-
-        self.label_joueur1.config(text=f"⭐ {self.joueur1_nom}\n🔵 Jetons: {self.jetons_restants['joueur1']}")
-        self.label_joueur2.config(text=f"⭐ {self.joueur2_nom}\n🔴 Jetons: {self.jetons_restants['joueur2']}")
-
-        if self.mode_ia and self.joueur_actuel == "joueur2":
-            self.fenetre.after(1000, self.jouer_ia)
+        self.terminer_tour()
 
     def jouer_ia(self):
         '''
         Fait jouer l'IA
         Préconditions: mode IA activé
-        Postconditions: l'IA effectue son tour
+        Postconditions: lance la réflexion de l'IA en arrière-plan
         '''
+        self.tache_ia = None
         if not self.partie_en_cours:
             return
 
-        if self.niveau_ia == "facile":
-            coup = IA.jouer_facile(self.plateau, "joueur2")
-        else:
-            coup = IA.jouer_difficile(self.plateau, "joueur2", self.jetons_restants["joueur2"])
+        self.reflexion.demander(self.plateau, "joueur2", self.jetons_restants["joueur2"], self.niveau_ia)
+        self.attendre_ia()
+
+    def attendre_ia(self):
+        '''
+        Attend la réponse de l'IA sans bloquer l'interface
+        Préconditions: une réflexion a été demandée
+        Postconditions: joue le coup de l'IA s'il est prêt, sinon réessaie 50 ms plus tard
+        '''
+        self.tache_ia = None
+        if not self.partie_en_cours:
+            return
+
+        coup = self.reflexion.reponse()
+        if coup is None:
+            self.tache_ia = self.fenetre.after(50, self.attendre_ia)
+            return
+        self.montrer_statistiques()
 
         # Retourner
-        l_src, c_src, l_dest, c_dest = coup['retourner']
-        if not self.plateau.est_vide(l_src, c_src):
+        if coup['retourner']:
+            l_src, c_src, l_dest, c_dest = coup['retourner']
             jeton = self.plateau.retirer_jeton(l_src, c_src)
-            if jeton:
-                jeton.retourner()
-                self.plateau.placer_jeton(l_dest, c_dest, jeton)
+            jeton.retourner()
+            self.plateau.placer_jeton(l_dest, c_dest, jeton)
 
-        self.jouer_son()
-        self.dessiner_plateau()
+            self.jouer_son()
+            self.dessiner_plateau()
 
-        adversaire = "joueur1"
-        if self.plateau.verifier_alignement(adversaire):
-            nom = self.joueur1_nom
-            self.afficher_message(f"🎉 {nom} a gagné!", "#00ff00")
-            self.fin_partie()
-            return
+            adversaire = "joueur1"
+            if self.plateau.verifier_alignement(adversaire):
+                nom = self.joueur1_nom
+                self.afficher_message(f"🎉 {nom} a gagné!", "#00ff00")
+                self.fin_partie(GAINS[adversaire])
+                return
 
         # Placer
-        self.fenetre.after(500, lambda: self.ia_placer(coup))
+        if coup['placer']:
+            self.tache_ia = self.fenetre.after(500, lambda: self.ia_placer(coup))
+        else:
+            self.terminer_tour()
+
+    def basculer_statistiques(self):
+        '''
+        Affiche ou masque les statistiques de recherche de l'IA
+        Préconditions: l'interface de jeu est créée
+        Postconditions: les statistiques du dernier coup de l'IA apparaissent ou disparaissent
+        '''
+        self.afficher_statistiques = not self.afficher_statistiques
+        if self.afficher_statistiques:
+            self.label_statistiques.place(relx=0, rely=1, anchor="sw")
+            self.montrer_statistiques()
+        else:
+            self.label_statistiques.place_forget()
+
+    def montrer_statistiques(self):
+        '''
+        Met à jour les statistiques affichées
+        Préconditions: aucune
+        Postconditions: affiche les mesures du dernier coup de l'IA si l'affichage est activé
+        '''
+        if not self.afficher_statistiques:
+            return
+        statistiques = self.reflexion.statistiques
+        if statistiques is None:
+            self.label_statistiques.config(text="IA : aucun coup calculé")
+        else:
+            self.label_statistiques.config(text="IA : " + statistiques.resume())
+
+    def annuler_ia(self):
+        '''
+        Annule le tour de l'IA en cours
+        Préconditions: aucune
+        Postconditions: la réflexion est interrompue et aucun rappel de l'IA ne reste programmé
+        '''
+        if self.tache_ia:
+            self.fenetre.after_cancel(self.tache_ia)
+            self.tache_ia = None
+        self.reflexion.annuler()
 
     def ia_placer(self, coup):
         '''
@@ -1277,31 +1314,81 @@ vous pouvez créer son alignement gagnant!"""
             coup: dictionnaire avec les actions
         Postconditions: place le jeton de l'IA
         '''
+        self.tache_ia = None
         if not self.partie_en_cours:
             return
 
         l_place, c_place, face = coup['placer']
 
-        if self.plateau.est_vide(l_place, c_place) and self.jetons_restants["joueur2"] > 0:
-            jeton = Jeton("joueur2", face)
-            self.plateau.placer_jeton(l_place, c_place, jeton)
-            self.jetons_restants["joueur2"] -= 1
+        jeton = Jeton("joueur2", face)
+        self.plateau.placer_jeton(l_place, c_place, jeton)
+        self.jetons_restants["joueur2"] -= 1
 
-            self.jouer_son()
-            self.dessiner_plateau()
-            self.dessiner_jetons()
+        self.jouer_son()
+        self.dessiner_plateau()
+        self.dessiner_jetons()
 
-            if self.plateau.verifier_alignement("joueur2"):
-                self.afficher_message(f"🎉 {self.joueur2_nom} a gagné!", "#00ff00")
-                self.fin_partie()
-                return
+        if self.plateau.verifier_alignement("joueur2"):
+            self.afficher_message(f"🎉 {self.joueur2_nom} a gagné!", "#00ff00")
+            self.fin_partie(GAIN_JOUEUR2)
+            return
+
+        self.terminer_tour()
+
+    def terminer_tour(self):
+        '''
+        Termine le tour du joueur actuel
+        Préconditions: le coup du joueur actuel est entièrement joué
+        Postconditions: passe la main à l'autre joueur et lance l'IA si c'est son tour
+        '''
+        self.enregistrer_coup()
+        self.changer_joueur()
+
+        self.label_joueur1.config(text=f"⭐ {self.joueur1_nom}\n🔵 Jetons: {self.jetons_restants['joueur1']}")
+        self.label_joueur2.config(text=f"⭐ {self.joueur2_nom}\n🔴 Jetons: {self.jetons_restants['joueur2']}")
+
+        if not self.preparer_tour():
+            return
 
-            self.phase_action = "retourner"
-            self.changer_joueur()
-            self.mettre_a_jour_info()
+        self.mettre_a_jour_info()
+
+        if self.mode_ia and self.joueur_actuel == "joueur2":
+            self.tache_ia = self.fenetre.after(1000, self.jouer_ia)
+        elif self.mode_ia:
+            # L'IA prépare ses réponses pendant que le joueur réfléchit
+            self.reflexion.mediter(self.plateau, self.joueur_actuel, self.niveau_ia)
+
+    def enregistrer_coup(self):
+        '''
+        Enregistre le coup que le joueur actuel vient de jouer
+        Préconditions: le coup du joueur actuel est entièrement joué
+        Postconditions: le coup est ajouté à la partie enregistrée s'il a changé le plateau
+        '''
+        if self.enregistrer_partie:
+            coup = coup_joue(self.position_tour, self.plateau, self.joueur_actuel)
+            if coup != (None, None, None, None):
+                self.enregistreur.ajouter(coup)
+        self.position_tour = self.plateau.copier()
+
+    def preparer_tour(self):
+        '''
+        Choisit la première phase du tour du joueur actuel
+        Préconditions: aucune
+        Postconditions: renvoie False et termine la partie (match nul)
+                        si le joueur ne peut rien jouer, True sinon
+        '''
+        coup = next(self.plateau.coups_legaux(
+            self.joueur_actuel, self.jetons_restants[self.joueur_actuel], self.premier_coup
+        ), None)
+
+        if coup is None:
+            self.afficher_message("🤝 Plus aucun coup possible : match nul!", "#ffff00")
+            self.fin_partie(NUL)
+            return False
 
-            self.label_joueur1.config(text=f"⭐ {self.joueur1_nom}\n🔵 Jetons: {self.jetons_restants['joueur1']}")
-            self.label_joueur2.config(text=f"⭐ {self.joueur2_nom}\n🔴 Jetons: {self.jetons_restants['joueur2']}")
+        # Sans jeton adverse déplaçable, on passe directement à la pose
+        self.phase_action = "retourner" if coup[0] is not None else "placer"
+        return True
 
     def changer_joueur(self):
         '''
@@ -1321,14 +1408,23 @@ vous pouvez créer son alignement gagnant!"""
         nom_gagnant = self.joueur2_nom if self.joueur_actuel == "joueur1" else self.joueur1_nom
 
         self.afficher_message(f"🏳️ {nom_perdant} a abandonné. {nom_gagnant} gagne!", "#ffff00")
-        self.fin_partie()
+        self.fin_partie(ABANDONS[self.joueur_actuel])
 
-    def fin_partie(self):
+    def fin_partie(self, resultat):
         '''
         Termine la partie
-        Préconditions: aucune
-        Postconditions: désactive les contrôles
-        '''
+        Préconditions:
+            resultat: résultat de morpion.enregistrement (NUL, GAINS[joueur], ABANDONS[joueur])
+        Postconditions: désactive les contrôles, annule le tour de l'IA et
+                        termine l'enregistrement de la partie
+        '''
+        if resultat not in ABANDONS.values():
+            # Le coup gagnant n'est pas passé par terminer_tour ; un abandon laisse
+            # au contraire un coup inachevé, qui n'est pas enregistré
+            self.enregistrer_coup()
+        if self.enregistrer_partie:
+            self.enregistreur.terminer(resultat)
+        self.annuler_ia()
         self.partie_en_cours = False
         self.btn_abandonner.config(state=tk.DISABLED)
         self.btn_rejouer.config(state=tk.NORMAL)
@@ -1339,6 +1435,7 @@ vous pouvez créer son alignement gagnant!"""
         Préconditions: aucune
         Postconditions: réinitialise le jeu
         '''
+        self.annuler_ia()
         self.commencer_partie()
 
 
@@ -1346,4 +1443,7 @@ vous pouvez créer son alignement gagnant!"""
 if __name__ == "__main__":
     fenetre = tk.Tk()
     jeu = JeuMorpionReversi(fenetre)
-    fenetre.mainloop()
\ No newline at end of file
+    fenetre.mainloop()
+    jeu.son.fermer()
+    if jeu.enregistreur:
+        jeu.enregistreur.fermer()
\ No newline at end of file